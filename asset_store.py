@@ -0,0 +1,207 @@
+"""
+Content-addressed store for extracted HAR bodies.
+
+Blobs live under <assets>/.blobs/<xx>/<sha256> and the readable asset names
+are hardlinks (symlinks, or copies as a last resort) to them. The manifest
+maps every readable name to its source URL and blob digest, so the same
+texture fetched twice costs one blob on disk and one write.
+
+Run directly to fold an existing assets directory into the store:
+    python asset_store.py rebuild/assets
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+
+from har_stream import iter_body
+
+BLOB_DIR = ".blobs"
+MANIFEST_FILE = ".manifest.json"
+
+
+def blob_path(root, digest):
+    return os.path.join(root, BLOB_DIR, digest[:2], digest)
+
+
+def body_digest(text, encoding):
+    """sha256 and size of a decoded body, without keeping it in memory."""
+    h = hashlib.sha256()
+    size = 0
+    for data in iter_body(text, encoding):
+        h.update(data)
+        size += len(data)
+    return h.hexdigest(), size
+
+
+def put_body(root, text, encoding):
+    """Store one content.text body. Returns (digest, size, wrote_blob).
+
+    Bodies whose digest is already stored are hashed but never written.
+    """
+    digest, size = body_digest(text, encoding)
+    path = blob_path(root, digest)
+    if os.path.exists(path):
+        return digest, size, False
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Threads of one process can write the same body at once: each gets its own temp file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f_out:
+        for data in iter_body(text, encoding):
+            f_out.write(data)
+    if os.path.exists(path):
+        # Another writer stored the same bytes first
+        os.remove(tmp_path)
+        return digest, size, False
+    os.replace(tmp_path, path)
+    return digest, size, True
+
+
+def text_digest(text):
+    """Digest of a still-encoded content.text, used to spot unchanged entries."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(1 << 20), b''):
+            h.update(data)
+    return h.hexdigest()
+
+
+class AssetStore:
+    """Blob store plus the name -> blob manifest for one assets directory."""
+
+    def __init__(self, root):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST_FILE)
+        self.manifest = {"assets": {}}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        self.assets = self.manifest.setdefault("assets", {})
+
+    def names_by_url(self):
+        """URL -> names it was saved under, in HAR entry order."""
+        names = {}
+        ordered = sorted(self.assets.items(), key=lambda item: (item[1].get("entry", -1), item[0]))
+        for name, info in ordered:
+            if info.get("url"):
+                names.setdefault(info["url"], []).append(name)
+        return names
+
+    def is_current(self, name, url, source_digest):
+        """True if name already holds this URL's body, untouched on disk."""
+        info = self.assets.get(name)
+        if not info or info.get("url") != url or info.get("text_digest") != source_digest:
+            return False
+        path = os.path.join(self.root, name)
+        return os.path.exists(path) and os.path.getsize(path) == info.get("size")
+
+    def har_unchanged(self, har_file, dedupe):
+        """True if har_file is the same capture the manifest was built from."""
+        har = self.manifest.get("har")
+        if har != _har_stamp(har_file, dedupe):
+            return False
+        return all(self.is_current(name, info.get("url"), info.get("text_digest"))
+                   for name, info in self.assets.items())
+
+    def set_har(self, har_file, dedupe):
+        self.manifest["har"] = _har_stamp(har_file, dedupe)
+
+    def prune(self, keep):
+        """Delete outputs (and orphaned blobs) for names not in keep."""
+        removed = [name for name in self.assets if name not in keep]
+        for name in removed:
+            info = self.assets.pop(name)
+            path = os.path.join(self.root, name)
+            if os.path.lexists(path):
+                os.unlink(path)
+            print(f"Pruned: {name}")
+            digest = info.get("digest")
+            if digest and not any(other.get("digest") == digest for other in self.assets.values()):
+                blob = blob_path(self.root, digest)
+                if os.path.exists(blob):
+                    os.unlink(blob)
+        return removed
+
+    def link(self, name, digest):
+        """Point the readable name at its blob. Returns True if it changed."""
+        target = blob_path(self.root, digest)
+        path = os.path.join(self.root, name)
+        if os.path.lexists(path):
+            if os.path.exists(path) and os.path.samefile(path, target):
+                return False
+            os.unlink(path)
+        try:
+            os.link(target, path)
+        except OSError:
+            try:
+                os.symlink(os.path.relpath(target, self.root), path)
+            except OSError:
+                shutil.copyfile(target, path)
+        return True
+
+    def record(self, name, url, digest, size, mime_type, text_digest=None, entry=None):
+        info = {"url": url, "digest": digest, "size": size, "mime": mime_type}
+        if text_digest:
+            info["text_digest"] = text_digest
+        if entry is not None:
+            info["entry"] = entry
+        self.assets[name] = info
+
+    def save(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def dedupe(self):
+        """Fold every loose file in the directory into the store.
+
+        Returns (bytes_before, bytes_after).
+        """
+        before = 0
+        blobs = {}
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name)
+            if name.startswith('.') or os.path.islink(path) or not os.path.isfile(path):
+                continue
+            size = os.path.getsize(path)
+            before += size
+            digest = file_digest(path)
+            target = blob_path(self.root, digest)
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                try:
+                    os.link(path, target)
+                except OSError:
+                    shutil.copyfile(path, target)
+            blobs[digest] = size
+            self.link(name, digest)
+            info = self.assets.get(name, {})
+            self.record(name, info.get("url"), digest, size, info.get("mime"))
+        self.save()
+        return before, sum(blobs.values())
+
+
+def _har_stamp(har_file, dedupe):
+    st = os.stat(har_file)
+    return {"path": os.path.abspath(har_file), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+            "dedupe": bool(dedupe)}
+
+
+def main():
+    root = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "rebuild", "assets")
+    store = AssetStore(root)
+    before, after = store.dedupe()
+    print(f"Deduplicated {len(store.assets)} assets in {root}: "
+          f"{before / 1e6:.2f} MB of assets, {after / 1e6:.2f} MB unique on disk")
+
+
+if __name__ == "__main__":
+    main()
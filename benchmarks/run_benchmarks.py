@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Benchmark the asset pipeline on synthetic captures.
+
+For each scale a synthetic HAR is generated (synth_har.py) and every stage
+runs in a fresh subprocess, so wall time, peak RSS and bytes written are
+measured per stage without one stage's heap leaking into the next. Results
+are appended to benchmarks/history.json and compared with the previous run;
+stages that got slower than --threshold are flagged.
+
+    python benchmarks/run_benchmarks.py                      # small + medium
+    python benchmarks/run_benchmarks.py --scales large --stages extract-stream
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+HISTORY_FILE = os.path.join(BENCH_DIR, "history.json")
+
+SCALES = {
+    "small": {"entries": 200, "body_kb": 16, "sheets": 2, "sprites_per_sheet": 32, "sheet_size": 512},
+    "medium": {"entries": 2000, "body_kb": 32, "sheets": 6, "sprites_per_sheet": 64, "sheet_size": 1024},
+    "large": {"entries": 10000, "body_kb": 64, "sheets": 12, "sprites_per_sheet": 128, "sheet_size": 2048},
+}
+STAGES = ["extract", "extract-stream", "extract-parallel", "extract-dedupe", "atlas-index", "crop"]
+
+# --- Stage bodies (run inside the child process) ---
+
+def _stage_extract(workdir, out_dir, **options):
+    from extract_assets import extract_assets
+    extract_assets(os.path.join(workdir, "synth.har"), out_dir, **options)
+
+def _stage_atlas_index(workdir, out_dir):
+    sys.path.insert(0, os.path.join(ROOT_DIR, "rebuild"))
+    import find_sprites
+    # Keep the benchmark's index out of rebuild/
+    find_sprites.INDEX_FILE = os.path.join(out_dir, "atlas_index.json")
+    os.makedirs(out_dir, exist_ok=True)
+    index = find_sprites.build_index(os.path.join(workdir, "synth.har"))
+    return len(index["sprites"])
+
+def _stage_crop(workdir, out_dir):
+    sys.path.insert(0, os.path.join(ROOT_DIR, "rebuild"))
+    from sprite_batch import CropJob, run_batch
+    with open(os.path.join(workdir, "truth.json"), 'r', encoding='utf-8') as f:
+        truth = json.load(f)
+    jobs = [CropJob(sheet, x, y, w, h, f"{name}.png")
+            for sheet, sprites in truth.items() for name, (x, y, w, h) in sprites.items()]
+    saved = run_batch(jobs, os.path.join(workdir, "sheets"), out_dir)
+    # Known rects: every sprite must come back at exactly its size
+    wrong = [job.output for job in jobs if saved.get(job.output) != (job.w, job.h)]
+    if wrong:
+        raise RuntimeError(f"{len(wrong)} sprites cropped wrong, e.g. {wrong[0]}")
+    return len(saved)
+
+STAGE_FUNCS = {
+    "extract": lambda w, o: _stage_extract(w, o),
+    "extract-stream": lambda w, o: _stage_extract(w, o, stream=True),
+    "extract-parallel": lambda w, o: _stage_extract(w, o, stream=True, workers=4),
+    "extract-dedupe": lambda w, o: _stage_extract(w, o, stream=True, dedupe=True),
+    "atlas-index": _stage_atlas_index,
+    "crop": _stage_crop,
+}
+
+def _peak_rss_mb():
+    import resource
+    # ru_maxrss is KB on Linux, bytes on macOS; children covers process pools
+    unit = 1 if sys.platform == "darwin" else 1024
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak * unit / (1024 * 1024)
+
+def _dir_bytes(path):
+    total = 0
+    seen = set()
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            st = os.lstat(os.path.join(dirpath, filename))
+            # Hardlinked outputs (--dedupe) only cost their bytes once
+            if (st.st_dev, st.st_ino) not in seen:
+                seen.add((st.st_dev, st.st_ino))
+                total += st.st_size
+    return total
+
+def run_stage(stage, workdir):
+    """Child side: run one stage quietly and print its metrics as JSON."""
+    sys.path.insert(0, ROOT_DIR)
+    out_dir = os.path.join(workdir, "out-" + stage)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        items = STAGE_FUNCS[stage](workdir, out_dir)
+    wall = time.perf_counter() - start
+    print(json.dumps({"wall_s": round(wall, 4), "peak_rss_mb": round(_peak_rss_mb(), 1),
+                      "bytes_written": _dir_bytes(out_dir), "items": items}))
+
+# --- Driver ---
+
+def measure(stage, workdir, repeat):
+    """Best wall time of `repeat` fresh-process runs (RSS / bytes from that run)."""
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-stage", stage, "--workdir", workdir],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            return {"error": (proc.stderr.strip().splitlines() or ["failed"])[-1]}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if best is None or result["wall_s"] < best["wall_s"]:
+            best = result
+    return best
+
+def load_history():
+    if os.path.exists(HISTORY_FILE):
+        with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return []
+
+def previous_result(history, scale, stage, har_bytes):
+    """Last good result for this stage on an identical synthetic capture."""
+    for run in reversed(history):
+        scale_results = run["results"].get(scale, {})
+        result = scale_results.get(stage)
+        if result and "error" not in result and scale_results.get("har_bytes") == har_bytes:
+            return result
+    return None
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_benchmarks(scales, stages, repeat=3, threshold=0.10, min_delta=0.05, keep=False):
+    from synth_har import generate
+
+    history = load_history()
+    run = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": git_commit(),
+           "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+           "results": {}}
+    regressions = []
+    for scale in scales:
+        workdir = tempfile.mkdtemp(prefix=f"bench-{scale}-")
+        try:
+            t0 = time.perf_counter()
+            info = generate(workdir, **SCALES[scale])
+            print(f"\n=== {scale}: {info['entries']} entries, {info['har_bytes'] / 1e6:.1f} MB HAR, "
+                  f"{info['sprites']} sprites (generated in {time.perf_counter() - t0:.1f}s) ===")
+            print("  Stage                 wall      peak RSS      written     vs last")
+            results = run["results"][scale] = {"har_bytes": info["har_bytes"]}
+            for stage in stages:
+                result = results[stage] = measure(stage, workdir, repeat)
+                if "error" in result:
+                    print(f"  ✗ {stage:<18} {result['error']}")
+                    continue
+                previous = previous_result(history, scale, stage, info["har_bytes"])
+                change = ""
+                if previous:
+                    delta = result["wall_s"] / previous["wall_s"] - 1 if previous["wall_s"] else 0.0
+                    change = f"{delta:+.1%}"
+                    # Sub-50ms swings on the small scale are timer noise, not regressions
+                    if delta > threshold and result["wall_s"] - previous["wall_s"] > min_delta:
+                        change += "  REGRESSION"
+                        regressions.append((scale, stage, delta))
+                print(f"  {stage:<18} {result['wall_s']:>7.3f}s {result['peak_rss_mb']:>9.1f} MB "
+                      f"{result['bytes_written'] / 1e6:>9.2f} MB  {change}")
+        finally:
+            if keep:
+                print(f"  Kept: {workdir}")
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    history.append(run)
+    with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=1)
+    print(f"\n✓ Results appended to: {HISTORY_FILE}")
+    if regressions:
+        print(f"✗ {len(regressions)} stage(s) slower than last run by more than {threshold:.0%}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the asset pipeline on synthetic HAR captures")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"],
+                        help="capture sizes to run (default: small medium)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="stages to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, best wall time kept (default: 3)")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="flag stages slower than the last run by this fraction (default: 0.10)")
+    parser.add_argument("--min-delta", type=float, default=0.05,
+                        help="ignore slowdowns smaller than this many seconds (default: 0.05)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated captures and outputs")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any stage regressed")
+    parser.add_argument("--run-stage", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        run_stage(args.run_stage, args.workdir)
+        return
+    regressions = run_benchmarks(args.scales, args.stages, args.repeat, args.threshold, args.min_delta, args.keep)
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
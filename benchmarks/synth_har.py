@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Synthetic HAR captures for benchmarking the asset pipeline.
+
+Writes a HAR of any size with a configurable mix of base64 bodies (PNG
+texture sheets, audio, fonts, scripts, ...), a game JSON whose UIAtlas
+spriteLists point at the sheets (embedded as an escaped JSON string, like the
+real capture), and the sheets themselves as loose files plus a truth table of
+their sprite rects. PNGs are written with zlib/struct only.
+
+    python benchmarks/synth_har.py -o /tmp/synth --entries 5000 --body-kb 64
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import struct
+import zlib
+
+# (mime type, extension, share of entries) - non-sheet bodies
+MIME_MIX = [
+    ("image/png", ".png", 0.35),
+    ("image/jpeg", ".jpg", 0.10),
+    ("audio/wav", ".wav", 0.10),
+    ("font/woff2", ".woff2", 0.05),
+    ("application/javascript", ".js", 0.20),
+    ("text/css", ".css", 0.10),
+    ("text/html", ".html", 0.10),
+]
+
+def png_bytes(width, height, rects=(), seed=0):
+    """RGBA PNG: transparent background with each (x, y, w, h) rect filled with opaque noise.
+
+    Noise rows repeat every 8 lines, so sheets compress somewhat like real art
+    instead of collapsing to nothing the way flat colour would.
+    """
+    rng = random.Random(seed)
+    stride = width * 4
+    rows = [bytearray(stride) for _ in range(height)]
+    for x, y, w, h in rects:
+        pattern = []
+        for _ in range(8):
+            span = bytearray(rng.randbytes(w * 4))
+            span[3::4] = b"\xff" * w
+            pattern.append(span)
+        for i, row in enumerate(rows[y:y + h]):
+            row[x * 4:(x + w) * 4] = pattern[i % 8]
+    raw = b"".join(b"\x00" + bytes(row) for row in rows)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 6))
+            + chunk(b"IEND", b""))
+
+def sheet_rects(sheet_size, count, rng):
+    """Non-overlapping sprite rects laid out on a shelf grid."""
+    cols = max(1, int(count ** 0.5 + 0.999))
+    cell = sheet_size // cols
+    rects = []
+    for i in range(count):
+        w = rng.randint(max(8, cell // 3), max(8, cell - 4))
+        h = rng.randint(max(8, cell // 3), max(8, cell - 4))
+        rects.append(((i % cols) * cell, (i // cols) * cell, w, h))
+    return rects
+
+def game_json(sheets):
+    """A game.json shaped like the real one: GameObjects with UIAtlas components."""
+    root = []
+    for sheet in sheets:
+        sprite_list = {name: {"x": x, "y": y, "width": w, "height": h, "borderLeft": 0, "borderRight": 0,
+                              "borderTop": 0, "borderBottom": 0, "paddingLeft": 0, "paddingRight": 0}
+                       for name, (x, y, w, h) in sheet["sprites"].items()}
+        root.append({"name": sheet["atlas"], "fileID": len(root) + 1, "activeSelf": True, "layer": 0,
+                     "components": [{"componentType": "UIAtlas", "fileID": 1000 + len(root), "enabled": True,
+                                     "serializableData": {"textureContent": {"fileID": 0, "guid": sheet["guid"]},
+                                                          "spriteList": sprite_list}}]})
+    return {"resources": [{"type": "GameObject", "id": hashlib.md5(b"synth").hexdigest(), "data": {"root": root}}]}
+
+def _entry(url, mime_type, text, encoding=None):
+    content = {"size": len(text), "mimeType": mime_type, "text": text}
+    if encoding:
+        content["encoding"] = encoding
+    return {
+        "startedDateTime": "2025-01-01T00:00:00.000Z",
+        "time": 1,
+        "request": {"method": "GET", "url": url, "httpVersion": "HTTP/1.1", "headers": []},
+        "response": {"status": 200, "statusText": "OK", "httpVersion": "HTTP/1.1", "headers": [],
+                     "content": content},
+    }
+
+def generate(out_dir, entries=500, body_kb=64, sheets=4, sprites_per_sheet=32, sheet_size=1024, seed=1):
+    """Write out_dir/synth.har, out_dir/sheets/*.png and out_dir/truth.json.
+
+    Returns a summary dict with the paths and the HAR size.
+    """
+    rng = random.Random(seed)
+    sheets_dir = os.path.join(out_dir, "sheets")
+    os.makedirs(sheets_dir, exist_ok=True)
+    host = "https://synth.example.com/game"
+
+    sheet_info = []
+    for i in range(sheets):
+        guid = hashlib.md5(f"sheet{seed}-{i}".encode()).hexdigest()
+        rects = sheet_rects(sheet_size, sprites_per_sheet, rng)
+        data = png_bytes(sheet_size, sheet_size, rects, seed=seed * 1000 + i)
+        filename = f"{guid}.png"
+        with open(os.path.join(sheets_dir, filename), 'wb') as f:
+            f.write(data)
+        sheet_info.append({"atlas": f"Atlas{i}", "guid": guid, "file": filename, "data": data,
+                           "sprites": {f"s_synth{i}_{j:03d}": rect for j, rect in enumerate(rects)}})
+
+    truth = {sheet["file"]: sheet["sprites"] for sheet in sheet_info}
+    with open(os.path.join(out_dir, "truth.json"), 'w', encoding='utf-8') as f:
+        json.dump(truth, f, indent=1)
+
+    har_path = os.path.join(out_dir, "synth.har")
+    mime_types, weights = [(m, ext) for m, ext, _ in MIME_MIX], [w for _, _, w in MIME_MIX]
+    # Written one entry at a time so multi-GB captures never sit in memory
+    with open(har_path, 'w', encoding='utf-8') as f:
+        f.write('{"log": {"version": "1.2", "creator": {"name": "synth_har", "version": "1"}, "entries": [\n')
+        first = True
+
+        def write(entry):
+            nonlocal first
+            f.write(("" if first else ",\n") + json.dumps(entry))
+            first = False
+
+        write(_entry(f"{host}/game.json", "application/json", json.dumps(game_json(sheet_info))))
+        for sheet in sheet_info:
+            write(_entry(f"{host}/textures/{sheet['file']}", "image/png",
+                         base64.b64encode(sheet["data"]).decode('ascii'), "base64"))
+        for i in range(max(0, entries - 1 - sheets)):
+            mime_type, ext = rng.choices(mime_types, weights)[0]
+            size = max(16, int(body_kb * 1024 * rng.uniform(0.5, 1.5)))
+            body = rng.randbytes(size)
+            # A few repeated URLs, like a capture with cache misses / retries
+            name = f"res_{rng.randrange(max(1, entries // 20))}" if rng.random() < 0.05 else f"res_{i}"
+            write(_entry(f"{host}/static/{name}{ext}", mime_type, base64.b64encode(body).decode('ascii'), "base64"))
+        f.write("\n]}}\n")
+
+    return {"har": har_path, "sheets_dir": sheets_dir, "truth": os.path.join(out_dir, "truth.json"),
+            "har_bytes": os.path.getsize(har_path), "entries": entries,
+            "sprites": sheets * sprites_per_sheet}
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic HAR capture and texture sheets")
+    parser.add_argument("-o", "--output", required=True, help="output directory")
+    parser.add_argument("--entries", type=int, default=500, help="HAR entries (default: 500)")
+    parser.add_argument("--body-kb", type=float, default=64, help="mean body size in KB (default: 64)")
+    parser.add_argument("--sheets", type=int, default=4, help="texture sheets (default: 4)")
+    parser.add_argument("--sprites", type=int, default=32, help="sprites per sheet (default: 32)")
+    parser.add_argument("--sheet-size", type=int, default=1024, help="sheet edge in pixels (default: 1024)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed (default: 1)")
+    args = parser.parse_args()
+
+    info = generate(args.output, args.entries, args.body_kb, args.sheets, args.sprites, args.sheet_size, args.seed)
+    print(f"✓ {info['har']}: {info['entries']} entries, {info['har_bytes'] / 1e6:.1f} MB, "
+          f"{info['sprites']} sprites on {args.sheets} sheets")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Build a content-hashed copy of the game shell in dist/.
+
+Every file in rebuild/sprites, rebuild/assets and rebuild/atlas, the sprites
+and atlases of each texture tier in rebuild/tiers (with its manifest.json),
+plus the root JS files, is copied to dist/ as name.<hash>.ext (sha256 of the
+contents). References in index.html and pixi-game.html are rewritten through
+the manifest. The pages also get:
+- window.ASSET_MANIFEST, so slot-engine.js resolves the names it builds at
+  runtime (assetUrl());
+- <link rel=preload> tags for the critical-path textures: the background and
+  the SYMBOLS files or their packed atlas. With texture tiers the engine only
+  knows which files it needs after reading the tier manifest, so that is
+  what gets preloaded.
+
+serve.py sends hashed names as immutable, so a repeat visit only
+revalidates the pages. dist/manifest.json remembers each source's size,
+mtime and hash, so re-runs only read files that changed and only copy the
+ones whose hash did.
+
+    python build_manifest.py
+    python serve.py --root dist
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import time
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(ROOT_DIR, "dist")
+ENGINE_JS = os.path.join(ROOT_DIR, "slot-engine.js")
+PAGES = ["index.html", "pixi-game.html"]
+ASSET_DIRS = ["rebuild/sprites", "rebuild/assets", "rebuild/atlas"]
+# build_tiers.py output: slot-engine.js loads each tier's sprites and atlas (not its assets)
+TIER_DIRS = ["rebuild/tiers/@*/sprites", "rebuild/tiers/@*/atlas"]
+TIER_MANIFEST = "rebuild/tiers/manifest.json"
+HASH_LENGTH = 10
+# serve.py --precompress sidecars: derived from a source, never assets of their own
+SIDECAR_SUFFIXES = (".gz", ".br")
+# Loaded by slot-engine.js through names it assembles itself
+RUNTIME_DIRS = ("rebuild/sprites/", "rebuild/atlas/", "rebuild/tiers/")
+# Loaded before first paint: by slot-engine.js's loadTextures(), or by a page's CSS
+CRITICAL_SPRITES = ["bg.png"]
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:HASH_LENGTH]
+
+def hashed_name(rel_path, digest):
+    head, ext = os.path.splitext(rel_path)
+    return f"{head}.{digest}{ext}"
+
+def source_files(root=ROOT_DIR):
+    """Relative (posix) paths of every file that gets a hashed copy."""
+    files = sorted(f for f in os.listdir(root) if f.endswith(".js"))
+    tier_dirs = sorted(os.path.relpath(d, root).replace(os.sep, "/")
+                       for pattern in TIER_DIRS for d in glob.glob(os.path.join(root, pattern)))
+    for rel_dir in ASSET_DIRS + tier_dirs:
+        directory = os.path.join(root, rel_dir)
+        if not os.path.isdir(directory):
+            continue
+        # Dotfiles are the asset store's blobs / manifest, not assets
+        files += [f"{rel_dir}/{f}" for f in sorted(os.listdir(directory))
+                  if not f.startswith(".") and not f.endswith(SIDECAR_SUFFIXES)
+                  and os.path.isfile(os.path.join(directory, f))]
+    if os.path.isfile(os.path.join(root, TIER_MANIFEST)):
+        files.append(TIER_MANIFEST)
+    return files
+
+def load_manifest(dist_dir):
+    path = os.path.join(dist_dir, "manifest.json")
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"files": {}}
+
+def _write_if_changed(path, data):
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+def _hashed_sibling(entries, rel_dir, name):
+    """Hashed file name for a name relative to an atlas directory (as atlas JSON refers to its files)."""
+    entry = entries.get(f"{rel_dir}/{name}")
+    return os.path.basename(entry["output"]) if entry else name
+
+def hash_files(files, previous, root, dist_dir):
+    """{source: entry}, copying only files whose content hash changed. Returns (entries, copied)."""
+    entries = {}
+    copied = 0
+    # Atlas JSON names its page image, so images go first and the JSON is rewritten after
+    # (page 0 lists the other pages' JSON, so it goes last)
+    atlas_json = sorted((f for f in files if posixpath.basename(posixpath.dirname(f)) == "atlas" and f.endswith(".json")),
+                        reverse=True)
+    for rel_path in [f for f in files if f not in atlas_json] + atlas_json:
+        source = os.path.join(root, rel_path)
+        st = os.stat(source)
+        old = previous.get(rel_path)
+        data = None
+        if rel_path in atlas_json:
+            with open(source, 'r', encoding='utf-8') as f:
+                sheet = json.load(f)
+            meta = sheet["meta"]
+            rel_dir = posixpath.dirname(rel_path)
+            meta["image"] = _hashed_sibling(entries, rel_dir, meta["image"])
+            if meta.get("related_multi_packs"):
+                meta["related_multi_packs"] = [_hashed_sibling(entries, rel_dir, name)
+                                               for name in meta["related_multi_packs"]]
+            data = json.dumps(sheet, indent=1).encode()
+            digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        elif old and (old["size"], old["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            digest = old["hash"]  # untouched since the last build: don't even read it
+        else:
+            digest = file_hash(source)
+
+        output = hashed_name(rel_path, digest)
+        target = os.path.join(dist_dir, output)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if data is not None:
+                with open(target, 'wb') as f:
+                    f.write(data)
+            else:
+                shutil.copy2(source, target)
+            copied += 1
+        if old and old["output"] != output and os.path.exists(os.path.join(dist_dir, old["output"])):
+            os.remove(os.path.join(dist_dir, old["output"]))
+        entries[rel_path] = {"hash": digest, "output": output, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    # Sources that are gone take their hashed copies with them
+    for rel_path, old in previous.items():
+        if rel_path not in entries and os.path.exists(os.path.join(dist_dir, old["output"])):
+            os.remove(os.path.join(dist_dir, old["output"]))
+    return entries, copied
+
+def critical_textures(entries, engine_page=True):
+    """Files needed before first paint: background, SYMBOLS files (or their packed atlas), or the tier manifest."""
+    with open(ENGINE_JS, 'r', encoding='utf-8') as f:
+        engine = f.read()
+    symbol_files = re.findall(r"file:\s*'([^']+)'", engine)
+    # An engine page fetches only what slot-engine.js names; a preload it never uses is a wasted download
+    critical = [f"rebuild/sprites/{name}" for name in CRITICAL_SPRITES
+                if not engine_page or f"'{name}'" in engine]
+    if engine_page and TIER_MANIFEST in entries:
+        # The tier (and so every texture URL) is picked at runtime from the manifest
+        return [TIER_MANIFEST]
+    atlas = [src for src in entries if re.match(r"rebuild/atlas/symbols-\d+\.(json|png)$", src)]
+    critical += (engine_page and atlas) or [f"rebuild/sprites/{name}" for name in symbol_files]
+    return [src for src in dict.fromkeys(critical) if src in entries]
+
+def build_page(page, entries, root):
+    """Page source with references rewritten and the manifest / preload tags injected."""
+    with open(os.path.join(root, page), 'r', encoding='utf-8', newline='') as f:
+        html = f.read()
+    newline = "\r\n" if "\r\n" in html else "\n"
+    uses_engine = "slot-engine.js" in html
+
+    # Longest names first so a path never matches inside a longer one
+    names = sorted(entries, key=len, reverse=True)
+    pattern = re.compile(r"(?<=[\"'(])(" + "|".join(map(re.escape, names)) + r")(?=[\"')?#])")
+    referenced = set(pattern.findall(html))
+    html = pattern.sub(lambda m: entries[m.group(1)]["output"], html)
+
+    tags = []
+    # slot-engine.js loads the atlas when there is one; a plain page only what its CSS names
+    critical = critical_textures(entries, engine_page=uses_engine)
+    # PIXI fetches its textures, CSS backgrounds are plain image loads: the preload has to match
+    for src in critical:
+        if not uses_engine and src not in referenced:
+            continue
+        href = entries[src]["output"]
+        if uses_engine:
+            tags.append(f'<link rel="preload" href="{href}" as="fetch" crossorigin="anonymous">')
+        elif src.endswith(".png"):
+            tags.append(f'<link rel="preload" href="{href}" as="image">')
+    if uses_engine:
+        runtime = {src: entry["output"] for src, entry in entries.items() if src.startswith(RUNTIME_DIRS)}
+        tags.append(f"<script>window.ASSET_MANIFEST = {json.dumps(runtime, separators=(',', ':'))};</script>")
+
+    # Right after the charset / viewport metas, before any script or stylesheet
+    anchor = re.search(r"<meta name=\"viewport\"[^>]*>", html) or re.search(r"<head>", html)
+    indent = "    "
+    injected = "".join(newline + indent + tag for tag in tags)
+    return html[:anchor.end()] + injected + html[anchor.end():]
+
+def build_manifest(root=ROOT_DIR, dist_dir=DIST_DIR):
+    start = time.perf_counter()
+    previous = load_manifest(dist_dir)["files"]
+    files = source_files(root)
+    entries, copied = hash_files(files, previous, root, dist_dir)
+    print(f"  ✓ {len(entries)} files hashed, {copied} copied ({len(entries) - copied} unchanged)")
+
+    for page in PAGES:
+        if not os.path.exists(os.path.join(root, page)):
+            continue
+        html = build_page(page, entries, root)
+        changed = _write_if_changed(os.path.join(dist_dir, page), html.encode('utf-8'))
+        print(f"  ✓ {page}{'' if changed else ' (unchanged)'}")
+
+    manifest = {"files": entries}
+    _write_if_changed(os.path.join(dist_dir, "manifest.json"), json.dumps(manifest, indent=1).encode())
+    print(f"\n✓ Built {dist_dir} in {time.perf_counter() - start:.2f}s")
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-hash the game shell into dist/ with preload hints")
+    parser.add_argument("-o", "--output", default=DIST_DIR, help=f"output directory (default: {DIST_DIR})")
+    args = parser.parse_args()
+    print("=== Building hashed game shell ===\n")
+    build_manifest(dist_dir=args.output)
+
+if __name__ == "__main__":
+    main()
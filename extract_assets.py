@@ -1,33 +1,62 @@
-
+import argparse
 import json
 import os
 import base64
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from urllib.parse import urlparse, unquote
 
-HAR_FILE = "demo.mortalsoft.net.har"
-OUTPUT_DIR = "rebuild/assets"
+from asset_store import AssetStore, file_digest, put_body, text_digest
+from har_stream import iter_har_entries, write_body
+from instrument import count, span
 
-def extract_assets():
-    if not os.path.exists(HAR_FILE):
-        print(f"Error: {HAR_FILE} not found. Please ensure it is in the current directory.")
-        return
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+HAR_FILE = os.path.join(ROOT_DIR, "demo.mortalsoft.net.har")
+OUTPUT_DIR = os.path.join(ROOT_DIR, "rebuild", "assets")
+
+def is_asset(request_url, mime_type):
+    """Filter for interesting assets"""
+    return 'image' in mime_type or 'audio' in mime_type or 'font' in mime_type or request_url.endswith('.json')
+
+def asset_filename(request_url, count):
+    """Parse filename from URL"""
+    parsed_url = urlparse(request_url)
+    path = unquote(parsed_url.path)
+    filename = os.path.basename(path)
+    if not filename:
+        filename = f"asset_{count}"
+    return filename
 
-    print(f"Loading HAR file: {HAR_FILE}...")
+def load_entries(har_file):
+    """Load all entries at once (original behaviour)."""
+    print(f"Loading HAR file: {har_file}...")
     try:
-        with open(HAR_FILE, 'r', encoding='utf-8', errors='ignore') as f:
+        with span("har.load", bytes=os.path.getsize(har_file)), \
+                open(har_file, 'r', encoding='utf-8', errors='ignore') as f:
             data = json.load(f)
     except Exception as e:
         print(f"Error reading HAR JSON: {e}")
-        return
-
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+        return None
 
     entries = data.get('log', {}).get('entries', [])
     print(f"Found {len(entries)} entries in HAR.")
+    return entries
+
+PlannedAsset = namedtuple("PlannedAsset", "index filename mime_type save_path text encoding request_url")
 
+def plan_assets(entries, output_dir, reuse=None):
+    """Pick the entries worth saving and assign their output paths.
+
+    Naming runs here, in entry order, so the count-based collision names
+    never depend on which worker finishes first. reuse maps URLs to the
+    names they were given by a previous run.
+    """
+    reuse = reuse or {}
+    claimed = set()
     count = 0
-    for entry in entries:
+    for index, entry in enumerate(entries):
         request_url = entry['request']['url']
         response = entry['response']
         content = response.get('content', {})
@@ -35,42 +64,206 @@ def extract_assets():
         text = content.get('text', '')
         encoding = content.get('encoding', '')
 
-        # Filter for interesting assets
-        if 'image' in mime_type or 'audio' in mime_type or 'font' in mime_type or request_url.endswith('.json'):
+        if is_asset(request_url, mime_type):
             if not text:
                 continue
 
-            # Parse filename from URL
-            parsed_url = urlparse(request_url)
-            path = unquote(parsed_url.path)
-            filename = os.path.basename(path)
-            if not filename:
-                filename = f"asset_{count}"
-            
+            filename = asset_filename(request_url, count)
+
             # Optional: Keep directory structure? For simplicity, let's flatten or use minimal folders.
             # Let's try to match the "desktop/images" structure if possible, but for rebuild, flat might be easier initially.
             # We will save everything to output_dir, preserving subfolders relative to game root if we can detect them.
-            
+
             # Simple approach: Save by filename. If collision, append index.
-            save_path = os.path.join(OUTPUT_DIR, filename)
-            if os.path.exists(save_path):
-                 save_path = os.path.join(OUTPUT_DIR, f"{count}_{filename}")
+            save_path = os.path.join(output_dir, filename)
+            previous = [os.path.join(output_dir, name) for name in reuse.get(request_url, ())]
+            previous = [path for path in previous if path not in claimed]
+            if previous:
+                save_path = previous[0]
+            elif save_path in claimed or os.path.exists(save_path):
+                 save_path = os.path.join(output_dir, f"{count}_{filename}")
+            claimed.add(save_path)
+
+            yield PlannedAsset(index, filename, mime_type, save_path, text, encoding, request_url)
+            count += 1
+
+def save_asset(save_path, text, encoding, stream=False):
+    """Decode one body and write it to save_path. Returns bytes written.
+
+    Written to a temp file and renamed over save_path: after a --dedupe run the
+    name is a hardlink to a shared blob, and writing through it would change
+    the blob and every other name linked to it.
+    """
+    tmp_path = f"{save_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f_out:
+            if stream:
+                # Chunked base64 straight to disk, no full decoded copy
+                written = write_body(text, encoding, f_out)
+            else:
+                file_data = base64.b64decode(text) if encoding == 'base64' else text.encode('utf-8')
+                f_out.write(file_data)
+                written = len(file_data)
+        os.replace(tmp_path, save_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return written
 
-            try:
-                if encoding == 'base64':
-                    file_data = base64.b64decode(text)
+def _save_job(job):
+    """Worker entry point.
+
+    job is (save_path, text, encoding, stream, store_root). Returns
+    (bytes, digest, error); with a store_root the body goes into the
+    content-addressed store and bytes is 0 when the blob already existed.
+    """
+    save_path, text, encoding, stream, store_root = job
+    count("asset.bytes_in", len(text))
+    try:
+        with span("asset.save", asset=os.path.basename(save_path), encoding=encoding) as s:
+            if store_root:
+                digest, size, wrote = put_body(store_root, text, encoding)
+                written = size if wrote else 0
+            else:
+                digest, written = None, save_asset(save_path, text, encoding, stream)
+            s.set(bytes=written)
+        count("asset.bytes_out", written)
+        return written, digest, None
+    except Exception as e:
+        return 0, None, str(e)
+
+def _run_parallel(planned, workers, executor_kind, stream, store_root):
+    """Decode and write on a pool, yielding results back in plan order."""
+    pool_cls = ProcessPoolExecutor if executor_kind == "process" else ThreadPoolExecutor
+    max_pending = workers * 4  # bounds memory to a few bodies per worker
+    pending = deque()
+    with pool_cls(max_workers=workers) as pool:
+        for asset in planned:
+            future = pool.submit(_save_job, (asset.save_path, asset.text, asset.encoding, stream, store_root))
+            pending.append((asset, future))
+            if len(pending) >= max_pending:
+                asset, future = pending.popleft()
+                yield (asset,) + future.result()
+        while pending:
+            asset, future = pending.popleft()
+            yield (asset,) + future.result()
+
+def extract_assets(har_file=HAR_FILE, output_dir=OUTPUT_DIR, stream=False, workers=1, executor_kind="thread",
+                   dedupe=False, incremental=False, prune=False):
+    if prune and not incremental:
+        raise ValueError("prune needs incremental: only an incremental run knows which entries are gone")
+    if not os.path.exists(har_file):
+        print(f"Error: {har_file} not found. Please ensure it is in the current directory.")
+        return
+
+    start = time.perf_counter()
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    # The manifest backs both the content store and incremental re-runs
+    store = AssetStore(output_dir) if dedupe or incremental else None
+    store_root = output_dir if dedupe else None
+    if incremental and store.har_unchanged(har_file, dedupe):
+        print(f"No changes: {har_file} matches the manifest and all {len(store.assets)} outputs exist.")
+        return
+
+    if stream:
+        # Walk log.entries incrementally; only one entry is ever held in memory
+        print(f"Streaming HAR file: {har_file}...")
+        entries = iter_har_entries(har_file)
+    else:
+        entries = load_entries(har_file)
+        if entries is None:
+            return
+
+    planned = plan_assets(entries, output_dir, reuse=store.names_by_url() if store else None)
+    seen = set()
+    unchanged = 0
+    if incremental:
+        def changed(planned):
+            # Compare the still-encoded body against the manifest; no decode needed
+            nonlocal unchanged
+            for asset in planned:
+                name = os.path.basename(asset.save_path)
+                seen.add(name)
+                if store.is_current(name, asset.request_url, text_digest(asset.text)):
+                    unchanged += 1
+                    continue
+                yield asset
+        planned = changed(planned)
+
+    if workers > 1:
+        print(f"Extracting with {workers} {executor_kind} workers...")
+        results = _run_parallel(planned, workers, executor_kind, stream, store_root)
+    else:
+        results = ((asset,) + _save_job((asset.save_path, asset.text, asset.encoding, stream, store_root))
+                   for asset in planned)
+
+    count = 0
+    total_bytes = 0
+    blobs_written = 0
+    for asset, written, digest, error in results:
+        if error:
+            print(f"Failed to save {asset.filename}: {error}")
+            continue
+        if store:
+            name = os.path.basename(asset.save_path)
+            if dedupe:
+                store.link(name, digest)
+            else:
+                # Plain files too get a content digest, so the manifest can verify them
+                digest = file_digest(asset.save_path)
+            store.record(name, asset.request_url, digest, os.path.getsize(asset.save_path), asset.mime_type,
+                         text_digest=text_digest(asset.text) if incremental else None, entry=asset.index)
+            if dedupe:
+                if written:
+                    blobs_written += 1
                 else:
-                    file_data = text.encode('utf-8')
+                    print(f"Linked: {asset.filename} (already stored)")
+                    count += 1
+                    continue
+        print(f"Saved: {asset.filename} ({asset.mime_type})")
+        count += 1
+        total_bytes += written
 
-                with open(save_path, 'wb') as f_out:
-                    f_out.write(file_data)
-                
-                print(f"Saved: {filename} ({mime_type})")
-                count += 1
-            except Exception as e:
-                print(f"Failed to save {filename}: {e}")
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"Extraction complete. Saved {count} assets to {output_dir}")
+    if incremental:
+        print(f"Incremental: {unchanged} unchanged entries skipped")
+        if prune:
+            removed = store.prune(seen)
+            print(f"Pruned {len(removed)} outputs whose entries are gone")
+        store.set_har(har_file, dedupe)
+    if store:
+        store.save()
+    if dedupe:
+        print(f"Content store: {blobs_written} new blobs, {count - blobs_written} deduplicated")
+    print(f"Throughput: {count / elapsed:.1f} entries/s, "
+          f"{total_bytes / elapsed / 1e6:.2f} MB/s ({total_bytes / 1e6:.2f} MB in {elapsed:.2f}s)")
 
-    print(f"Extraction complete. Saved {count} assets to {OUTPUT_DIR}")
+def main():
+    parser = argparse.ArgumentParser(description="Extract game assets from a HAR capture")
+    parser.add_argument("har", nargs="?", default=HAR_FILE, help=f"HAR file (default: {HAR_FILE})")
+    parser.add_argument("-o", "--output", default=OUTPUT_DIR, help=f"output directory (default: {OUTPUT_DIR})")
+    parser.add_argument("--stream", action="store_true",
+                        help="parse log.entries incrementally with constant memory")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="decode/write assets on N workers (default: 1, serial)")
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread",
+                        help="worker pool type for --workers (default: thread)")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="store bodies by content digest and link readable names to them")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip entries whose body is unchanged since the last run")
+    parser.add_argument("--prune", action="store_true",
+                        help="with --incremental, delete outputs whose entries are gone")
+    args = parser.parse_args()
+    if args.prune and not args.incremental:
+        parser.error("--prune only works with --incremental")
+    with span("extract_assets", har=args.har, stream=args.stream, workers=args.workers):
+        extract_assets(args.har, args.output, stream=args.stream,
+                       workers=args.workers, executor_kind=args.executor, dedupe=args.dedupe,
+                       incremental=args.incremental, prune=args.prune)
 
 if __name__ == "__main__":
-    extract_assets()
+    main()
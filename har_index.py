@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+SQLite index over any number of HAR captures.
+
+Each capture is walked once with iter_har_entries(with_offsets=True). Every
+entry becomes one row: URL, host, file name, mime, status, decoded size,
+sha256 of the decoded body (the same digest asset_store.py names its blobs
+with), start time, total time, and the entry's byte offset/length in the
+HAR. Bodies are never copied into the database. `extract` and body() seek
+to the recorded offset and decode just that entry, so queries and selective
+extraction never load a HAR again.
+
+A capture whose size and mtime are unchanged is skipped on re-add; one that
+changed is re-indexed in place.
+
+    python har_index.py add demo.mortalsoft.net.har other/*.har
+    python har_index.py query --mime image --min-size 100000
+    python har_index.py which rebuild/assets/bg.png
+    python har_index.py extract --name "%symbol%" -o /tmp/symbols
+"""
+import argparse
+import itertools
+import json
+import os
+import sqlite3
+import time
+from urllib.parse import unquote, urlparse
+
+from asset_store import body_digest, file_digest
+from extract_assets import asset_filename, is_asset
+from har_stream import iter_har_entries, write_body
+from instrument import count, span
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_DB = os.path.join(ROOT_DIR, "har_index.sqlite")
+BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    entries INTEGER NOT NULL DEFAULT 0,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    capture_id INTEGER NOT NULL REFERENCES captures(id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    host TEXT,
+    name TEXT,
+    method TEXT,
+    status INTEGER,
+    mime TEXT,
+    encoding TEXT,
+    size INTEGER,
+    digest TEXT,
+    started TEXT,
+    time_ms REAL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_capture ON entries(capture_id, idx);
+CREATE INDEX IF NOT EXISTS entries_digest ON entries(digest);
+CREATE INDEX IF NOT EXISTS entries_name ON entries(name);
+CREATE INDEX IF NOT EXISTS entries_mime ON entries(mime);
+CREATE INDEX IF NOT EXISTS entries_host ON entries(host);
+CREATE INDEX IF NOT EXISTS entries_size ON entries(size);
+"""
+
+COLUMNS = ("capture_id", "idx", "url", "host", "name", "method", "status", "mime", "encoding",
+           "size", "digest", "started", "time_ms", "offset", "length")
+
+
+def connect(db_path=INDEX_DB):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def entry_row(capture_id, idx, offset, length, entry):
+    """Column values for one HAR entry (body hashed, not kept)."""
+    request = entry.get('request', {})
+    response = entry.get('response', {})
+    content = response.get('content', {})
+    url = request.get('url', '')
+    text = content.get('text')
+    encoding = content.get('encoding')
+    digest, size = body_digest(text, encoding) if text is not None else (None, content.get('size'))
+    parsed = urlparse(url)
+    return (capture_id, idx, url, parsed.hostname, os.path.basename(unquote(parsed.path)) or None,
+            request.get('method'), response.get('status'), content.get('mimeType', '').split(';')[0] or None,
+            encoding if text is not None else None, size, digest, entry.get('startedDateTime'),
+            entry.get('time'), offset, length)
+
+
+def add_capture(conn, har_path, force=False):
+    """Index one HAR. Returns the number of entries indexed, or None if it was already current."""
+    path = os.path.abspath(har_path)
+    st = os.stat(path)
+    row = conn.execute("SELECT id, size, mtime_ns FROM captures WHERE path = ?", (path,)).fetchone()
+    if row and not force and (row["size"], row["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+        return None
+
+    with span("har_index.add", har=os.path.basename(path), bytes=st.st_size), conn:
+        if row:
+            conn.execute("DELETE FROM captures WHERE id = ?", (row["id"],))
+        capture_id = conn.execute(
+            "INSERT INTO captures (path, size, mtime_ns, indexed_at) VALUES (?, ?, ?, ?)",
+            (path, st.st_size, st.st_mtime_ns, time.time())).lastrowid
+        insert = f"INSERT INTO entries ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        batch = []
+        indexed = 0
+        for idx, (offset, length, entry) in enumerate(iter_har_entries(path, with_offsets=True)):
+            batch.append(entry_row(capture_id, idx, offset, length, entry))
+            if len(batch) >= BATCH_SIZE:
+                conn.executemany(insert, batch)
+                indexed += len(batch)
+                batch = []
+        conn.executemany(insert, batch)
+        indexed += len(batch)
+        conn.execute("UPDATE captures SET entries = ? WHERE id = ?", (indexed, capture_id))
+    count("har_index.entries", indexed)
+    return indexed
+
+
+def _like(pattern):
+    """LIKE pattern: used as-is when it contains %, else a literal substring (_ is not a wildcard)."""
+    if "%" in pattern:
+        return pattern
+    return "%" + pattern.replace("\\", "\\\\").replace("_", "\\_") + "%"
+
+
+def find(conn, name=None, url=None, mime=None, host=None, min_size=None, digest=None, capture=None,
+         assets_only=False, limit=None):
+    """Matching entries joined with their capture. name/url: substrings, or LIKE patterns with %."""
+    where, params = [], []
+    for column, pattern in (("e.name", name), ("e.url", url)):
+        if pattern:
+            where.append(f"{column} LIKE ? ESCAPE '\\'")
+            params.append(_like(pattern))
+    if mime:
+        where.append("e.mime LIKE ?")
+        params.append(f"{mime}%")
+    if host:
+        where.append("e.host = ?")
+        params.append(host)
+    if min_size:
+        where.append("e.size >= ?")
+        params.append(min_size)
+    if digest:
+        digest = digest.lower()
+        if len(digest) == 64:
+            where.append("e.digest = ?")
+            params.append(digest)
+        else:
+            # A prefix as a range, so entries_digest is still used (digests are lowercase hex)
+            where.append("e.digest >= ? AND e.digest < ?")
+            params += [digest, digest + "g"]
+    if capture:
+        where.append("c.path LIKE ?")
+        params.append(f"%{capture}%")
+    sql = ("SELECT e.*, c.path AS har, c.size AS har_size, c.mtime_ns AS har_mtime_ns "
+           "FROM entries e JOIN captures c ON c.id = e.capture_id")
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY c.id, e.idx"
+    if not assets_only:
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return conn.execute(sql, params).fetchall()
+    # is_asset has no SQL form: filter the cursor, then stop at the limit
+    rows = (r for r in conn.execute(sql, params) if is_asset(r["url"], r["mime"] or ""))
+    return list(itertools.islice(rows, int(limit) if limit else None))
+
+
+def capture_changed(row):
+    """Why the row's HAR can no longer be read at its stored offsets, or None if it still matches."""
+    try:
+        st = os.stat(row["har"])
+    except OSError:
+        return "missing"
+    if (st.st_size, st.st_mtime_ns) != (row["har_size"], row["har_mtime_ns"]):
+        return "changed since it was indexed"
+    return None
+
+
+def read_entry_at(har_path, offset, length):
+    """Re-read a single entry located by iter_har_entries(with_offsets=True)."""
+    with open(har_path, 'rb') as f:
+        f.seek(offset)
+        raw = f.read(length)
+    return json.loads(raw.decode('utf-8', errors='ignore'))
+
+
+def body_text(row):
+    """(content.text, encoding) of an indexed entry, read from its HAR on demand."""
+    reason = capture_changed(row)
+    if reason:
+        raise ValueError(f"{row['har']} is {reason}: re-run add")
+    entry = read_entry_at(row["har"], row["offset"], row["length"])
+    content = entry.get('response', {}).get('content', {})
+    return content.get('text'), content.get('encoding')
+
+
+def extract(rows, output_dir):
+    """Write the bodies of rows into output_dir. Returns (files written, bytes).
+
+    Rows from a HAR that changed after it was indexed are skipped: their
+    offsets no longer point at their entries.
+    """
+    stale = {}
+    for har in {row["har"]: row for row in rows}.values():
+        reason = capture_changed(har)
+        if reason:
+            stale[har["har"]] = reason
+            print(f"  ✗ {har['har']} is {reason}: re-run add (its entries are skipped)")
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = total = 0
+    names = set()
+    for row in rows:
+        if row["har"] in stale:
+            continue
+        text, encoding = body_text(row)
+        if text is None:
+            continue
+        filename = asset_filename(row["url"], row["id"])
+        if filename in names:
+            filename = f"{row['id']}_{filename}"
+        names.add(filename)
+        with open(os.path.join(output_dir, filename), 'wb') as f_out:
+            total += write_body(text, encoding, f_out)
+        written += 1
+    return written, total
+
+
+def print_rows(rows):
+    for row in rows:
+        size = f"{row['size'] / 1024:.0f} KB" if row["size"] is not None else "-"
+        print(f"  {row['id']:>6}  {row['status'] or '-':>3}  {size:>9}  {(row['mime'] or '-'):<24}  {row['url']}")
+
+
+def print_stats(conn):
+    for row in conn.execute("SELECT path, entries, size FROM captures ORDER BY id"):
+        print(f"  {row['entries']:>6} entries  {row['size'] / 1e6:>8.1f} MB  {row['path']}")
+    print()
+    for row in conn.execute("SELECT mime, COUNT(*) AS n, SUM(size) AS bytes, COUNT(DISTINCT digest) AS uniq "
+                            "FROM entries GROUP BY mime ORDER BY bytes DESC"):
+        print(f"  {(row['mime'] or '-'):<32} {row['n']:>6} entries {row['uniq']:>6} unique "
+              f"{(row['bytes'] or 0) / 1e6:>8.1f} MB")
+
+
+def _add_filters(parser):
+    parser.add_argument("--name", help="file name LIKE pattern (substring, or a LIKE pattern if it has %%)")
+    parser.add_argument("--url", help="URL LIKE pattern (substring, or a LIKE pattern if it has %%)")
+    parser.add_argument("--mime", help="mime type prefix, e.g. image or audio/ogg")
+    parser.add_argument("--host", help="exact host name")
+    parser.add_argument("--min-size", type=int, help="minimum decoded body size in bytes")
+    parser.add_argument("--digest", help="sha256 prefix of the decoded body")
+    parser.add_argument("--capture", help="substring of the HAR path")
+    parser.add_argument("--assets", action="store_true", help="only entries extract_assets.py would keep")
+    parser.add_argument("--limit", type=int, help="at most this many rows")
+
+
+def _filters(args):
+    return dict(name=args.name, url=args.url, mime=args.mime, host=args.host, min_size=args.min_size,
+                digest=args.digest, capture=args.capture, assets_only=args.assets, limit=args.limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index HAR captures in SQLite; query and extract without re-parsing")
+    parser.add_argument("--db", default=INDEX_DB, help=f"index database (default: {INDEX_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="index HAR files (unchanged ones are skipped)")
+    add.add_argument("hars", nargs="+")
+    add.add_argument("--force", action="store_true", help="re-index even if size and mtime match")
+
+    query = commands.add_parser("query", help="list matching entries")
+    _add_filters(query)
+
+    which = commands.add_parser("which", help="captures and URLs holding the same bytes as a local file")
+    which.add_argument("files", nargs="+")
+
+    ext = commands.add_parser("extract", help="write the bodies of matching entries")
+    _add_filters(ext)
+    ext.add_argument("-o", "--output", required=True, help="output directory")
+
+    commands.add_parser("stats", help="per-capture and per-mime totals")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    start = time.perf_counter()
+    if args.command == "add":
+        print("=== Indexing HAR captures ===\n")
+        for har in args.hars:
+            t0 = time.perf_counter()
+            indexed = add_capture(conn, har, args.force)
+            if indexed is None:
+                print(f"  ✓ {har}: unchanged")
+            else:
+                print(f"  ✓ {har}: {indexed} entries in {time.perf_counter() - t0:.2f}s")
+    elif args.command == "query":
+        rows = find(conn, **_filters(args))
+        print_rows(rows)
+        print(f"\n  {len(rows)} entries in {(time.perf_counter() - start) * 1000:.1f} ms")
+    elif args.command == "which":
+        for path in args.files:
+            rows = find(conn, digest=file_digest(path))
+            if not rows:
+                print(f"  ✗ {path}: not in any indexed capture")
+            for row in rows:
+                print(f"  ✓ {path}: {row['har']} #{row['idx']} {row['url']}")
+    elif args.command == "extract":
+        rows = find(conn, **_filters(args))
+        written, total = extract(rows, args.output)
+        print(f"  ✓ {written} files, {total / 1e6:.2f} MB -> {args.output} "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    elif args.command == "stats":
+        print_stats(conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Incremental HAR reader.
+
+Walks log.entries one entry at a time instead of json.load-ing the whole
+capture, so memory stays bounded by the largest single entry no matter how
+big the HAR grows.
+"""
+import base64
+import json
+import re
+
+from instrument import count, span
+
+CHUNK_SIZE = 1 << 20
+# Must stay a multiple of 4 so every slice is a complete base64 quantum
+B64_CHUNK = 4 << 18
+
+_STRUCTURAL = re.compile(rb'["{}\[\]]')
+_ENTRIES_DEPTH = 3  # root object -> "log" object -> "entries" array
+
+
+def iter_har_entries(har_path, chunk_size=CHUNK_SIZE, with_offsets=False):
+    """Yield HAR entries one by one while reading the file in chunks.
+
+    With with_offsets=True yields (offset, length, entry) where offset/length
+    locate the raw entry object in the file, so it can be re-read later.
+    """
+    with open(har_path, 'rb') as f:
+        buf = bytearray()
+        base = 0          # file offset of buf[0]
+        pos = 0
+        depth = 0
+        in_string = False
+        string_start = 0
+        last_key = None
+        in_entries = False
+        entry_start = None
+
+        while True:
+            if pos >= len(buf):
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                # Drop everything that can no longer be part of a pending token
+                if entry_start is not None:
+                    keep = entry_start
+                elif in_string:
+                    keep = string_start
+                else:
+                    keep = pos
+                # In place: an entry spanning many chunks is not re-copied per chunk
+                del buf[:keep]
+                buf += chunk
+                base += keep
+                pos -= keep
+                string_start -= keep
+                if entry_start is not None:
+                    entry_start -= keep
+
+            if in_string:
+                j = buf.find(b'"', pos)
+                if j < 0:
+                    pos = len(buf)
+                    continue
+                k = j - 1
+                while k > string_start and buf[k] == 0x5C:
+                    k -= 1
+                pos = j + 1
+                if (j - 1 - k) % 2:
+                    continue  # escaped quote
+                in_string = False
+                if not in_entries and depth == 2:
+                    last_key = buf[string_start + 1:j]
+                continue
+
+            m = _STRUCTURAL.search(buf, pos)
+            if not m:
+                pos = len(buf)
+                continue
+            c = buf[m.start()]
+            pos = m.end()
+
+            if c == 0x22:  # "
+                in_string = True
+                string_start = m.start()
+            elif c in (0x7B, 0x5B):  # { [
+                depth += 1
+                if in_entries:
+                    if depth == _ENTRIES_DEPTH + 1 and c == 0x7B:
+                        entry_start = m.start()
+                elif c == 0x5B and depth == _ENTRIES_DEPTH and last_key == b'entries':
+                    in_entries = True
+            else:  # } ]
+                depth -= 1
+                if not in_entries:
+                    continue
+                if depth == _ENTRIES_DEPTH and entry_start is not None:
+                    raw = buf[entry_start:pos]
+                    with span("har.parse_entry", bytes=len(raw)):
+                        entry = json.loads(raw.decode('utf-8', errors='ignore'))
+                    count("har.bytes_parsed", len(raw))
+                    if with_offsets:
+                        yield base + entry_start, len(raw), entry
+                    else:
+                        yield entry
+                    entry_start = None
+                elif depth < _ENTRIES_DEPTH:
+                    return
+
+
+def iter_body(text, encoding):
+    """Yield the decoded bytes of a content.text body in bounded slices."""
+    if encoding != 'base64':
+        yield text.encode('utf-8')
+    elif '\n' in text or '\r' in text or ' ' in text:
+        # Wrapped bodies don't split on 4-char boundaries; decode in one shot
+        yield base64.b64decode(text)
+    else:
+        for i in range(0, len(text), B64_CHUNK):
+            yield base64.b64decode(text[i:i + B64_CHUNK])
+
+
+def write_body(text, encoding, f_out):
+    """Decode a content.text body into f_out. Returns the bytes written."""
+    written = 0
+    for data in iter_body(text, encoding):
+        f_out.write(data)
+        written += len(data)
+    return written
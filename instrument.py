@@ -0,0 +1,232 @@
+"""
+Opt-in instrumentation for the extraction and rebuild tools.
+
+Timed spans and byte counters are recorded only when a trace file is set;
+otherwise span() hands back a shared no-op object and count() returns at
+once, so instrumented code costs a function call.
+
+    REBUILD_TRACE=run.json     Chrome trace (chrome://tracing, ui.perfetto.dev)
+    REBUILD_TRACE=run.jsonl    one JSON event per line
+    REBUILD_PROFILE=run.prof   cProfile the main process (pstats / snakeviz)
+    REBUILD_TRACEMALLOC=10     tracemalloc; print the top N allocation sites
+
+Worker processes inherit the environment and append their events to the same
+file, so a parallel run shows up as one trace with a row per process. The
+Chrome file uses the JSON array format, whose closing bracket is optional.
+
+    with span("decode", texture=name):
+        img.load()
+    count("bytes_out", len(data))
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+TRACE_ENV = "REBUILD_TRACE"
+PROFILE_ENV = "REBUILD_PROFILE"
+TRACEMALLOC_ENV = "REBUILD_TRACEMALLOC"
+OWNER_ENV = "REBUILD_TRACE_OWNER"
+FLUSH_EVERY = 1000
+
+ENABLED = False
+
+_trace_path = None
+_chrome = False
+_events = []
+_counters = {}
+_totals = {}  # span name -> [calls, seconds]
+_owner = False
+_profiler = None
+_tracemalloc_top = 0
+_worker_flush_registered = False
+_lock = threading.Lock()
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+_NULL = _NullSpan()
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def set(self, **args):
+        """Attach values known only once the work is done (sizes, counts...)."""
+        self.args.update(args)
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        event = {"name": self.name, "ph": "X", "ts": round(self.start * 1e6, 1),
+                 "dur": round((end - self.start) * 1e6, 1), "pid": os.getpid(),
+                 "tid": threading.get_ident() & 0xFFFFFFFF}
+        if self.args:
+            event["args"] = self.args
+        with _lock:
+            _events.append(event)
+            total = _totals.setdefault(self.name, [0, 0.0])
+            total[0] += 1
+            total[1] += end - self.start
+        if not _owner and not _worker_flush_registered:
+            _register_worker_flush()
+        if len(_events) >= FLUSH_EVERY:
+            flush()
+        return False
+
+def _register_worker_flush():
+    # Pool workers leave via os._exit() and never run atexit, but multiprocessing
+    # runs its finalizers first. Registered lazily: a fresh worker clears them at startup.
+    global _worker_flush_registered
+    _worker_flush_registered = True
+    from multiprocessing import util
+    util.Finalize(None, flush, exitpriority=10)
+
+def span(name, **args):
+    """Context manager timing one stage or item. No-op unless tracing is on."""
+    if not ENABLED:
+        return _NULL
+    return _Span(name, args)
+
+def count(name, value=1):
+    """Add to a named counter (bytes in/out, items...). No-op unless tracing is on."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def flush():
+    """Append buffered events (and current counter values) to the trace file."""
+    if not _trace_path:
+        return
+    with _lock:
+        events = _events[:]
+        del _events[:]
+        if _counters:
+            events.append({"name": "counters", "ph": "C", "ts": round(time.perf_counter() * 1e6, 1),
+                           "pid": os.getpid(), "tid": 0, "args": dict(_counters)})
+    if not events:
+        return
+    suffix = ",\n" if _chrome else "\n"
+    data = "".join(json.dumps(event, separators=(',', ':')) + suffix for event in events).encode()
+    # One O_APPEND write per flush keeps lines from different processes whole
+    fd = os.open(_trace_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+def summary():
+    """{span name: (calls, seconds)} and counters recorded in this process."""
+    with _lock:
+        return {name: tuple(total) for name, total in _totals.items()}, dict(_counters)
+
+def _report():
+    flush()
+    totals, counters = summary()
+    out = sys.stderr
+    if totals:
+        print("\n  Span                          calls      total", file=out)
+        for name, (calls, seconds) in sorted(totals.items(), key=lambda item: -item[1][1]):
+            print(f"  {name:<28} {calls:>7} {seconds * 1000:>9.1f}ms", file=out)
+    for name, value in sorted(counters.items()):
+        print(f"  {name:<28} {value:>17,}", file=out)
+    if _trace_path:
+        print(f"  Trace: {_trace_path}", file=out)
+
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(os.environ[PROFILE_ENV])
+        print(f"  Profile: {os.environ[PROFILE_ENV]}", file=out)
+    if _tracemalloc_top:
+        import tracemalloc
+        current, peak = tracemalloc.get_traced_memory()
+        print(f"\n  tracemalloc: peak {peak / 1e6:.1f} MB, current {current / 1e6:.1f} MB", file=out)
+        for stat in tracemalloc.take_snapshot().statistics("lineno")[:_tracemalloc_top]:
+            print(f"    {stat}", file=out)
+
+def _label_process():
+    """Name this process's row in the trace viewer."""
+    name = os.path.basename(sys.argv[0]) if _owner else f"worker {os.getpid()}"
+    with _lock:
+        _events.append({"name": "process_name", "ph": "M", "pid": os.getpid(), "tid": 0, "args": {"name": name}})
+
+def configure(trace=None, profile=None, tracemalloc_top=None):
+    """Enable from arguments, falling back to the REBUILD_* environment variables."""
+    global ENABLED, _trace_path, _chrome, _owner, _profiler, _tracemalloc_top
+    trace = trace or os.environ.get(TRACE_ENV)
+    profile = profile or os.environ.get(PROFILE_ENV)
+    tracemalloc_top = tracemalloc_top or int(os.environ.get(TRACEMALLOC_ENV) or 0)
+    if not (trace or profile or tracemalloc_top):
+        return
+
+    # The first process to configure owns the file; workers it spawns only append
+    owner_pid = os.environ.get(OWNER_ENV)
+    _owner = owner_pid is None or owner_pid == str(os.getpid())
+    if _owner:
+        os.environ[OWNER_ENV] = str(os.getpid())
+
+    if trace:
+        ENABLED = True
+        _trace_path = os.path.abspath(trace)
+        os.environ[TRACE_ENV] = _trace_path
+        _chrome = not _trace_path.endswith(".jsonl")
+        if _owner:
+            with open(_trace_path, 'w', encoding='utf-8') as f:
+                f.write("[\n" if _chrome else "")
+        _label_process()
+
+    if not _owner:
+        return
+    if profile:
+        import cProfile
+        os.environ[PROFILE_ENV] = profile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    if tracemalloc_top:
+        import tracemalloc
+        _tracemalloc_top = tracemalloc_top
+        tracemalloc.start()
+    atexit.register(_report)
+
+def _after_fork():
+    # A forked worker starts with a copy of the parent's buffers: drop them. The
+    # lock may have been held by another parent thread at fork time, so it gets
+    # a fresh one rather than being acquired.
+    global _owner, _profiler, _tracemalloc_top, _worker_flush_registered, _lock
+    _lock = threading.Lock()
+    _events.clear()
+    _counters.clear()
+    _totals.clear()
+    _owner = False
+    _worker_flush_registered = False
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler = None
+    _tracemalloc_top = 0
+    if ENABLED:
+        _label_process()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+configure()
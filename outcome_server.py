@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Local spin-outcome service speaking the mock_server.js protocol.
+
+Messages are the same JSON objects mock_server.js answers ({type: 'login'},
+{type: 'balance'}, {type: 'spin', bet: 1.0}, ...), served over a WebSocket at
+/ws and as plain HTTP POSTs to /api. Spins follow generateResults() /
+checkWins() exactly (paytable.py reads slot-engine.js).
+
+Outcomes are generated off the request path: rtp_sim.generate_outcomes()
+fills batches in a worker thread, and a spin just takes the next pre-scored,
+pre-encoded outcome from the ring. Everything else runs on one event loop, so
+per-session balances are plain dict entries updated without locks. Money is
+kept as integers (1/1000 of a dollar with the current paytable), so balances
+never drift.
+
+    python outcome_server.py --port 8090
+    curl -d '{"type":"login"}' localhost:8090/api               # -> "session": "..."
+    curl -d '{"type":"spin","bet":1,"session":"..."}' localhost:8090/api
+    curl localhost:8090/metrics        # p50 / p99 latency, sessions, ring state
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from array import array
+from collections import OrderedDict, deque
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from paytable import load_config, load_paytable, payout_scale
+from rtp_sim import generate_outcomes
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_MESSAGE = 64 * 1024
+MAX_HEADERS = 100
+LATENCY_SAMPLES = 1 << 16
+MAX_HTTP_SESSIONS = 100_000
+
+class OutcomeRing:
+    """Pre-generated spin outcomes, refilled in the background.
+
+    Each batch holds the JSON for the symbol grid and the total pay (in
+    payout-scale units) of every spin. take() only indexes into the current
+    batch; when batches run low a refill is handed to the default executor,
+    and its result is appended from the event loop, so no locks are needed.
+    Child seeds are spawned on the loop thread only (SeedSequence.spawn is not
+    thread-safe) and handed to the executor with the job.
+    """
+
+    def __init__(self, table, batch_size=1 << 16, depth=4, seed=None):
+        self.table = table
+        self.batch_size = batch_size
+        self.depth = depth
+        self.seeds = np.random.SeedSequence(seed)
+        self.batches = deque()
+        self.current = None
+        self.position = 0
+        self.refilling = False
+        self.served = 0
+        self.stalls = 0
+        self.refill_errors = 0
+
+        # Every possible reel column, pre-encoded: grid[spin, reel] -> column code -> JSON
+        n = len(table.ids)
+        self.column_json = []
+        for code in range(n ** table.rows):
+            column = [(code // n ** row) % n for row in range(table.rows)]
+            self.column_json.append(json.dumps([table.ids[s] for s in column]))
+        self.column_weights = n ** np.arange(table.rows)
+
+        self.batches.append(self._generate(self._next_seed()))
+
+    def _next_seed(self):
+        seed, = self.seeds.spawn(1)
+        return seed
+
+    def _generate(self, seed):
+        grid, pay = generate_outcomes(self.table, seed, self.batch_size)
+        codes = (grid.astype(np.intp) * self.column_weights).sum(axis=2)
+        column_json = self.column_json
+        results = ["[" + ",".join(column_json[c] for c in row) + "]" for row in codes.tolist()]
+        return results, pay.tolist()
+
+    def take(self):
+        """(results JSON, pay in payout-scale units) of the next spin."""
+        if self.current is None or self.position >= len(self.current[0]):
+            if not self.batches:
+                # Refill could not keep up: generate inline rather than fail
+                self.stalls += 1
+                self.batches.append(self._generate(self._next_seed()))
+            self.current = self.batches.popleft()
+            self.position = 0
+            self._maybe_refill()
+        results, pay = self.current
+        i = self.position
+        self.position += 1
+        self.served += 1
+        return results[i], pay[i]
+
+    def _maybe_refill(self):
+        if self.refilling or len(self.batches) >= self.depth:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.batches.append(self._generate(self._next_seed()))
+            return
+        self.refilling = True
+        loop.run_in_executor(None, self._generate, self._next_seed()).add_done_callback(self._refilled)
+
+    def _refilled(self, future):
+        self.refilling = False
+        error = future.exception()
+        if error is None:
+            self.batches.append(future.result())
+        else:
+            # take() falls back to inline generation, so keep serving but say why
+            self.refill_errors += 1
+            print(f"  ✗ outcome refill failed: {error!r}", file=sys.stderr)
+        self._maybe_refill()
+
+    def stats(self):
+        return {
+            "served": self.served,
+            "ready": len(self.batches) * self.batch_size
+                     + (len(self.current[0]) - self.position if self.current else 0),
+            "batch_size": self.batch_size,
+            "stalls": self.stalls,
+            "refill_errors": self.refill_errors,
+        }
+
+class LatencyRecorder:
+    """Fixed-size ring of recent request latencies in microseconds."""
+
+    def __init__(self, size=LATENCY_SAMPLES):
+        self.samples = array('d', [0.0]) * size
+        self.count = 0
+
+    def record(self, start_ns):
+        self.samples[self.count % len(self.samples)] = (time.perf_counter_ns() - start_ns) / 1000
+        self.count += 1
+
+    def percentiles(self, points=(50, 90, 99, 99.9)):
+        recent = sorted(self.samples[:min(self.count, len(self.samples))])
+        if not recent:
+            return {f"p{p:g}": None for p in points}
+        return {f"p{p:g}": round(recent[min(len(recent) - 1, int(len(recent) * p / 100))], 1) for p in points}
+
+class OutcomeService:
+    """Session balances and the spin/balance protocol."""
+
+    def __init__(self, table, ring, config, max_http_sessions=MAX_HTTP_SESSIONS):
+        self.ring = ring
+        self.scale = payout_scale(table)
+        # Integer money units: whole cents times the payout scale, so every win is exact
+        self.unit = 100 * self.scale
+        self.bets = {round(b * self.unit): b for b in config["bet_amounts"]}
+        self.starting_balance = round(config["starting_balance"] * self.unit)
+        self.balances = {}
+        # HTTP clients never disconnect: their sessions are capped, least recently used dropped first
+        self.http_sessions = OrderedDict()
+        self.max_http_sessions = max_http_sessions
+        self.session_ids = itertools.count(1)
+        self.session_prefix = os.urandom(4).hex()
+        self.latency = LatencyRecorder()
+        self.requests = 0
+        self.started = time.time()
+
+    def open_session(self):
+        session = f"{self.session_prefix}-{next(self.session_ids):x}"
+        self.balances[session] = self.starting_balance
+        return session
+
+    def close_session(self, session):
+        self.balances.pop(session, None)
+
+    def http_session(self, session, kind):
+        """Session for one HTTP message: the known one, a new one on login/init, else None."""
+        if session in self.http_sessions:
+            self.http_sessions.move_to_end(session)
+            return session
+        if kind not in ("auth", "login", "init"):
+            return None
+        session = self.open_session()
+        self.http_sessions[session] = None
+        while len(self.http_sessions) > self.max_http_sessions:
+            dropped, _ = self.http_sessions.popitem(last=False)
+            self.close_session(dropped)
+        return session
+
+    def _money(self, units):
+        return repr(units / self.unit)
+
+    def handle(self, session, payload):
+        """JSON response text for one protocol message."""
+        self.requests += 1
+        kind = payload.get("type")
+        if kind in ("spin", "bet"):
+            return self._spin(session, payload)
+
+        if kind in ("auth", "login"):
+            response = {"type": "login_response", "status": "OK", "session": session,
+                        "balance": self.balances[session] / self.unit, "currency": "USD",
+                        "nickname": "OfflinePlayer"}
+        elif kind in ("init", "balance"):
+            response = {"type": "balance_response", "status": "OK", "balance": self.balances[session] / self.unit}
+        elif "command" in payload:
+            response = {"command": payload["command"], "status": "ok"}
+        else:
+            response = {"status": "ok"}
+        if "id" in payload:
+            response["id"] = payload["id"]
+        return json.dumps(response)
+
+    def _spin(self, session, payload):
+        request_id = f',"id":{json.dumps(payload["id"])}' if "id" in payload else ""
+        try:
+            bet = round(float(payload.get("bet", 1.0)) * self.unit)
+        except (TypeError, ValueError):
+            bet = None
+        if bet not in self.bets:
+            return f'{{"type":"spin_response","status":"ERROR","error":"invalid bet"{request_id}}}'
+        balance = self.balances[session]
+        if balance < bet:
+            return f'{{"type":"spin_response","status":"ERROR","error":"insufficient balance"{request_id}}}'
+
+        results, pay = self.ring.take()
+        # bet is a whole number of cents times scale, so this division is exact
+        win = bet * pay // self.scale
+        balance += win - bet
+        self.balances[session] = balance
+        return (f'{{"type":"spin_response","status":"OK","results":{results},'
+                f'"win":{self._money(win)},"balance":{self._money(balance)}{request_id}}}')
+
+    def metrics(self):
+        uptime = time.time() - self.started
+        return {
+            "requests": self.requests,
+            "requests_per_s": round(self.requests / uptime, 1) if uptime else 0.0,
+            "sessions": len(self.balances),
+            "latency_us": self.latency.percentiles(),
+            "ring": self.ring.stats(),
+            "loop": type(asyncio.get_running_loop()).__module__.split('.')[0],
+        }
+
+# --- WebSocket (RFC 6455) ---
+
+def _unmask(data, mask):
+    if not data:
+        return data
+    repeated = (mask * (len(data) // 4 + 1))[:len(data)]
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(len(data), 'big')
+
+def ws_frame(payload, opcode=0x1):
+    """One unmasked, unfragmented server frame."""
+    length = len(payload)
+    if length < 126:
+        header = bytes([0x80 | opcode, length])
+    elif length < 1 << 16:
+        header = bytes([0x80 | opcode, 126]) + length.to_bytes(2, 'big')
+    else:
+        header = bytes([0x80 | opcode, 127]) + length.to_bytes(8, 'big')
+    return header + payload
+
+async def ws_read_message(reader):
+    """(opcode, payload) of the next complete message; continuation frames are joined."""
+    parts = []
+    opcode = None
+    while True:
+        b1, b2 = await reader.readexactly(2)
+        length = b2 & 0x7F
+        if length == 126:
+            length = int.from_bytes(await reader.readexactly(2), 'big')
+        elif length == 127:
+            length = int.from_bytes(await reader.readexactly(8), 'big')
+        if length > MAX_MESSAGE:
+            raise ValueError("WebSocket frame too large")
+        mask = await reader.readexactly(4) if b2 & 0x80 else None
+        data = await reader.readexactly(length)
+        if mask:
+            data = _unmask(data, mask)
+
+        frame_opcode = b1 & 0x0F
+        if frame_opcode >= 0x8:
+            # Control frames may arrive between fragments
+            return frame_opcode, data
+        if frame_opcode:
+            opcode = frame_opcode
+        parts.append(data)
+        if b1 & 0x80:
+            return opcode, b"".join(parts)
+
+async def serve_websocket(service, reader, writer, headers):
+    key = headers.get("sec-websocket-key", "")
+    accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+    writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                  f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+
+    session = service.open_session()
+    try:
+        while True:
+            opcode, data = await ws_read_message(reader)
+            if opcode == 0x8:
+                writer.write(ws_frame(data[:2], 0x8))
+                break
+            if opcode == 0x9:
+                writer.write(ws_frame(data, 0xA))
+                continue
+            if opcode not in (0x1, 0x2):
+                continue
+            start = time.perf_counter_ns()
+            try:
+                payload = json.loads(data)
+            except ValueError:
+                payload = None
+            if not isinstance(payload, dict):
+                response = '{"status":"ERROR","error":"invalid JSON"}'
+            else:
+                response = service.handle(session, payload)
+            writer.write(ws_frame(response.encode()))
+            service.latency.record(start)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        service.close_session(session)
+
+# --- HTTP ---
+
+def http_response(status, body, content_type="application/json", keep_alive=True):
+    reason = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 405: "Method Not Allowed",
+              413: "Payload Too Large"}[status]
+    head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nAccess-Control-Allow-Origin: *\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+async def read_headers(reader):
+    headers = {}
+    for _ in range(MAX_HEADERS):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    raise ValueError("Too many headers")
+
+def api_request(service, headers, body):
+    """Handle one POST /api message; HTTP clients carry their session in the payload.
+
+    A session is opened only by a login / init message; anything else needs
+    the session it returned.
+    """
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return 400, b'{"status":"ERROR","error":"invalid JSON"}'
+    if not isinstance(payload, dict):
+        return 400, b'{"status":"ERROR","error":"expected a JSON object"}'
+    session = service.http_session(payload.get("session") or headers.get("x-session"), payload.get("type"))
+    if session is None:
+        return 401, b'{"status":"ERROR","error":"unknown session, send a login message first"}'
+    response = service.handle(session, payload)
+    if '"session"' not in response:
+        # Let clients pick the session up from any response, not just login
+        response = response[:-1] + f',"session":"{session}"}}'
+    return 200, response.encode()
+
+async def handle_connection(service, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            start = time.perf_counter_ns()
+            method, target, version = request_line.decode('latin-1').split()
+            headers = await read_headers(reader)
+            path = urlsplit(target).path
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+            if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await serve_websocket(service, reader, writer, headers)
+                break
+
+            length = int(headers.get("content-length", 0))
+            if length > MAX_MESSAGE:
+                writer.write(http_response(413, b'{"status":"ERROR"}', keep_alive=False))
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            if path == "/api":
+                if method != "POST":
+                    status, payload = 405, b'{"status":"ERROR","error":"POST a JSON message"}'
+                else:
+                    status, payload = api_request(service, headers, body)
+                writer.write(http_response(status, payload, keep_alive=keep_alive))
+                service.latency.record(start)
+            elif path == "/metrics":
+                writer.write(http_response(200, json.dumps(service.metrics()).encode(), keep_alive=keep_alive))
+            else:
+                writer.write(http_response(404, b'{"status":"ERROR","error":"not found"}', keep_alive=keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+def raise_fd_limit():
+    """Tens of thousands of sockets need more than the usual 1024 descriptors."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        target = hard if hard != resource.RLIM_INFINITY else 1 << 20
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return soft
+
+async def serve(host, port, service):
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port,
+                                        backlog=4096, reuse_address=True)
+    print(f"✓ Listening on http://{host}:{port}  (POST /api, ws://{host}:{port}/ws, GET /metrics)")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Spin-outcome service for the slot-engine.js paytable")
+    parser.add_argument("--host", default="127.0.0.1", help="bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8090, help="port (default: 8090)")
+    parser.add_argument("--batch", type=int, default=1 << 16, help="outcomes per pre-generated batch (default: 65536)")
+    parser.add_argument("--depth", type=int, default=4, help="batches kept ready (default: 4)")
+    parser.add_argument("--seed", type=int, default=None, help="RNG seed (default: random)")
+    parser.add_argument("--wild", help="symbol id to score as a wild, e.g. pharaoh (default: none, like checkWins)")
+    parser.add_argument("--max-sessions", type=int, default=MAX_HTTP_SESSIONS,
+                        help=f"HTTP sessions kept before the least recently used is dropped (default: {MAX_HTTP_SESSIONS})")
+    parser.add_argument("--no-uvloop", action="store_true", help="use the stock asyncio loop even if uvloop is installed")
+    args = parser.parse_args()
+
+    table = load_paytable(wild=args.wild)
+    print(f"=== Outcome service: pre-generating {args.batch:,} spins ===")
+    ring = OutcomeRing(table, args.batch, args.depth, args.seed)
+    service = OutcomeService(table, ring, load_config(), args.max_sessions)
+    print(f"  File descriptor limit: {raise_fd_limit()}")
+
+    if uvloop is not None and not args.no_uvloop:
+        uvloop.install()
+    try:
+        asyncio.run(serve(args.host, args.port, service))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Paytable shared by the Python math tools.
+
+SYMBOLS, PAYLINES and the reel layout are read straight out of slot-engine.js,
+so the simulators always evaluate the same game the browser plays. Line wins
+follow SlotGame.checkWins(): count identical symbols from the leftmost reel,
+3/4/5 of a kind pays payouts[count - 3] times the bet on every line.
+
+Optionally one symbol can be evaluated as a wild (the pharaoh is marked
+"Wild" in SYMBOLS but checkWins() does not substitute it yet).
+"""
+import math
+import os
+import re
+from collections import namedtuple
+from fractions import Fraction
+
+ENGINE_JS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "slot-engine.js")
+
+Paytable = namedtuple("Paytable", "ids weights payouts paylines reels rows wild")
+
+def _js_block(source, name):
+    """Text of `const NAME = ...;` from the engine source."""
+    match = re.search(r"const\s+%s\s*=\s*(.*?);\s*$" % name, source, re.S | re.M)
+    if not match:
+        raise ValueError(f"{name} not found in slot-engine.js")
+    return match.group(1)
+
+def load_paytable(path=ENGINE_JS, wild=None):
+    """Parse SYMBOLS, PAYLINES and the reel layout from slot-engine.js.
+
+    wild is a symbol id that substitutes for every other symbol on a line;
+    None scores lines exactly like checkWins().
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+
+    ids, weights, payouts = [], [], []
+    for sym in re.finditer(r"\{[^{}]*?id:\s*'([^']+)'[^{}]*?payouts:\s*\[([^\]]*)\][^{}]*?weight:\s*([\d.]+)",
+                           _js_block(source, "SYMBOLS")):
+        ids.append(sym.group(1))
+        payouts.append(tuple(float(v) for v in sym.group(2).split(',')))
+        weights.append(float(sym.group(3)))
+
+    paylines = [tuple(int(v) for v in line.split(','))
+                for line in re.findall(r"\[([\d,\s]+)\]", _js_block(source, "PAYLINES"))]
+    config = _js_block(source, "CONFIG")
+    reels = int(re.search(r"reels:\s*(\d+)", config).group(1))
+    rows = int(re.search(r"rows:\s*(\d+)", config).group(1))
+    if wild is not None and wild not in ids:
+        raise ValueError(f"Unknown wild symbol: {wild}")
+    return Paytable(ids, weights, payouts, paylines, reels, rows, ids.index(wild) if wild else None)
+
+def load_config(path=ENGINE_JS):
+    """Bet steps and starting balance from CONFIG in slot-engine.js."""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = _js_block(f.read(), "CONFIG")
+    bets = re.search(r"betAmounts:\s*\[([^\]]*)\]", config).group(1)
+    return {
+        "bet_amounts": [float(v) for v in bets.split(',') if v.strip()],
+        "starting_balance": float(re.search(r"startingBalance:\s*([\d.]+)", config).group(1)),
+    }
+
+def with_weights(table, overrides):
+    """Copy of table with {symbol id: weight} overrides applied."""
+    weights = list(table.weights)
+    for symbol, weight in overrides.items():
+        if symbol not in table.ids:
+            raise ValueError(f"Unknown symbol: {symbol}")
+        weights[table.ids.index(symbol)] = float(weight)
+    return table._replace(weights=weights)
+
+def parse_weights(text):
+    """'pharaoh=4,anubis=7' -> {'pharaoh': 4.0, 'anubis': 7.0}"""
+    overrides = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        symbol, _, weight = item.partition('=')
+        overrides[symbol.strip()] = float(weight)
+    return overrides
+
+def probabilities(table):
+    """Per-symbol probability of one reel cell, as getRandomSymbol() draws it."""
+    total = sum(table.weights)
+    return [w / total for w in table.weights]
+
+def payout_scale(table):
+    """Smallest integer that turns every payout multiplier into an integer."""
+    scale = 1
+    for pays in table.payouts:
+        for value in pays:
+            denominator = Fraction(str(value)).limit_denominator(10000).denominator
+            scale = math.lcm(scale, denominator)
+    return scale
+
+def pay_for(table, symbol, count):
+    """Multiplier for count-of-a-kind of symbol index (0 below 3)."""
+    if count < 3:
+        return 0.0
+    return table.payouts[symbol][min(count, len(table.payouts[symbol]) + 2) - 3]
+
+def line_state(table, state, symbol):
+    """Advance a payline scan by one reel.
+
+    state is (target, count, wild_run, open): the first non-wild symbol, the
+    length of the run so far, how many leading cells were wild, and whether
+    the run is still unbroken. Start from (None, 0, 0, True).
+    """
+    target, count, wild_run, is_open = state
+    if not is_open:
+        return state
+    if symbol == table.wild:
+        return (target, count + 1, wild_run + 1 if wild_run == count else wild_run, True)
+    if target is None or symbol == target:
+        return (symbol, count + 1, wild_run, True)
+    return (target, count, wild_run, False)
+
+def state_payout(table, state):
+    """Multiplier for a finished line scan: best of the substituted run and the pure wild run."""
+    target, count, wild_run, _ = state
+    pay = pay_for(table, target, count) if target is not None else 0.0
+    if table.wild is not None:
+        pay = max(pay, pay_for(table, table.wild, wild_run))
+    return pay
+
+def line_payout(table, line_symbols):
+    """Multiplier for one payline given its symbol indices, left to right."""
+    state = (None, 0, 0, True)
+    for symbol in line_symbols:
+        state = line_state(table, state, symbol)
+    return state_payout(table, state)
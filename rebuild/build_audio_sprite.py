@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Pack the extracted sound clips into one audio sprite per format.
+
+Every clip extract_assets.py pulled out of the HAR (rebuild/assets/*.wav,
+*.mp3, ...) is decoded to 44.1 kHz stereo PCM in parallel ffmpeg processes,
+the clips are laid end to end with --gap seconds of silence between them (so
+codec priming and frame padding never bleed into the next sound), and the
+result is encoded once: desktop/game/sounds.ogg plus the SoundJS-style
+offset table in desktop/game/sounds.ogg.json. Startup is then one fetch and
+one decode instead of one per sound effect. Identical clips (the capture has
+numbered copies) are stored once.
+
+Without ffmpeg only RIFF PCM .wav clips can be read and only --formats wav
+can be written.
+
+    python build_audio_sprite.py
+    python build_audio_sprite.py --formats ogg mp3 --max-seconds 60
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(REBUILD_DIR)
+ASSETS_DIR = os.path.join(REBUILD_DIR, "assets")
+GAME_DIR = os.path.join(ROOT_DIR, "desktop", "game")
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.ogg', '.m4a', '.aac', '.flac', '.webm')
+SAMPLE_RATE = 44100
+CHANNELS = 2
+# ffmpeg encoder and settings per sprite format
+ENCODERS = {
+    "ogg": ["-c:a", "libvorbis", "-q:a", "4"],
+    "mp3": ["-c:a", "libmp3lame", "-q:a", "4"],
+    "m4a": ["-c:a", "aac", "-b:a", "128k"],
+    "wav": None,
+}
+
+FFMPEG = shutil.which("ffmpeg")
+
+def clip_id(filename):
+    """Sound id from the file name, without the capture's numeric prefix (42_crash.mp3 -> crash)."""
+    return re.sub(r"^\d+_", "", os.path.splitext(filename)[0])
+
+def _read_wav(path):
+    with wave.open(path, 'rb') as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f"{w.getsampwidth() * 8}-bit PCM needs ffmpeg")
+        channels, rate = w.getnchannels(), w.getframerate()
+        pcm = np.frombuffer(w.readframes(w.getnframes()), dtype='<i2').reshape(-1, channels)
+    if channels == 1:
+        pcm = np.repeat(pcm, CHANNELS, axis=1)
+    elif channels != CHANNELS:
+        pcm = pcm[:, :CHANNELS]
+    if rate != SAMPLE_RATE and len(pcm):
+        # Linear resampling is fine for UI effects; ffmpeg does better when present
+        positions = np.arange(round(len(pcm) * SAMPLE_RATE / rate)) * (rate / SAMPLE_RATE)
+        pcm = np.stack([np.interp(positions, np.arange(len(pcm)), pcm[:, c]) for c in range(CHANNELS)], axis=1)
+        pcm = np.round(pcm).astype('<i2')
+    return pcm
+
+def decode_clip(path):
+    """int16 PCM array (frames, CHANNELS) at SAMPLE_RATE."""
+    if FFMPEG is None:
+        return _read_wav(path)
+    proc = subprocess.run([FFMPEG, "-v", "error", "-i", path, "-f", "s16le", "-ac", str(CHANNELS),
+                           "-ar", str(SAMPLE_RATE), "-"], capture_output=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.decode(errors='replace').strip() or "ffmpeg failed")
+    return np.frombuffer(proc.stdout, dtype='<i2').reshape(-1, CHANNELS)
+
+def _decode_job(path):
+    try:
+        return path, decode_clip(path), None
+    except Exception as e:
+        return path, None, str(e)
+
+def find_clips(assets_dir=ASSETS_DIR):
+    """[(id, path)] for every distinct audio file; duplicates (same bytes or id) are dropped."""
+    clips = []
+    seen_ids, seen_digests = set(), set()
+    names = [f for f in os.listdir(assets_dir) if f.lower().endswith(AUDIO_EXTENSIONS)]
+    # The capture also keeps numbered copies (42_crash.mp3): look at the plain names first
+    for filename in sorted(names, key=lambda f: (clip_id(f) != os.path.splitext(f)[0], f)):
+        path = os.path.join(assets_dir, filename)
+        with open(path, 'rb') as f:
+            digest = hashlib.md5(f.read()).hexdigest()
+        sound_id = clip_id(filename)
+        if sound_id in seen_ids or digest in seen_digests:
+            continue
+        seen_ids.add(sound_id)
+        seen_digests.add(digest)
+        clips.append((sound_id, path))
+    return sorted(clips)
+
+def layout(clips, gap, max_seconds=0):
+    """Split decoded clips into sprites: [(clip entries, pcm)] with start/duration in ms."""
+    gap_frames = round(gap * SAMPLE_RATE)
+    silence = np.zeros((gap_frames, CHANNELS), dtype='<i2')
+    sprites = []
+    entries, parts, frames = [], [], 0
+    for sound_id, pcm in clips:
+        if entries and max_seconds and (frames + len(pcm)) / SAMPLE_RATE > max_seconds:
+            sprites.append((entries, np.concatenate(parts)))
+            entries, parts, frames = [], [], 0
+        entries.append({"id": sound_id, "startTime": round(frames * 1000 / SAMPLE_RATE),
+                        "duration": round(len(pcm) * 1000 / SAMPLE_RATE)})
+        parts += [pcm, silence]
+        frames += len(pcm) + gap_frames
+    if entries:
+        sprites.append((entries, np.concatenate(parts)))
+    return sprites
+
+def encode(pcm, output_path, fmt):
+    if fmt == "wav":
+        with wave.open(output_path, 'wb') as w:
+            w.setnchannels(CHANNELS)
+            w.setsampwidth(2)
+            w.setframerate(SAMPLE_RATE)
+            w.writeframes(pcm.astype('<i2').tobytes())
+        return
+    if FFMPEG is None:
+        raise RuntimeError(f"ffmpeg is needed to write .{fmt} (use --formats wav without it)")
+    proc = subprocess.run([FFMPEG, "-v", "error", "-y", "-f", "s16le", "-ac", str(CHANNELS), "-ar", str(SAMPLE_RATE),
+                           "-i", "-", *ENCODERS[fmt], output_path], input=pcm.astype('<i2').tobytes(),
+                          capture_output=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.decode(errors='replace').strip() or "ffmpeg failed")
+
+def build_audio_sprite(formats=("ogg",), gap=0.25, max_seconds=0, workers=None,
+                       assets_dir=ASSETS_DIR, out_dir=GAME_DIR, name="sounds"):
+    if FFMPEG is None and set(formats) - {"wav"}:
+        # Fail before decoding anything rather than after
+        raise RuntimeError(f"ffmpeg is needed to write {', '.join(f for f in formats if f != 'wav')}")
+    clips = find_clips(assets_dir)
+    print(f"Decoding {len(clips)} clips ({'ffmpeg' if FFMPEG else 'wave module, no ffmpeg'})...")
+    start = time.perf_counter()
+    decoded = {}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for path, pcm, error in pool.map(_decode_job, [path for _, path in clips]):
+            if error:
+                print(f"  ✗ {os.path.basename(path)}: {error}")
+            else:
+                decoded[path] = pcm
+    ordered = [(sound_id, decoded[path]) for sound_id, path in clips if path in decoded]
+    sprites = layout(ordered, gap, max_seconds)
+    print(f"  ✓ {len(ordered)} clips decoded in {time.perf_counter() - start:.2f}s")
+
+    os.makedirs(out_dir, exist_ok=True)
+    for fmt in formats:
+        table = []
+        for i, (entries, pcm) in enumerate(sprites):
+            filename = f"{name}.{fmt}" if i == 0 else f"{name}-{i}.{fmt}"
+            encode(pcm, os.path.join(out_dir, filename), fmt)
+            table += [dict(entry, src=filename) for entry in entries]
+            size = os.path.getsize(os.path.join(out_dir, filename))
+            print(f"  ✓ {filename}: {len(entries)} sounds, {len(pcm) / SAMPLE_RATE:.1f}s, {size / 1024:.0f} KB")
+        json_path = os.path.join(out_dir, f"{name}.{fmt}.json")
+        # CRLF and 4-space indent, like the file this replaces
+        with open(json_path, 'w', encoding='utf-8', newline='\r\n') as f:
+            json.dump({"sounds": table}, f, indent=4)
+        print(f"✓ Sprite table saved to: {json_path}")
+    return sprites
+
+def main():
+    parser = argparse.ArgumentParser(description="Concatenate extracted sound clips into audio sprites")
+    parser.add_argument("--formats", nargs="+", choices=list(ENCODERS), default=["ogg"],
+                        help="sprite formats to write (default: ogg)")
+    parser.add_argument("--gap", type=float, default=0.25, help="seconds of silence between clips (default: 0.25)")
+    parser.add_argument("--max-seconds", type=float, default=0,
+                        help="start a new sprite file past this length (default: 0, one file)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="parallel decoders (default: all cores)")
+    args = parser.parse_args()
+    if FFMPEG is None and set(args.formats) - {"wav"}:
+        parser.error("ffmpeg not found on PATH: install it, or use --formats wav")
+
+    print("=== Building audio sprite ===\n")
+    build_audio_sprite(args.formats, args.gap, args.max_seconds, args.workers)
+
+if __name__ == "__main__":
+    main()
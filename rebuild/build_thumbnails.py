@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Thumbnails and contact sheets for asset_viewer.html.
+
+Every image in rebuild/assets is shrunk to fit a --size cell (JPEGs are
+draft-decoded at a reduced scale, so a 2k sheet is never decoded in full for
+a 128px thumbnail) in parallel worker processes. Each thumbnail is cached as
+rebuild/thumbs/cells/<name>.png. The cells are then laid out in pages of
+--per-page on WebP contact sheets (thumbs/sheet-N.webp).
+
+thumbs/index.json lists every asset with its byte size and dimensions, the
+bounds of its pixels with alpha above --alpha-threshold (x, y, w, h; faint
+glow is ignored), and its page and cell on the contact sheets. Non-image
+files are listed too, without a cell. The viewer loads the index and one
+sheet at a time instead of every full-size asset.
+
+Re-runs only re-thumbnail files whose size or mtime changed, and only
+re-encode the pages whose cells changed.
+
+    python build_thumbnails.py
+    python build_thumbnails.py --size 96 --per-page 100 -j 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(REBUILD_DIR, "assets")
+THUMBS_DIR = os.path.join(REBUILD_DIR, "thumbs")
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp')
+KINDS = {'.svg': "vector", '.wav': "audio", '.mp3': "audio", '.ogg': "audio", '.m4a': "audio",
+         '.woff': "font", '.woff2': "font", '.ttf': "font", '.otf': "font", '.json': "data"}
+SHEET_QUALITY = 80
+
+def alpha_bounds(img, threshold):
+    """[x, y, w, h] of the pixels with alpha above threshold; None for opaque images or fully clear ones."""
+    if "A" not in img.getbands() and "transparency" not in img.info:
+        return None
+    alpha = img.convert("RGBA").getchannel("A")
+    box = alpha.point([255 if a > threshold else 0 for a in range(256)]).getbbox()
+    if box is None:
+        return None
+    return [box[0], box[1], box[2] - box[0], box[3] - box[1]]
+
+def make_thumbnail(source_path, cell_path, size, threshold):
+    """Write the cell thumbnail; returns the asset's index fields."""
+    with Image.open(source_path) as img:
+        width, height = img.size
+        info = {"w": width, "h": height}
+        if getattr(img, "n_frames", 1) > 1:
+            info["frames"] = img.n_frames
+        # JPEG decodes at 1/2, 1/4 or 1/8 scale when that is still >= the cell
+        img.draft("RGB", (size, size))
+        bounds = alpha_bounds(img, threshold)
+        if bounds:
+            info["alpha"] = bounds
+        thumb = img.convert("RGBA")
+        thumb.thumbnail((size, size), Image.LANCZOS, reducing_gap=2.0)
+    os.makedirs(os.path.dirname(cell_path), exist_ok=True)
+    thumb.save(cell_path, optimize=True)
+    return info
+
+def _thumb_job(args):
+    name, source_path, cell_path, size, threshold = args
+    try:
+        return name, make_thumbnail(source_path, cell_path, size, threshold), None
+    except Exception as e:
+        return name, None, str(e)
+
+def load_index(path):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"assets": [], "pages": []}
+
+def render_page(cells, page_path, size, columns):
+    """Paste cell thumbnails onto one contact sheet; returns their [x, y, w, h] in it."""
+    rows = (len(cells) + columns - 1) // columns
+    sheet = Image.new("RGBA", (columns * size, rows * size))
+    placed = []
+    for i, cell_path in enumerate(cells):
+        with Image.open(cell_path) as thumb:
+            # Centred in its cell
+            x = (i % columns) * size + (size - thumb.width) // 2
+            y = (i // columns) * size + (size - thumb.height) // 2
+            sheet.paste(thumb, (x, y))
+            placed.append([x, y, thumb.width, thumb.height])
+    sheet.save(page_path, quality=SHEET_QUALITY, method=4)
+    return placed
+
+def build_thumbnails(size=128, per_page=64, columns=8, threshold=16, workers=None, force=False,
+                     assets_dir=ASSETS_DIR, out_dir=THUMBS_DIR):
+    start = time.perf_counter()
+    index_path = os.path.join(out_dir, "index.json")
+    previous = load_index(index_path)
+    settings = {"size": size, "per_page": per_page, "columns": columns, "alpha_threshold": threshold}
+    if force or previous.get("settings") != settings:
+        previous = {"assets": [], "pages": []}
+    known = {asset["name"]: asset for asset in previous["assets"]}
+
+    assets, jobs = [], []
+    for name in sorted(os.listdir(assets_dir)):
+        path = os.path.join(assets_dir, name)
+        # Dotfiles are the asset store's blobs / manifest
+        if name.startswith(".") or not os.path.isfile(path):
+            continue
+        st = os.stat(path)
+        ext = os.path.splitext(name)[1].lower()
+        asset = {"name": name, "kind": "image" if ext in IMAGE_EXTENSIONS else KINDS.get(ext, "other"),
+                 "bytes": st.st_size, "mtime_ns": st.st_mtime_ns}
+        assets.append(asset)
+        if asset["kind"] != "image":
+            continue
+        old = known.get(name)
+        cell_path = os.path.join(out_dir, "cells", name + ".png")
+        if old and "w" in old and (old["bytes"], old["mtime_ns"]) == (st.st_size, st.st_mtime_ns) \
+                and os.path.exists(cell_path):
+            asset.update({k: old[k] for k in ("w", "h", "alpha", "frames") if k in old})
+        else:
+            jobs.append((name, path, cell_path, size, threshold))
+
+    print(f"Thumbnailing {len(jobs)} of {sum(a['kind'] == 'image' for a in assets)} images...")
+    by_name = {asset["name"]: asset for asset in assets}
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for name, info, error in pool.map(_thumb_job, jobs, chunksize=4):
+                if error:
+                    print(f"  ✗ {name}: {error}")
+                    by_name[name]["error"] = error
+                else:
+                    by_name[name].update(info)
+    print(f"  ✓ thumbnails in {time.perf_counter() - start:.2f}s")
+
+    # Pages: a page is re-encoded only when the cells it holds changed
+    thumbed = [a for a in assets if a["kind"] == "image" and "w" in a]
+    old_pages = {page["file"]: page["digest"] for page in previous.get("pages", [])}
+    pages = []
+    written = 0
+    for number, first in enumerate(range(0, len(thumbed), per_page)):
+        members = thumbed[first:first + per_page]
+        digest = hashlib.sha1(json.dumps([(a["name"], a["bytes"], a["mtime_ns"]) for a in members]).encode()).hexdigest()
+        filename = f"sheet-{number}.webp"
+        page_path = os.path.join(out_dir, filename)
+        if old_pages.get(filename) == digest and os.path.exists(page_path):
+            for member in members:
+                member["cell"] = known[member["name"]]["cell"]
+        else:
+            cells = [os.path.join(out_dir, "cells", a["name"] + ".png") for a in members]
+            for member, cell in zip(members, render_page(cells, page_path, size, columns)):
+                member["cell"] = cell
+            written += 1
+            print(f"  ✓ {filename}: {len(members)} cells, {os.path.getsize(page_path) / 1024:.0f} KB")
+        for member in members:
+            member["page"] = number
+        pages.append({"file": filename, "digest": digest, "bytes": os.path.getsize(page_path)})
+
+    # Stale pages and cells of removed assets
+    for filename in set(old_pages) - {page["file"] for page in pages}:
+        if os.path.exists(os.path.join(out_dir, filename)):
+            os.remove(os.path.join(out_dir, filename))
+    cells_dir = os.path.join(out_dir, "cells")
+    if os.path.isdir(cells_dir):
+        for cell in os.listdir(cells_dir):
+            if cell[:-len(".png")] not in by_name:
+                os.remove(os.path.join(cells_dir, cell))
+
+    index = {"settings": settings, "pages": pages, "assets": assets}
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(",", ":"))
+
+    total = sum(a["bytes"] for a in assets)
+    sheets = sum(page["bytes"] for page in pages)
+    print(f"\n  {len(assets)} assets ({total / 1e6:.1f} MB) -> {len(pages)} sheets ({sheets / 1024:.0f} KB), "
+          f"{written} re-encoded, index {os.path.getsize(index_path) / 1024:.0f} KB")
+    print(f"✓ Index saved to: {index_path}")
+    return index
+
+def main():
+    parser = argparse.ArgumentParser(description="Build cached thumbnails and contact sheets for asset_viewer.html")
+    parser.add_argument("--size", type=int, default=128, help="thumbnail cell edge in pixels (default: 128)")
+    parser.add_argument("--per-page", type=int, default=64, help="cells per contact sheet (default: 64)")
+    parser.add_argument("--columns", type=int, default=8, help="cells per sheet row (default: 8)")
+    parser.add_argument("--alpha-threshold", type=int, default=16,
+                        help="alpha a pixel needs to count towards the bounds (default: 16)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="rebuild everything")
+    args = parser.parse_args()
+
+    print("=== Building asset thumbnails ===\n")
+    build_thumbnails(args.size, args.per_page, args.columns, args.alpha_threshold, args.workers, args.force)
+
+if __name__ == "__main__":
+    main()
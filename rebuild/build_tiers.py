@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Build @0.5x / @0.25x texture tiers so small devices don't upload full-size art.
+
+Every sprite in rebuild/sprites and every texture sheet in rebuild/assets is
+downsampled with Lanczos. Pillow resamples RGBA in premultiplied alpha, so
+transparent edges don't pick up dark fringes. The packed atlases in
+rebuild/atlas are re-packed from the downsampled sprites with pack_atlas.py
+rather than shrunk whole, so sprites never bleed into their neighbours.
+
+Tiers go to rebuild/tiers/@0.5x/ and rebuild/tiers/@0.25x/ (@1x is the
+originals). PIXI reads the resolution from the "@0.5x" in the URL, so a
+sprite keeps its logical size whichever tier it comes from. manifest.json
+lists each tier's textures with their estimated decoded GPU bytes, and
+slot-engine.js picks the tier that fits the device's memory budget.
+
+    python build_tiers.py
+    python build_tiers.py --scales 0.5 -j 4
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(REBUILD_DIR)
+sys.path.insert(0, ROOT_DIR)
+from instrument import span
+from pack_atlas import ATLAS_DIR, frame_aliases, pack_atlas
+
+TIERS_DIR = os.path.join(REBUILD_DIR, "tiers")
+MANIFEST_FILE = os.path.join(TIERS_DIR, "manifest.json")
+SCALES = (0.5, 0.25)
+ATLAS_PATTERN = re.compile(r"^[0-9a-f]{32}\.png$")
+# (directory under rebuild/, file filter)
+SOURCES = [("sprites", lambda f: f.lower().endswith(".png")), ("assets", ATLAS_PATTERN.match)]
+
+def tier_name(scale):
+    return f"@{scale:g}x"
+
+def gpu_bytes(width, height):
+    """Decoded RGBA8 size; PIXI mipmaps power-of-two textures by default (+1/3)."""
+    size = width * height * 4
+    if width & (width - 1) == 0 and height & (height - 1) == 0:
+        size += size // 3
+    return size
+
+def downscale(source_path, output_path, scale):
+    """Write a Lanczos-downsampled copy of source_path; returns its (width, height)."""
+    with span("tier.resize", sprite=os.path.basename(source_path), scale=scale), Image.open(source_path) as img:
+        img = img.convert("RGBA")
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        # reducing_gap box-reduces first for big ratios: same look, far less work
+        small = img.resize(size, Image.LANCZOS, reducing_gap=3.0)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    small.save(output_path, optimize=True)
+    return size
+
+def _downscale_job(args):
+    source_path, output_path, scale = args
+    try:
+        return output_path, downscale(source_path, output_path, scale), None
+    except Exception as e:
+        return output_path, None, str(e)
+
+def texture_entry(path):
+    with Image.open(path) as img:
+        width, height = img.size
+    return {"w": width, "h": height, "bytes": os.path.getsize(path), "gpu_bytes": gpu_bytes(width, height)}
+
+def atlas_sheets(atlas_dir=ATLAS_DIR):
+    """{atlas name: [frame names]} for every packed atlas (name-0.json plus linked pages)."""
+    sheets = {}
+    for path in sorted(glob.glob(os.path.join(atlas_dir, "*-0.json"))):
+        name = os.path.basename(path)[:-len("-0.json")]
+        frames = []
+        for page in sorted(glob.glob(os.path.join(atlas_dir, f"{name}-*.json"))):
+            with open(page, 'r', encoding='utf-8') as f:
+                frames += list(json.load(f)["frames"])
+        sheets[name] = list(dict.fromkeys(frames))
+    return sheets
+
+def tier_textures(tier_dir, atlas_subdir):
+    """{path relative to the tier: texture entry} for every image of one tier."""
+    textures = {}
+    for subdir, keep in SOURCES + [(atlas_subdir, lambda f: f.endswith(".png"))]:
+        directory = os.path.join(tier_dir, subdir)
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            if keep(filename):
+                textures[f"{os.path.basename(subdir)}/{filename}"] = texture_entry(os.path.join(directory, filename))
+    return textures
+
+def build_tiers(scales=SCALES, workers=None, force=False, out_dir=TIERS_DIR):
+    jobs = []
+    for scale in scales:
+        for subdir, keep in SOURCES:
+            source_dir = os.path.join(REBUILD_DIR, subdir)
+            for filename in sorted(os.listdir(source_dir)):
+                if not keep(filename):
+                    continue
+                source_path = os.path.join(source_dir, filename)
+                output_path = os.path.join(out_dir, tier_name(scale), subdir, filename)
+                # Incremental: a tier file newer than its source is up to date
+                if (not force and os.path.exists(output_path)
+                        and os.path.getmtime(output_path) >= os.path.getmtime(source_path)):
+                    continue
+                jobs.append((source_path, output_path, scale))
+
+    print(f"Downscaling {len(jobs)} textures into {len(scales)} tiers...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for output_path, size, error in pool.map(_downscale_job, jobs, chunksize=4):
+            rel_path = os.path.relpath(output_path, out_dir)
+            if error:
+                print(f"  ✗ {rel_path}: {error}")
+            else:
+                print(f"  ✓ {rel_path} {size[0]}x{size[1]}")
+
+    sheets = atlas_sheets()
+    aliases = frame_aliases()
+    for scale in scales:
+        for name, frames in sheets.items():
+            print(f"\n  Packing {tier_name(scale)} {name} atlas")
+            pack_atlas(frames, name, sprites_dir=os.path.join(out_dir, tier_name(scale), "sprites"),
+                       out_dir=os.path.join(out_dir, tier_name(scale), "atlas"), aliases=aliases, scale=scale)
+
+    tiers = {"@1x": {"scale": 1, "base": "rebuild/", "textures": tier_textures(REBUILD_DIR, "atlas")}}
+    for scale in scales:
+        tier_dir = os.path.join(out_dir, tier_name(scale))
+        base = os.path.relpath(tier_dir, ROOT_DIR).replace(os.sep, "/") + "/"
+        tiers[tier_name(scale)] = {"scale": scale, "base": base, "textures": tier_textures(tier_dir, "atlas")}
+    for tier in tiers.values():
+        tier["gpu_bytes"] = sum(t["gpu_bytes"] for t in tier["textures"].values())
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump({"tiers": tiers}, f, indent=1)
+
+    print("\n  Tier      textures     GPU (all)")
+    for name, tier in tiers.items():
+        print(f"  {name:<8} {len(tier['textures']):>9} {tier['gpu_bytes'] / (1024 * 1024):>10.1f} MB")
+    print(f"✓ Manifest saved to: {os.path.join(out_dir, 'manifest.json')}")
+    return tiers
+
+def main():
+    parser = argparse.ArgumentParser(description="Build downsampled texture tiers and a GPU-memory manifest")
+    parser.add_argument("--scales", type=float, nargs="+", default=list(SCALES),
+                        help="tier scales below 1 (default: 0.5 0.25)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="rebuild tier files that look up to date")
+    args = parser.parse_args()
+    build_tiers(args.scales, args.workers, args.force)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+One entry point for the sprite finding and cropping scripts.
+
+    python cli.py find-sprites 's_symbol*'     # find_sprites.py
+    python cli.py find-symbols                 # find_symbols.py
+    python cli.py extract-sprites              # extract_sprites.py
+    python cli.py extract-symbols              # extract_all_symbols.py
+    python cli.py fix-sprites                  # fix_sprites.py
+    python cli.py create-sprites               # create_correct_sprites.py
+    python cli.py shell                        # any of the above, state kept warm
+
+Only argparse is imported up front. A subcommand imports its script (and PIL
+or the HAR reader with it) when it runs, so --help never loads them.
+
+The shell runs the same commands in one process. Modules stay imported, the
+atlas index and symbol resolver are parsed once, and crops run in-process
+against one TextureCache, so a sheet decoded by one command is reused by the
+next. `cache` shows the cache counters; `reload` drops everything.
+"""
+import argparse
+import cmd
+import os
+import shlex
+import sys
+import time
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REBUILD_DIR)
+
+class Session:
+    """State kept between commands; only the shell keeps one alive."""
+
+    def __init__(self, warm=False):
+        self.warm = warm
+        self._resolver = None
+
+    def resolver(self):
+        """Shared SymbolResolver in the shell; None (build a fresh one) otherwise."""
+        if not self.warm:
+            return None
+        if self._resolver is None:
+            from find_symbols import SymbolResolver
+            self._resolver = SymbolResolver()
+        return self._resolver
+
+    def reload(self):
+        import find_sprites
+        from texture_cache import shared_cache
+        self._resolver = None
+        find_sprites._loaded = None
+        shared_cache().clear()
+
+def run_find_sprites(args, session):
+    import find_sprites
+    find_sprites.query_sprites(args.queries, args.texture, args.har or find_sprites.HAR_FILE, args.rebuild)
+
+def run_find_symbols(args, session):
+    from find_symbols import find_symbol_texture
+    find_symbol_texture(args.sprites, resolver=session.resolver())
+
+def _crop_command(module, function="main"):
+    """Handler running one cropping script's entry point with the chosen worker count."""
+    def run(args, session):
+        import importlib
+        import sprite_batch
+        # The shell crops in-process so its TextureCache keeps the sheets
+        default = 1 if session.warm else None
+        sprite_batch.DEFAULT_WORKERS = args.workers if args.workers is not None else default
+        getattr(importlib.import_module(module), function)()
+    return run
+
+# name: (handler, help)
+COMMANDS = {
+    "find-sprites": (run_find_sprites, "sprite rects from the HAR's UIAtlas index"),
+    "find-symbols": (run_find_symbols, "which texture sheet holds each symbol sprite"),
+    "extract-sprites": (_crop_command("extract_sprites", "extract_sprites"), "crop the SPRITES table"),
+    "extract-symbols": (_crop_command("extract_all_symbols"), "crop every slot symbol"),
+    "fix-sprites": (_crop_command("fix_sprites"), "re-crop card and pharaoh symbols"),
+    "create-sprites": (_crop_command("create_correct_sprites"), "crop the corrected symbol set"),
+}
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Rebuild sprite tools")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    crop_options = argparse.ArgumentParser(add_help=False)
+    crop_options.add_argument("-j", "--workers", type=int, default=None,
+                              help="crop processes (default: all cores; 1 in the shell)")
+
+    for name, (handler, help_text) in COMMANDS.items():
+        parents = [crop_options] if name not in ("find-sprites", "find-symbols") else []
+        sub = commands.add_parser(name, help=help_text, parents=parents)
+        sub.set_defaults(handler=handler)
+        if name == "find-sprites":
+            sub.add_argument("queries", nargs="*", help="sprite names, or prefixes ending in '*'")
+            sub.add_argument("--har", help="HAR capture to index (default: demo.mortalsoft.net.har)")
+            sub.add_argument("--texture", help="list every sprite on this texture GUID")
+            sub.add_argument("--rebuild", action="store_true", help="re-index even if the cache is fresh")
+        elif name == "find-symbols":
+            sub.add_argument("sprites", nargs="*", help="sprite names or 'prefix*' (default: all symbol sprites)")
+    commands.add_parser("shell", help="run commands in one process with textures and indexes kept warm")
+    return parser
+
+class RebuildShell(cmd.Cmd):
+    intro = "Rebuild shell: the cli.py commands, plus cache / reload / quit. 'help' lists them."
+    prompt = "rebuild> "
+
+    def __init__(self, parser):
+        super().__init__()
+        self.parser = parser
+        self.session = Session(warm=True)
+
+    def default(self, line):
+        try:
+            args = self.parser.parse_args(shlex.split(line))
+        except SystemExit:
+            return  # argparse already printed the usage / error
+        if args.command in (None, "shell"):
+            self.parser.print_usage()
+            return
+        start = time.perf_counter()
+        try:
+            args.handler(args, self.session)
+        except Exception as e:
+            print(f"  ✗ {type(e).__name__}: {e}")
+        print(f"  ({time.perf_counter() - start:.2f}s)")
+
+    def completenames(self, text, *ignored):
+        return [name for name in list(COMMANDS) + ["cache", "reload", "quit"] if name.startswith(text)]
+
+    def do_help(self, arg):
+        if arg in COMMANDS:
+            self.default(f"{arg} --help")
+        else:
+            self.parser.print_help()
+            print("\nShell only: cache (texture cache counters), reload (drop cached state), quit")
+
+    def do_cache(self, arg):
+        from texture_cache import shared_cache
+        for key, value in shared_cache().stats().items():
+            print(f"  {key}: {value}")
+
+    def do_reload(self, arg):
+        self.session.reload()
+        print("  ✓ texture cache, atlas index and symbol resolver dropped")
+
+    def do_quit(self, arg):
+        return True
+
+    do_exit = do_quit
+
+    def do_EOF(self, arg):
+        print()
+        return True
+
+    def emptyline(self):
+        pass
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.command == "shell":
+        RebuildShell(parser).cmdloop()
+    elif args.command:
+        args.handler(args, Session())
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
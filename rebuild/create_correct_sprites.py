@@ -5,11 +5,13 @@ Based on HAR analysis:
 - 20d7ad009ff2a804684180e437657b33.png contains card symbols (s_symbol03-11)
 - 23bfabb9d5ef72343b051b518fe1a995.png contains Pharaoh/Cleopatra transforms
 """
-from PIL import Image
 import os
 
-ASSETS_DIR = "/home/supa/test22/AncientEgyptPM_Local/rebuild/assets"
-SPRITES_DIR = "/home/supa/test22/AncientEgyptPM_Local/rebuild/sprites"
+from sprite_batch import run_batch, table_jobs
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(REBUILD_DIR, "assets")
+SPRITES_DIR = os.path.join(REBUILD_DIR, "sprites")
 
 # Card symbols texture - 20d7ad009ff2a804684180e437657b33.png
 # These are the playing card symbols (A, K, Q, J, 10, 9) in Ancient Egypt style
@@ -39,44 +41,13 @@ PHARAOH_SYMBOL = {
     'symbol01.png': {'x': 0, 'y': 1572, 'w': 434, 'h': 435},
 }
 
-def extract_sprite(texture_path, coords, output_name):
-    """Extract a single sprite from a texture"""
-    try:
-        img = Image.open(texture_path)
-        x, y, w, h = coords['x'], coords['y'], coords['w'], coords['h']
-        
-        # Crop the sprite
-        sprite = img.crop((x, y, x + w, y + h))
-        
-        # Save
-        output_path = os.path.join(SPRITES_DIR, output_name)
-        sprite.save(output_path)
-        print(f"  ✓ {output_name} ({w}x{h})")
-        return True
-    except Exception as e:
-        print(f"  ✗ {output_name}: {e}")
-        return False
-
 def main():
     print("=== Creating Correct Symbol Sprites ===\n")
     
-    # Extract card symbols
-    print(f"From {CARD_TEXTURE}:")
-    texture_path = os.path.join(ASSETS_DIR, CARD_TEXTURE)
-    if os.path.exists(texture_path):
-        for name, coords in CARD_SYMBOLS.items():
-            extract_sprite(texture_path, coords, name)
-    else:
-        print(f"  ✗ Texture not found!")
-    
-    # Extract pharaoh
-    print(f"\nFrom {PHARAOH_TEXTURE}:")
-    texture_path = os.path.join(ASSETS_DIR, PHARAOH_TEXTURE)
-    if os.path.exists(texture_path):
-        for name, coords in PHARAOH_SYMBOL.items():
-            extract_sprite(texture_path, coords, name)
-    else:
-        print(f"  ✗ Texture not found!")
+    # Card symbols and pharaoh: one decode per sheet, sheets in parallel
+    print(f"From {CARD_TEXTURE} and {PHARAOH_TEXTURE}:")
+    jobs = table_jobs(CARD_SYMBOLS, CARD_TEXTURE) + table_jobs(PHARAOH_SYMBOL, PHARAOH_TEXTURE)
+    run_batch(jobs, ASSETS_DIR, SPRITES_DIR)
     
     print("\n✓ Done! Sprites saved to:", SPRITES_DIR)
 
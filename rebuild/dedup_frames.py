@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Collapse duplicate animation frames (s_fire_normal_00-14, s_symbolNN_win_*...).
+
+Frames are grouped into sequences by name (fire_00.png, fire_01.png... ->
+"fire"). A group only counts as an animation when its indices are zero-padded
+to one width (fire_00, fire_01) or run 0, 1, 2... without gaps, so distinct
+sprites that merely end in a number (symbol_9 / symbol_10, sample_a3eb_1) are
+left alone. Frames are only compared within their own sequence. Every frame
+of one size is stacked into a single array and gets a 64-bit difference hash
+in one vectorized pass; frames whose hashes are within
+--hash-distance bits are then compared pixel by pixel (fully transparent
+pixels count as equal whatever their RGB). A frame identical to an earlier one
+(or within --tolerance per channel) is dropped in favour of that one.
+
+Writes rebuild/frames.json: per sequence, the stored frames and a timeline
+mapping each original frame index to a stored one, plus a duplicate -> kept
+file map. pack_atlas.py reads that map, packs only the kept frames and points
+the duplicates' frame names at the same atlas rect.
+
+    python dedup_frames.py                      # every sequence in rebuild/sprites
+    python dedup_frames.py "fire_*.png" --tolerance 2
+"""
+import argparse
+import fnmatch
+import json
+import os
+import re
+
+import numpy as np
+from PIL import Image
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+SPRITES_DIR = os.path.join(REBUILD_DIR, "sprites")
+FRAMES_FILE = os.path.join(REBUILD_DIR, "frames.json")
+FRAME_PATTERN = re.compile(r"^(?P<base>.+)_(?P<index>\d+)\.png$")
+HASH_SIZE = 8
+
+def is_animation(indices):
+    """True for 2+ frame indices zero-padded to one width ('00', '01') or running 0, 1, 2... without gaps."""
+    if len(indices) < 2:
+        return False
+    widths = {len(index) for index in indices}
+    if len(widths) == 1 and widths.pop() > 1 and any(index.startswith("0") for index in indices):
+        return True
+    return sorted(int(index) for index in indices) == list(range(len(indices)))
+
+def sequences(files):
+    """{base name: [files in frame order]} for animation frames named like base_00.png."""
+    found = {}
+    for filename in files:
+        m = FRAME_PATTERN.match(filename)
+        if m:
+            found.setdefault(m.group("base"), []).append((m.group("index"), filename))
+    return {base: [f for _, f in sorted(frames, key=lambda frame: int(frame[0]))]
+            for base, frames in sorted(found.items()) if is_animation([index for index, _ in frames])}
+
+def load_frame(path):
+    """RGBA uint8 array with the RGB of fully transparent pixels zeroed."""
+    with Image.open(path) as img:
+        pixels = np.array(img.convert("RGBA"))
+    pixels[pixels[..., 3] == 0] = 0
+    return pixels
+
+def dhash(stack, size=HASH_SIZE):
+    """64-bit difference hash of every frame in an (N, H, W, 4) stack."""
+    n, height, width = stack.shape[:3]
+    gray = (stack[..., :3].astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32))
+    gray *= stack[..., 3] / 255.0
+    # Block means over a (size) x (size + 1) grid, all frames at once
+    rows = np.linspace(0, height, size + 1).astype(np.intp)
+    cols = np.linspace(0, width, size + 2).astype(np.intp)
+    blocks = np.add.reduceat(np.add.reduceat(gray, rows[:-1], axis=1), cols[:-1], axis=2)
+    blocks /= np.outer(np.maximum(np.diff(rows), 1), np.maximum(np.diff(cols), 1))
+    bits = blocks[:, :, 1:] > blocks[:, :, :-1]
+    return np.packbits(bits.reshape(n, -1), axis=1).view(">u8").ravel()
+
+def hamming(hashes):
+    """(N, N) matrix of differing hash bits."""
+    xor = hashes[:, None] ^ hashes[None, :]
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(xor)
+    return np.unpackbits(xor.astype(">u8").view(np.uint8).reshape(*xor.shape, 8), axis=-1).sum(axis=-1)
+
+def find_duplicates(paths, hash_distance=4, tolerance=0):
+    """{duplicate path: kept path}; the first frame of each identical set is kept."""
+    by_size = {}
+    for path in paths:
+        with Image.open(path) as img:
+            by_size.setdefault(img.size, []).append(path)
+
+    duplicates = {}
+    for group in by_size.values():
+        if len(group) < 2:
+            continue
+        stack = np.stack([load_frame(path) for path in group])
+        close = hamming(dhash(stack)) <= hash_distance
+        kept_as = np.arange(len(group))
+        for i in range(len(group)):
+            if kept_as[i] != i:
+                continue
+            candidates = np.flatnonzero(close[i, i + 1:]) + i + 1
+            candidates = candidates[kept_as[candidates] == candidates]
+            if not len(candidates):
+                continue
+            diff = np.abs(stack[candidates].astype(np.int16) - stack[i]).max(axis=(1, 2, 3))
+            kept_as[candidates[diff <= tolerance]] = i
+        for j, i in enumerate(kept_as):
+            if i != j:
+                duplicates[group[j]] = group[i]
+    return duplicates
+
+def dedup_frames(patterns=None, hash_distance=4, tolerance=0, sprites_dir=SPRITES_DIR, output=FRAMES_FILE):
+    files = sorted(os.listdir(sprites_dir))
+    if patterns:
+        files = [f for f in files if any(fnmatch.fnmatch(f, p) for p in patterns)]
+    seqs = sequences(files)
+    duplicates = {}
+    # Never across sequences: with --tolerance two different animations could alias each other
+    for frames in seqs.values():
+        paths = [os.path.join(sprites_dir, f) for f in frames]
+        duplicates.update((os.path.basename(d), os.path.basename(k))
+                          for d, k in find_duplicates(paths, hash_distance, tolerance).items())
+
+    table = {}
+    saved_bytes = saved_gpu = 0
+    for base, frames in seqs.items():
+        stored = []
+        timeline = []
+        for filename in frames:
+            kept = duplicates.get(filename, filename)
+            if kept not in stored:
+                stored.append(kept)
+            timeline.append(stored.index(kept))
+        table[base] = {"frames": frames, "stored": stored, "timeline": timeline}
+        for filename in frames:
+            if filename in duplicates:
+                saved_bytes += os.path.getsize(os.path.join(sprites_dir, filename))
+                with Image.open(os.path.join(sprites_dir, filename)) as img:
+                    saved_gpu += img.width * img.height * 4
+        print(f"  ✓ {base}: {len(frames)} frames -> {len(stored)} stored")
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({"sequences": table, "duplicates": duplicates}, f, indent=1)
+    print(f"\n  {len(duplicates)} duplicate frames: {saved_bytes / 1024:.0f} KB on disk, "
+          f"{saved_gpu / (1024 * 1024):.1f} MB of GPU memory saved")
+    print(f"✓ Frame map saved to: {output}")
+    return duplicates
+
+def main():
+    parser = argparse.ArgumentParser(description="Collapse duplicate animation frames")
+    parser.add_argument("patterns", nargs="*", help="sprite name patterns, e.g. 'fire_*.png' (default: all sequences)")
+    parser.add_argument("--hash-distance", type=int, default=4,
+                        help="max differing dHash bits before pixels are compared (default: 4)")
+    parser.add_argument("--tolerance", type=int, default=0,
+                        help="max per-channel difference still counted as the same frame (default: 0, exact)")
+    parser.add_argument("-o", "--output", default=FRAMES_FILE, help=f"output JSON (default: {FRAMES_FILE})")
+    args = parser.parse_args()
+
+    print("=== Deduplicating animation frames ===\n")
+    dedup_frames(args.patterns, args.hash_distance, args.tolerance, output=args.output)
+
+if __name__ == "__main__":
+    main()
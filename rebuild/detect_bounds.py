@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Detect sprite bounding boxes in texture sheets from their alpha channel.
+
+Each sheet's opaque pixels are run-length encoded per row, runs that touch on
+neighbouring rows are joined with a vectorized union-find, and every connected
+component becomes one tight bounding box. --gap merges pieces closer than N
+pixels (glows, sparkles) into the sprite they belong to. With scipy installed
+ndimage.label does the labelling instead; the boxes are the same.
+
+Writes a candidate coordinate table to rebuild/sprite_bounds.json. Boxes
+that line up with a sprite from the atlas index / game.json are named.
+
+    python detect_bounds.py                         # every GUID atlas in assets/
+    python detect_bounds.py d382e624bd6f17e43b3be7022061a3ca.png --gap 4
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from texture_cache import shared_cache
+
+try:
+    from scipy import ndimage
+except ImportError:
+    ndimage = None
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(REBUILD_DIR, "assets")
+BOUNDS_FILE = os.path.join(REBUILD_DIR, "sprite_bounds.json")
+ATLAS_PATTERN = re.compile(r"^[0-9a-f]{32}\.png$")
+
+def alpha_mask(img, threshold=0):
+    """Boolean array of pixels with alpha above threshold."""
+    if img.mode == "P":
+        # Palette sheets carry alpha in tRNS: look it up instead of converting to RGBA
+        lut = np.full(256, 255, dtype=np.uint8)
+        transparency = img.info.get("transparency")
+        if isinstance(transparency, bytes):
+            lut[:len(transparency)] = np.frombuffer(transparency, dtype=np.uint8)
+        elif isinstance(transparency, int):
+            lut[transparency] = 0
+        return (lut > threshold)[np.asarray(img)]
+    if img.mode in ("RGBA", "LA", "PA"):
+        return np.asarray(img.getchannel("A")) > threshold
+    if "transparency" in img.info:
+        return np.asarray(img.convert("RGBA").getchannel("A")) > threshold
+    return np.ones((img.height, img.width), dtype=bool)
+
+def dilate(mask, gap):
+    """Grow the mask by gap pixels in x and y (separable, OR of shifted copies)."""
+    if gap <= 0:
+        return mask
+    out = mask.copy()
+    # Rows first, then columns of the row-grown mask: a (2*gap+1) square
+    for step in range(1, gap + 1):
+        out[:, step:] |= mask[:, :-step]
+        out[:, :-step] |= mask[:, step:]
+    rows = out.copy()
+    for step in range(1, gap + 1):
+        out[step:] |= rows[:-step]
+        out[:-step] |= rows[step:]
+    return out
+
+def row_runs(mask):
+    """(row, start, end) arrays of horizontal runs of True, sorted by row then start."""
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=bool)
+    padded[:, 1:-1] = mask
+    # Every row starts and ends transparent, so its edges alternate start, end, start...
+    edges = np.flatnonzero(padded[:, 1:] != padded[:, :-1])
+    rows, starts = np.divmod(edges[0::2], width + 1)
+    ends = edges[1::2] - rows * (width + 1)
+    return rows, starts, ends
+
+def _touching_runs(rows, starts, ends, width, diagonal=True):
+    """Index pairs (a, b) of runs on consecutive rows that overlap."""
+    stride = width + 2
+    # Flatten (row, x) into one sorted key so one searchsorted covers every row pair
+    start_keys = rows * stride + starts
+    end_keys = rows * stride + ends
+    slack = 1 if diagonal else 0
+    above = (rows - 1) * stride
+    lo = np.searchsorted(end_keys, above + starts - slack, side='right')
+    hi = np.searchsorted(start_keys, above + ends + slack, side='left')
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    if not total:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    below = np.repeat(np.arange(len(rows)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(lo, counts) + offsets, below
+
+def _union_find(n, a, b):
+    """Component label per node for the undirected edges a-b (root hooking + pointer jumping)."""
+    labels = np.arange(n)
+    while True:
+        la, lb = labels[a], labels[b]
+        open_edges = la != lb
+        if not open_edges.any():
+            return labels
+        # Edges inside one component are done; only the rest are looked at again
+        a, b, la, lb = a[open_edges], b[open_edges], la[open_edges], lb[open_edges]
+        # Every label is a root here: hook the higher root under the lower one
+        np.minimum.at(labels, np.maximum(la, lb), np.minimum(la, lb))
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+def label_runs(mask, diagonal=True):
+    """(rows, starts, ends, run labels) for the connected components of mask."""
+    rows, starts, ends = row_runs(mask)
+    a, b = _touching_runs(rows, starts, ends, mask.shape[1], diagonal)
+    return rows, starts, ends, _union_find(len(rows), a, b)
+
+def _boxes_from_runs(rows, starts, ends, labels):
+    order = np.argsort(labels, kind='stable')
+    labels, rows, starts, ends = labels[order], rows[order], starts[order], ends[order]
+    first = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    return np.stack([
+        np.minimum.reduceat(starts, first),
+        np.minimum.reduceat(rows, first),
+        np.maximum.reduceat(ends, first),
+        np.maximum.reduceat(rows, first) + 1,
+        np.add.reduceat(ends - starts, first),
+    ], axis=1)
+
+def component_boxes(mask, gap=0, diagonal=True):
+    """[x0, y0, x1, y1, opaque pixels] per connected component, in pixels of the original mask."""
+    if not mask.any():
+        return np.empty((0, 5), dtype=np.int64)
+    grouped = dilate(mask, gap)
+
+    if ndimage is not None:
+        structure = np.ones((3, 3)) if diagonal else None
+        label_image, _ = ndimage.label(grouped, structure=structure)
+        rows, starts, ends = row_runs(mask)
+        # Every run of the original mask lies inside one grouped component
+        labels = label_image[rows, starts]
+        return _boxes_from_runs(rows, starts, ends, labels)
+
+    g_rows, g_starts, g_ends, g_labels = label_runs(grouped, diagonal)
+    if gap <= 0:
+        return _boxes_from_runs(g_rows, g_starts, g_ends, g_labels)
+    rows, starts, ends = row_runs(mask)
+    stride = mask.shape[1] + 2
+    # The grouped run that contains each original run carries its label
+    owner = np.searchsorted(g_rows * stride + g_starts, rows * stride + starts, side='right') - 1
+    return _boxes_from_runs(rows, starts, ends, g_labels[owner])
+
+def detect(texture_path, gap=0, min_area=16, threshold=0, diagonal=True):
+    """Sorted list of {"x", "y", "w", "h", "area"} boxes for one sheet."""
+    img = shared_cache().get(texture_path)
+    boxes = component_boxes(alpha_mask(img, threshold), gap, diagonal)
+    boxes = boxes[boxes[:, 4] >= min_area]
+    # Reading order: top to bottom, then left to right
+    boxes = boxes[np.lexsort((boxes[:, 0], boxes[:, 1]))]
+    return [{"x": int(x0), "y": int(y0), "w": int(x1 - x0), "h": int(y1 - y0), "area": int(area)}
+            for x0, y0, x1, y1, area in boxes]
+
+def _iou(a, b):
+    ix = max(0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+def known_rects():
+    """{texture file: [(sprite name, (x, y, w, h))]} from game.json / the atlas index."""
+    try:
+        from find_symbols import SymbolResolver
+        resolver = SymbolResolver()
+    except Exception as e:
+        print(f"  (no sprite names: {e})")
+        return {}
+    by_file = {}
+    for name, records in resolver.resolve(list(resolver.sprites)).items():
+        for _, _, filename, rect in records:
+            if filename:
+                by_file.setdefault(filename, []).append((name, rect))
+    return by_file
+
+def name_boxes(boxes, rects, min_iou=0.5):
+    """Attach the best-overlapping known sprite name to each box."""
+    for box in boxes:
+        rect = (box["x"], box["y"], box["w"], box["h"])
+        best = max(rects, key=lambda item: _iou(rect, item[1]), default=None)
+        if best and _iou(rect, best[1]) >= min_iou:
+            box["name"] = best[0]
+            box["iou"] = round(_iou(rect, best[1]), 3)
+
+def detect_bounds(textures=None, gap=0, min_area=16, threshold=0, diagonal=True, names=True,
+                  assets_dir=ASSETS_DIR, output=BOUNDS_FILE):
+    if not textures:
+        textures = sorted(f for f in os.listdir(assets_dir) if ATLAS_PATTERN.match(f))
+    rects = known_rects() if names else {}
+
+    table = {}
+    start = time.perf_counter()
+    for texture in textures:
+        path = os.path.join(assets_dir, texture)
+        if not os.path.exists(path):
+            print(f"  ✗ Texture not found: {texture}")
+            continue
+        t0 = time.perf_counter()
+        boxes = detect(path, gap, min_area, threshold, diagonal)
+        elapsed = time.perf_counter() - t0
+        if rects.get(texture):
+            name_boxes(boxes, rects[texture])
+        named = sum(1 for box in boxes if "name" in box)
+        table[texture] = boxes
+        print(f"  ✓ {texture}: {len(boxes)} sprites ({named} named) in {elapsed * 1000:.0f}ms")
+    total = time.perf_counter() - start
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(table, f, indent=1)
+    print(f"\n  {sum(len(b) for b in table.values())} boxes on {len(table)} sheets in {total:.2f}s "
+          f"({'scipy' if ndimage is not None else 'numpy'} labelling)")
+    print(f"✓ Candidate table saved to: {output}")
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description="Find sprite bounding boxes from texture alpha channels")
+    parser.add_argument("textures", nargs="*", help="texture files in rebuild/assets (default: every GUID atlas)")
+    parser.add_argument("--gap", type=int, default=0, help="merge components closer than this many pixels (default: 0)")
+    parser.add_argument("--min-area", type=int, default=16, help="drop components with fewer opaque pixels (default: 16)")
+    parser.add_argument("--threshold", type=int, default=0, help="alpha above this counts as opaque (default: 0)")
+    parser.add_argument("--four-connected", action="store_true", help="don't join pixels that only touch diagonally")
+    parser.add_argument("--no-names", action="store_true", help="skip matching boxes against known sprite rects")
+    parser.add_argument("-o", "--output", default=BOUNDS_FILE, help=f"output JSON (default: {BOUNDS_FILE})")
+    args = parser.parse_args()
+
+    print("=== Detecting sprite bounds ===\n")
+    detect_bounds(args.textures, args.gap, args.min_area, args.threshold, not args.four_connected,
+                  not args.no_names, output=args.output)
+
+if __name__ == "__main__":
+    main()
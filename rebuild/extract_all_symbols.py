@@ -3,11 +3,13 @@
 Extract ALL slot symbols from the texture sheets.
 Coordinates from HAR file analysis.
 """
-from PIL import Image
 import os
 
-ASSETS_DIR = "/home/supa/test22/AncientEgyptPM_Local/rebuild/assets"
-SPRITES_DIR = "/home/supa/test22/AncientEgyptPM_Local/rebuild/sprites"
+from sprite_batch import run_batch, table_jobs
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(REBUILD_DIR, "assets")
+SPRITES_DIR = os.path.join(REBUILD_DIR, "sprites")
 
 # All symbol definitions from HAR analysis
 # Format: (output_name, texture_file, x, y, width, height)
@@ -51,33 +53,10 @@ SYMBOLS = [
     ("symbol11.png", "790a6ca683676d443a6b84175a48333b.png", 0, 175, 199, 171),
 ]
 
-def extract_sprite(texture_file, x, y, w, h, output_name):
-    """Extract a sprite from a texture"""
-    texture_path = os.path.join(ASSETS_DIR, texture_file)
-    if not os.path.exists(texture_path):
-        print(f"  ✗ Texture not found: {texture_file}")
-        return False
-    
-    try:
-        img = Image.open(texture_path)
-        # Ensure we don't go out of bounds
-        x2 = min(x + w, img.width)
-        y2 = min(y + h, img.height)
-        sprite = img.crop((x, y, x2, y2))
-        
-        output_path = os.path.join(SPRITES_DIR, output_name)
-        sprite.save(output_path)
-        print(f"  ✓ {output_name} ({sprite.width}x{sprite.height})")
-        return True
-    except Exception as e:
-        print(f"  ✗ {output_name}: {e}")
-        return False
-
 def main():
     print("=== Extracting All Slot Symbols ===\n")
     
-    for name, tex, x, y, w, h in SYMBOLS:
-        extract_sprite(tex, x, y, w, h, name)
+    run_batch(table_jobs(SYMBOLS), ASSETS_DIR, SPRITES_DIR, clamp=True)
     
     print("\n✓ Done!")
 
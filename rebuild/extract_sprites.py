@@ -2,11 +2,13 @@
 """
 Extract individual sprites from sprite sheets
 """
-from PIL import Image
 import os
 
-ASSETS_DIR = "assets"
-OUTPUT_DIR = "sprites"
+from sprite_batch import CropJob, run_batch
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(REBUILD_DIR, "assets")
+OUTPUT_DIR = os.path.join(REBUILD_DIR, "sprites")
 
 # Sprite definitions from HAR analysis
 # Format: (sprite_name, source_png, x, y, width, height)
@@ -45,24 +47,9 @@ SPRITES = [
 ]
 
 def extract_sprites():
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    for sprite_name, source_file, x, y, w, h in SPRITES:
-        source_path = os.path.join(ASSETS_DIR, source_file)
-        if not os.path.exists(source_path):
-            print(f"Source not found: {source_file}")
-            continue
-        
-        try:
-            img = Image.open(source_path)
-            # Crop the sprite
-            sprite = img.crop((x, y, x + w, y + h))
-            output_path = os.path.join(OUTPUT_DIR, f"{sprite_name}.png")
-            sprite.save(output_path)
-            print(f"Extracted: {sprite_name} ({w}x{h})")
-        except Exception as e:
-            print(f"Error extracting {sprite_name}: {e}")
+    jobs = [CropJob(source_file, x, y, w, h, f"{sprite_name}.png")
+            for sprite_name, source_file, x, y, w, h in SPRITES]
+    run_batch(jobs, ASSETS_DIR, OUTPUT_DIR)
 
 if __name__ == "__main__":
-    os.chdir(os.path.dirname(os.path.abspath(__file__)))
     extract_sprites()
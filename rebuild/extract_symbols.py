@@ -4,11 +4,13 @@ Extract slot symbols from the texture sheets we have.
 The idle symbols aren't in the HAR, but we have animation frames.
 We'll use the first win frame as the symbol image.
 """
-from PIL import Image
 import os
 
-ASSETS_DIR = "/home/supa/test22/AncientEgyptPM_Local/rebuild/assets"
-SPRITES_DIR = "/home/supa/test22/AncientEgyptPM_Local/rebuild/sprites"
+from sprite_batch import run_batch, table_jobs
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(REBUILD_DIR, "assets")
+SPRITES_DIR = os.path.join(REBUILD_DIR, "sprites")
 
 # Symbol mappings from HAR analysis
 # Format: (output_name, texture_file, x, y, width, height)
@@ -43,38 +45,14 @@ TEXTURE_SAMPLES = [
     ("sample_bfd9_1.png", "bfd97fe4b826f8f46b85743fa3d3687b.png", 0, 0, 400, 400),
 ]
 
-def extract_sprite(texture_file, x, y, w, h, output_name):
-    """Extract a sprite from a texture"""
-    texture_path = os.path.join(ASSETS_DIR, texture_file)
-    if not os.path.exists(texture_path):
-        print(f"  ✗ Texture not found: {texture_file}")
-        return False
-    
-    try:
-        img = Image.open(texture_path)
-        # Ensure we don't go out of bounds
-        x2 = min(x + w, img.width)
-        y2 = min(y + h, img.height)
-        sprite = img.crop((x, y, x2, y2))
-        
-        output_path = os.path.join(SPRITES_DIR, output_name)
-        sprite.save(output_path)
-        print(f"  ✓ {output_name} ({sprite.width}x{sprite.height})")
-        return True
-    except Exception as e:
-        print(f"  ✗ {output_name}: {e}")
-        return False
-
 def main():
     print("=== Extracting Slot Symbols ===\n")
     
     print("Main symbols:")
-    for name, tex, x, y, w, h in SYMBOLS:
-        extract_sprite(tex, x, y, w, h, name)
+    run_batch(table_jobs(SYMBOLS), ASSETS_DIR, SPRITES_DIR, clamp=True)
     
     print("\nTexture samples (to find card symbols):")
-    for name, tex, x, y, w, h in TEXTURE_SAMPLES:
-        extract_sprite(tex, x, y, w, h, name)
+    run_batch(table_jobs(TEXTURE_SAMPLES), ASSETS_DIR, SPRITES_DIR, clamp=True)
     
     print("\n✓ Done! Check the samples to find the card symbols.")
 
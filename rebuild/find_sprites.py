@@ -1,65 +1,212 @@
 #!/usr/bin/env python3
 """
 Extract sprite sheet information from HAR file
+
+The embedded game JSON is parsed once and every UIAtlas spriteList is written
+to a compact index (atlas_index.json). Later lookups load that index instead
+of re-scanning the HAR:
+
+    python find_sprites.py                   # summary of all atlases
+    python find_sprites.py s_bg              # one sprite
+    python find_sprites.py 's_symbol*'       # prefix
+    python find_sprites.py --texture GUID    # everything on one sheet
 """
+import argparse
+import bisect
 import json
-import re
-
-HAR_FILE = "/home/supa/test22/AncientEgyptPM_Local/demo.mortalsoft.net.har"
-
-def find_sprites():
-    with open(HAR_FILE, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-    
-    # Find all texture references with their sprite lists
-    # Pattern: "textureContent".*"guid":"HASH".*"spriteList"
-    
-    # Find all PNG file references (escaped in JSON)
-    png_pattern = r'res/([a-f0-9]{32})\.png'
-    pngs = set(re.findall(png_pattern, content))
-    
+import os
+import sys
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(REBUILD_DIR)
+sys.path.insert(0, ROOT_DIR)
+from har_stream import iter_body, iter_har_entries
+from instrument import span
+
+HAR_FILE = os.path.join(ROOT_DIR, "demo.mortalsoft.net.har")
+INDEX_FILE = os.path.join(REBUILD_DIR, "atlas_index.json")
+INDEX_VERSION = 1
+
+# (index file mtime, index): a long-lived process (cli.py shell) parses it once
+_loaded = None
+
+def iter_atlases(game_data):
+    """Yield (atlas_name, texture_guid, sprite_list) for every UIAtlas component."""
+    stack = [(game_data, None)]
+    while stack:
+        node, name = stack.pop()
+        if isinstance(node, dict):
+            name = node.get("name", name)
+            if node.get("componentType") == "UIAtlas":
+                # Any of these may be missing or null; guid is then None
+                data = node.get("serializableData") or {}
+                guid = (data.get("textureContent") or {}).get("guid")
+                yield name, guid, data.get("spriteList") or {}
+                continue
+            stack.extend((value, name) for value in node.values() if isinstance(value, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend((value, name) for value in reversed(node) if isinstance(value, (dict, list)))
+
+def iter_game_json(har_file):
+    """Yield the parsed game JSON bodies embedded in the HAR."""
+    for entry in iter_har_entries(har_file):
+        content = entry.get('response', {}).get('content', {})
+        text = content.get('text', '')
+        if not text:
+            continue
+        if content.get('encoding') == 'base64':
+            text = b''.join(iter_body(text, 'base64')).decode('utf-8', errors='ignore')
+        if 'UIAtlas' not in text:
+            continue
+        try:
+            with span("game_json.parse", url=entry['request']['url'], bytes=len(text)):
+                game_data = json.loads(text)
+            yield entry['request']['url'], game_data
+        except ValueError:
+            print(f"  Skipping non-JSON atlas body: {entry['request']['url']}")
+
+def build_index(har_file):
+    """Walk every UIAtlas in the HAR once and write INDEX_FILE."""
+    print(f"Indexing atlases in {har_file}...")
+    sprites = {}
+    textures = {}
+    atlases = {}
+    for url, game_data in iter_game_json(har_file):
+        for atlas, guid, sprite_list in iter_atlases(game_data):
+            atlases.setdefault(atlas, guid)
+            for sprite_name, rect in sprite_list.items():
+                record = [atlas, guid, rect.get('x', 0), rect.get('y', 0), rect.get('width', 0), rect.get('height', 0)]
+                if record not in sprites.setdefault(sprite_name, []):
+                    sprites[sprite_name].append(record)
+                    if guid:
+                        textures.setdefault(guid, []).append(sprite_name)
+
+    st = os.stat(har_file)
+    index = {
+        "version": INDEX_VERSION,
+        "har": {"path": os.path.abspath(har_file), "size": st.st_size, "mtime_ns": st.st_mtime_ns},
+        "atlases": atlases,
+        "sprites": sprites,
+        "textures": textures,
+    }
+    with open(INDEX_FILE, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'), sort_keys=True)
+    print(f"Indexed {len(sprites)} sprites on {len(textures)} textures -> {INDEX_FILE}")
+    return index
+
+def _is_fresh(index, har_file):
+    if index.get("version") != INDEX_VERSION:
+        return False
+    if not os.path.exists(har_file):
+        return True  # the index outlives the capture
+    st = os.stat(har_file)
+    har = index.get("har", {})
+    return har.get("size") == st.st_size and har.get("mtime_ns") == st.st_mtime_ns
+
+def load_index(har_file=HAR_FILE, rebuild=False):
+    """Load the cached index, rebuilding it if the HAR changed."""
+    global _loaded
+    if not rebuild and os.path.exists(INDEX_FILE):
+        mtime = os.stat(INDEX_FILE).st_mtime_ns
+        if _loaded and _loaded[0] == mtime:
+            index = _loaded[1]
+        else:
+            with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        if _is_fresh(index, har_file):
+            _loaded = (mtime, index)
+            return index
+    if not os.path.exists(har_file):
+        print(f"Error: {har_file} not found and no index cached.")
+        return None
+    with span("atlas.index", har=har_file):
+        index = build_index(har_file)
+    _loaded = (os.stat(INDEX_FILE).st_mtime_ns, index)
+    return index
+
+class AtlasIndex:
+    """Lookups over a loaded index: by name, by prefix, by texture."""
+
+    def __init__(self, index):
+        self.sprites = index["sprites"]
+        self.textures = index["textures"]
+        self.atlases = index["atlases"]
+        self.names = sorted(self.sprites)
+
+    def lookup(self, name):
+        return self.sprites.get(name, [])
+
+    def prefix(self, prefix):
+        start = bisect.bisect_left(self.names, prefix)
+        end = bisect.bisect_left(self.names, prefix + '\uffff')
+        return self.names[start:end]
+
+    def query(self, pattern):
+        """Exact sprite name, or a prefix when pattern ends with '*'."""
+        if pattern.endswith('*'):
+            return self.prefix(pattern[:-1])
+        return [pattern] if pattern in self.sprites else []
+
+    def on_texture(self, guid):
+        return self.textures.get(guid, [])
+
+def print_sprite(index, name):
+    for atlas, guid, x, y, w, h in index.lookup(name):
+        sheet = f"{guid}.png" if guid else "no texture"
+        print(f"  {name}: x={x}, y={y}, w={w}, h={h}  [{sheet}, atlas {atlas}]")
+
+def find_sprites(har_file=HAR_FILE, rebuild=False):
+    data = load_index(har_file, rebuild)
+    if data is None:
+        return
+    index = AtlasIndex(data)
+
     print("=== PNG Textures Referenced ===")
-    for png in sorted(pngs):
-        print(f"  {png}.png")
-    
-    print(f"\nTotal: {len(pngs)} textures")
-    
-    # The HAR has escaped JSON, so we need to handle \" and \r\n
-    # Pattern for escaped JSON: \"s_something\" : \r\n{\r\n\"x\":0
-    sprite_pattern = r'\\"(s_[a-zA-Z0-9_]+)\\"[^}]*\\"x\\":(\d+)[^}]*\\"y\\":(\d+)[^}]*\\"width\\":(\d+)[^}]*\\"height\\":(\d+)'
-    sprites = re.findall(sprite_pattern, content)
-    
-    print(f"\n=== Sprites Found ({len(sprites)} total) ===")
-    seen = set()
+    for guid in sorted(index.textures):
+        print(f"  {guid}.png")
+
+    print(f"\nTotal: {len(index.textures)} textures")
+
+    print(f"\n=== Sprites Found ({len(index.sprites)} total) ===")
     keywords = ['bg', 'symbol', 'frame', 'logo', 'title', 'fire', 'column', 'pillar']
-    for sprite in sprites:
-        name = sprite[0]
-        if name not in seen:
-            for kw in keywords:
-                if kw in name.lower():
-                    print(f"  {name}: x={sprite[1]}, y={sprite[2]}, w={sprite[3]}, h={sprite[4]}")
-                    seen.add(name)
-                    break
-            if len(seen) > 50:
-                break
-    
-    # Also show symbol sprites
-    print("\n=== Symbol Sprites ===")
-    symbol_count = 0
-    for sprite in sprites:
-        name = sprite[0]
-        if 'symbol' in name.lower() and symbol_count < 20:
-            print(f"  {name}: x={sprite[1]}, y={sprite[2]}, w={sprite[3]}, h={sprite[4]}")
-            symbol_count += 1
-    
+    for name in index.names:
+        if any(kw in name.lower() for kw in keywords):
+            print_sprite(index, name)
+
     # Find texture-to-sprite mappings
     print("\n=== Texture Mappings ===")
-    texture_pattern = r'\\"guid\\":\\"([a-f0-9]{32})\\"}[^}]*\\"spriteList\\"[^{]*\{([^}]+)\}'
-    mappings = re.findall(texture_pattern, content)
-    for guid, sprite_list in mappings[:10]:
-        sprite_names = re.findall(r'\\"(s_[a-zA-Z0-9_]+)\\"', sprite_list)
-        if sprite_names:
-            print(f"  {guid}.png contains: {', '.join(sprite_names[:5])}...")
+    for guid in sorted(index.textures):
+        sprite_names = index.on_texture(guid)
+        print(f"  {guid}.png contains {len(sprite_names)}: {', '.join(sprite_names[:5])}...")
+
+def query_sprites(queries=(), texture=None, har_file=HAR_FILE, rebuild=False):
+    """Print the sprites matching names / 'prefix*' patterns and those on one texture GUID."""
+    if not queries and not texture:
+        find_sprites(har_file, rebuild)
+        return
+
+    data = load_index(har_file, rebuild)
+    if data is None:
+        return
+    index = AtlasIndex(data)
+    if texture:
+        for name in index.on_texture(texture):
+            print_sprite(index, name)
+    for pattern in queries:
+        names = index.query(pattern)
+        if not names:
+            print(f"  {pattern}: not found")
+        for name in names:
+            print_sprite(index, name)
+
+def main():
+    parser = argparse.ArgumentParser(description="Find sprite coordinates from the HAR's UIAtlas data")
+    parser.add_argument("queries", nargs="*", help="sprite names, or prefixes ending in '*'")
+    parser.add_argument("--har", default=HAR_FILE, help="HAR capture to index")
+    parser.add_argument("--texture", help="list every sprite on this texture GUID")
+    parser.add_argument("--rebuild", action="store_true", help="re-index even if the cache is fresh")
+    args = parser.parse_args()
+    query_sprites(args.queries, args.texture, args.har, args.rebuild)
 
 if __name__ == "__main__":
-    find_sprites()
+    main()
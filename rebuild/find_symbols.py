@@ -1,75 +1,147 @@
 
+import argparse
+import hashlib
 import json
 import os
 import re
 
-GAME_JSON = "rebuild/assets/game.json"
-ASSETS_DIR = "rebuild/assets"
+from find_sprites import INDEX_FILE, REBUILD_DIR, ROOT_DIR, AtlasIndex, iter_atlases, load_index
 
-def find_symbol_texture():
-    if not os.path.exists(GAME_JSON):
-        print(f"Error: {GAME_JSON} not found.")
-        return
+ASSETS_DIR = os.path.join(REBUILD_DIR, "assets")
+GAME_JSON = os.path.join(ASSETS_DIR, "game.json")
+GAME_JSONS = [GAME_JSON, os.path.join(ROOT_DIR, "desktop", "client", "game.json")]
+ASSET_TABLE = os.path.join(REBUILD_DIR, "asset_table.json")
 
-    try:
-        with open(GAME_JSON, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"Error reading game.json: {e}")
-        return
+# Common Pragmatic Play symbol names, plus this game's s_symbolNN sprites
+SYMBOL_PATTERN = re.compile(r"s_[HhLl][0-9]|s_[AKQJ]1?|s_symbol\d+")
+GUID_PATTERN = re.compile(r"[a-f0-9]{32}")
+
+def build_asset_table(assets_dir=ASSETS_DIR):
+    """Map GUID-looking filename tokens and content md5s to asset files.
+
+    Digests are cached by (size, mtime) so only new or changed files are hashed.
+    """
+    cached = {}
+    if os.path.exists(ASSET_TABLE):
+        with open(ASSET_TABLE, 'r', encoding='utf-8') as f:
+            cached = json.load(f).get("files", {})
+
+    files = {}
+    by_token = {}
+    by_md5 = {}
+    for filename in sorted(os.listdir(assets_dir)):
+        path = os.path.join(assets_dir, filename)
+        if not os.path.isfile(path):
+            continue
+        st = os.stat(path)
+        info = cached.get(filename)
+        if not info or info["size"] != st.st_size or info["mtime_ns"] != st.st_mtime_ns:
+            with open(path, 'rb') as f:
+                info = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "md5": hashlib.md5(f.read()).hexdigest()}
+        files[filename] = info
+        by_md5.setdefault(info["md5"], filename)
+        for token in GUID_PATTERN.findall(filename):
+            # Prefer the un-numbered name over the "{count}_" duplicates
+            if token not in by_token or len(filename) < len(by_token[token]):
+                by_token[token] = filename
+
+    with open(ASSET_TABLE, 'w', encoding='utf-8') as f:
+        json.dump({"files": files}, f, separators=(',', ':'), sort_keys=True)
+    return by_token, by_md5
+
+class SymbolResolver:
+    """One-pass index of every UIAtlas, answering sprite -> sheet lookups."""
+
+    def __init__(self, game_jsons=GAME_JSONS, assets_dir=ASSETS_DIR, use_har_index=True):
+        self.sprites = {}
+        for path in game_jsons:
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"Error reading {path}: {e}")
+                continue
+            for atlas, guid, sprite_list in iter_atlases(data):
+                for name, rect in sprite_list.items():
+                    self._add(name, atlas, guid, [rect.get('x', 0), rect.get('y', 0),
+                                                  rect.get('width', 0), rect.get('height', 0)])
 
-    resources = data.get("resources", [])
-    
-    # Common Pragmatic Play symbol names
-    symbol_pattern = re.compile(r"s_[HhLl][0-9]|s_[AKQJ]1?")
+        # Atlases from the full game JSON in the capture, if find_sprites.py indexed it
+        if use_har_index and os.path.exists(INDEX_FILE):
+            index = load_index()
+            if index:
+                for name, records in AtlasIndex(index).sprites.items():
+                    for atlas, guid, x, y, w, h in records:
+                        self._add(name, atlas, guid, [x, y, w, h])
 
-    found_texture_guid = None
-    
+        self.by_token, self.by_md5 = build_asset_table(assets_dir)
+
+    def _add(self, name, atlas, guid, rect):
+        record = (atlas, guid, tuple(rect))
+        records = self.sprites.setdefault(name, [])
+        if record not in records:
+            records.append(record)
+
+    def texture_file(self, guid):
+        """Asset file for a texture GUID: by filename first, then content md5."""
+        if not guid:
+            return None
+        return self.by_token.get(guid) or self.by_md5.get(guid)
+
+    def resolve(self, names):
+        """{sprite name: [(atlas, guid, file, (x, y, w, h)), ...]} for all names at once."""
+        return {name: [(atlas, guid, self.texture_file(guid), rect)
+                       for atlas, guid, rect in self.sprites.get(name, [])]
+                for name in names}
+
+    def match(self, patterns):
+        """Sprite names matching exact names, 'prefix*' patterns, or SYMBOL_PATTERN if none given."""
+        if not patterns:
+            return sorted(name for name in self.sprites if SYMBOL_PATTERN.match(name))
+        names = []
+        for pattern in patterns:
+            if pattern.endswith('*'):
+                names += sorted(name for name in self.sprites if name.startswith(pattern[:-1]))
+            else:
+                names.append(pattern)
+        return names
+
+def find_symbol_texture(patterns=None, resolver=None):
     print("Scanning for Symbol Atlas...")
-    
-    for res in resources:
-        if res.get("type") == "GameObject":
-            root = res.get("data", {}).get("root", [])
-            for go in root:
-                for comp in go.get("components", []):
-                    if comp.get("componentType") == "UIAtlas":
-                        sprite_list = comp.get("serializableData", {}).get("spriteList", {})
-                        
-                        # Check if this atlas contains game symbols
-                        matches = 0
-                        for sprite_name in sprite_list.keys():
-                            if symbol_pattern.match(sprite_name):
-                                matches += 1
-                        
-                        if matches > 5:
-                            print(f"Found potential Symbol Atlas! (Matches: {matches})")
-                            texture_guid = comp.get("serializableData", {}).get("textureContent", {}).get("guid")
-                            print(f"Atlas GUID: {texture_guid}")
-                            found_texture_guid = texture_guid
-                            break
-        if found_texture_guid:
-            break
-
-    if not found_texture_guid:
+    resolver = resolver or SymbolResolver()
+    names = resolver.match(patterns)
+    if not names:
         print("Could not identify symbol atlas automatically.")
         return
 
-    # Now find the file matching this GUID
-    print(f"Looking for file matching GUID: {found_texture_guid}")
-    
-    # The filename usually starts with the GUID or is the MD5 of it. 
-    # In this case, looking at previous listings, the filenames look like MD5 hashes.
-    # Let's try to verify if the GUID appears in any filename.
-    
-    for filename in os.listdir(ASSETS_DIR):
-        if found_texture_guid in filename:
-            print(f"\nSUCCESS: Found Symbol Sheet: {filename}")
-            print(f"Path: {os.path.join(ASSETS_DIR, filename)}")
-            return
-
-    print("No matching file found for GUID. Trying permissive search...")
-    # Fallback: Check for any large PNG that isn't the background
-    # (Not implemented yet, relying on GUID match first)
+    sheets = {}
+    for name, records in resolver.resolve(names).items():
+        if not records:
+            print(f"  {name}: not found in any atlas")
+        for atlas, guid, filename, (x, y, w, h) in records:
+            # An atlas may name no texture at all, or one that wasn't extracted
+            if filename:
+                sheet = filename
+            elif guid:
+                sheet = f"{guid} (no asset file)"
+            else:
+                sheet = "(no texture)"
+            print(f"  {name}: {sheet} x={x}, y={y}, w={w}, h={h} [atlas {atlas}]")
+            sheets.setdefault((sheet, filename), set()).add(name)
+
+    print("\nSheets:")
+    for (sheet, filename), sprite_names in sorted(sheets.items(), key=lambda item: -len(item[1])):
+        print(f"  {sheet}: {len(sprite_names)} sprites")
+        if filename and os.path.exists(os.path.join(ASSETS_DIR, filename)):
+            print(f"    Path: {os.path.join(ASSETS_DIR, filename)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve which texture sheet holds each symbol sprite")
+    parser.add_argument("sprites", nargs="*", help="sprite names or 'prefix*' (default: all symbol sprites)")
+    args = parser.parse_args()
+    find_symbol_texture(args.sprites)
 
 if __name__ == "__main__":
-    find_symbol_texture()
+    main()
@@ -2,11 +2,14 @@
 """
 Fix sprite extraction - extract correct symbols from sprite sheets
 """
-from PIL import Image
 import os
 
-ASSETS_DIR = "/home/supa/test22/AncientEgyptPM_Local/rebuild/assets"
-SPRITES_DIR = "/home/supa/test22/AncientEgyptPM_Local/rebuild/sprites"
+from sprite_batch import run_batch, table_jobs
+from texture_cache import shared_cache
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(REBUILD_DIR, "assets")
+SPRITES_DIR = os.path.join(REBUILD_DIR, "sprites")
 
 # Texture file mappings (from HAR analysis)
 # 20d7ad009ff2a804684180e437657b33.png - Card symbols (s_symbol03-11)
@@ -37,54 +40,23 @@ PHARAOH_SYMBOLS = {
     }
 }
 
-def extract_sprite(texture_path, sprite_def, output_name):
-    """Extract a single sprite from a texture"""
-    try:
-        img = Image.open(texture_path)
-        x, y, w, h = sprite_def['x'], sprite_def['y'], sprite_def['w'], sprite_def['h']
-        
-        # Crop the sprite
-        sprite = img.crop((x, y, x + w, y + h))
-        
-        # Save
-        output_path = os.path.join(SPRITES_DIR, output_name)
-        sprite.save(output_path)
-        print(f"  ✓ Extracted {output_name} ({w}x{h})")
-        return True
-    except Exception as e:
-        print(f"  ✗ Failed {output_name}: {e}")
-        return False
-
 def main():
     print("=== Fixing Sprite Extraction ===\n")
     
-    # Extract card symbols
+    # Both sheets are decoded once each, in parallel
     print("Extracting card symbols from", CARD_SYMBOLS['texture'])
-    texture_path = os.path.join(ASSETS_DIR, CARD_SYMBOLS['texture'])
-    
-    if os.path.exists(texture_path):
-        for name, coords in CARD_SYMBOLS['sprites'].items():
-            extract_sprite(texture_path, coords, f"{name}.png")
-    else:
-        print(f"  ✗ Texture not found: {texture_path}")
-    
-    # Extract pharaoh
-    print("\nExtracting pharaoh from", PHARAOH_SYMBOLS['texture'])
-    texture_path = os.path.join(ASSETS_DIR, PHARAOH_SYMBOLS['texture'])
-    
-    if os.path.exists(texture_path):
-        for name, coords in PHARAOH_SYMBOLS['sprites'].items():
-            extract_sprite(texture_path, coords, f"{name}.png")
-    else:
-        print(f"  ✗ Texture not found: {texture_path}")
+    print("Extracting pharaoh from", PHARAOH_SYMBOLS['texture'])
+    jobs = [job for table in (CARD_SYMBOLS, PHARAOH_SYMBOLS)
+            for job in table_jobs(table['sprites'], table['texture'], suffix=".png")]
+    run_batch(jobs, ASSETS_DIR, SPRITES_DIR)
     
     # Also let's check what the actual images look like by opening the texture
     print("\n=== Checking texture dimensions ===")
     for tex in [CARD_SYMBOLS['texture'], PHARAOH_SYMBOLS['texture']]:
         path = os.path.join(ASSETS_DIR, tex)
         if os.path.exists(path):
-            img = Image.open(path)
-            print(f"  {tex}: {img.size[0]}x{img.size[1]}")
+            width, height = shared_cache().size(path)
+            print(f"  {tex}: {width}x{height}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Find where a reference image (e.g. a screenshot crop of a reel symbol) sits
+in the texture sheets.
+
+Every sheet is searched at a few scales with FFT-based normalized
+cross-correlation. The sweep runs on sheets reduced by a power of two (so the
+template is still a few dozen pixels across), then the best peaks are
+re-scored at full resolution in a small window around them. The reduced
+sheets' spectra and integral images are cached in rebuild/match_cache/, so
+repeated queries skip decoding and forward transforms entirely.
+
+Transparent pixels count as black on both sides; crop the reference tight.
+
+    python match_template.py reel_symbol.png
+    python match_template.py crop.png --scales 0.5 0.75 1 --top 5 -o matches.json
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+from PIL import Image
+
+from texture_cache import shared_cache
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(REBUILD_DIR, "assets")
+CACHE_DIR = os.path.join(REBUILD_DIR, "match_cache")
+ATLAS_PATTERN = re.compile(r"^[0-9a-f]{32}\.png$")
+SCALES = (0.5, 0.75, 1.0, 1.25, 1.5)
+MIN_COARSE_SIZE = 16  # smallest template edge (pixels) worth sweeping at the reduced size
+MAX_FACTOR = 8
+
+_spectra = {}  # (path, factor) -> Spectrum, for repeated queries in one process
+
+def luminance(img):
+    """float32 luminance in [0, 1], premultiplied by alpha (transparent -> black)."""
+    rgba = np.asarray(img.convert("RGBA"), dtype=np.float32)
+    lum = rgba[..., 0] * 0.299 + rgba[..., 1] * 0.587 + rgba[..., 2] * 0.114
+    return lum * rgba[..., 3] * (1.0 / (255.0 * 255.0))
+
+def _fast_size(n):
+    """Smallest 2^a 3^b 5^c >= n: pocketfft is slow on large prime sizes (1999...)."""
+    best = 1 << max(0, (n - 1).bit_length())
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            size = p35
+            while size < n:
+                size *= 2
+            best = min(best, size)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+def _integral(values):
+    out = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(values, axis=0, dtype=np.float64), axis=1, out=out[1:, 1:])
+    return out
+
+def _window_sums(integral, h, w):
+    """Sum of every h x w window at its top-left corner (valid positions only)."""
+    return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+
+class Spectrum:
+    """Forward FFT and integral images of one (reduced) texture."""
+
+    def __init__(self, image):
+        self.shape = image.shape
+        self.fft_shape = (_fast_size(image.shape[0]), _fast_size(image.shape[1]))
+        # No padding beyond the fast size is needed: circular correlation only
+        # wraps for windows that run off the sheet, and those are never read
+        self.fft = np.fft.rfft2(image, self.fft_shape)
+        self.sums = _integral(image)
+        self.squares = _integral(image.astype(np.float64) ** 2)
+
+    @classmethod
+    def load(cls, path):
+        spectrum = cls.__new__(cls)
+        with np.load(path) as data:
+            spectrum.shape = tuple(data["shape"])
+            spectrum.fft_shape = tuple(data["fft_shape"])
+            spectrum.fft = data["fft"].astype(np.complex128)
+            spectrum.sums = data["sums"]
+            spectrum.squares = data["squares"]
+        return spectrum
+
+    def save(self, path, source_stat):
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, shape=self.shape, fft_shape=self.fft_shape, fft=self.fft.astype(np.complex64),
+                 sums=self.sums, squares=self.squares,
+                 source=np.array([source_stat.st_size, source_stat.st_mtime_ns], dtype=np.int64))
+        os.replace(tmp, path)
+
+    def ncc(self, template):
+        """Zero-mean normalized cross-correlation of template at every valid position."""
+        th, tw = template.shape
+        height, width = self.shape
+        if th > height or tw > width:
+            return None
+        centred = template - template.mean()
+        norm = np.sqrt(np.sum(centred.astype(np.float64) ** 2))
+        if norm < 1e-6:
+            return None
+        # The template has zero mean, so the sheet's local mean drops out of the numerator
+        corr = np.fft.irfft2(self.fft * np.conj(np.fft.rfft2(centred, self.fft_shape)), self.fft_shape)
+        numerator = corr[:height - th + 1, :width - tw + 1]
+        n = th * tw
+        sums = _window_sums(self.sums, th, tw)
+        variance = _window_sums(self.squares, th, tw) - sums * sums / n
+        flat = variance <= n * 1e-6  # flat / fully transparent windows match nothing
+        scores = numerator / (np.sqrt(np.where(flat, 1.0, variance)) * norm)
+        scores[flat] = 0.0
+        return scores
+
+def spectrum_for(path, factor, cache_dir=CACHE_DIR):
+    """Spectrum of the texture reduced by factor, from memory, the .npz cache, or the PNG."""
+    key = (path, factor)
+    if key in _spectra:
+        return _spectra[key]
+    st = os.stat(path)
+    cache_path = os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(path))[0]}_x{factor}.npz")
+    spectrum = None
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as data:
+            fresh = data["source"].tolist() == [st.st_size, st.st_mtime_ns]
+        if fresh:
+            spectrum = Spectrum.load(cache_path)
+    if spectrum is None:
+        img = shared_cache().get(path)
+        if factor > 1:
+            img = img.convert("RGBA").reduce(factor)
+        spectrum = Spectrum(luminance(img))
+        os.makedirs(cache_dir, exist_ok=True)
+        spectrum.save(cache_path, st)
+    _spectra[key] = spectrum
+    return spectrum
+
+def peaks(scores, count, min_score, h, w):
+    """Up to count (score, x, y) maxima, suppressing half a template around each one."""
+    scores = scores.copy()
+    found = []
+    for _ in range(count):
+        index = int(np.argmax(scores))
+        y, x = divmod(index, scores.shape[1])
+        score = float(scores[y, x])
+        if score < min_score:
+            break
+        found.append((score, x, y))
+        scores[max(0, y - h // 2):y + h // 2 + 1, max(0, x - w // 2):x + w // 2 + 1] = -np.inf
+    return found
+
+def _iou(a, b):
+    ix = max(0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+def suppress(matches, max_iou=0.3):
+    """Greedy non-maximum suppression across scales (matches sorted best first)."""
+    kept = []
+    for match in matches:
+        rect = match[1:5]
+        if all(other[0] != match[0] or _iou(rect, other[1:5]) <= max_iou for other in kept):
+            kept.append(match)
+    return kept
+
+def _resize(reference, scale, factor=1):
+    w = max(1, round(reference.width * scale / factor))
+    h = max(1, round(reference.height * scale / factor))
+    return luminance(reference.resize((w, h), Image.LANCZOS if factor == 1 else Image.BOX))
+
+def refine(path, reference, scale, x, y, factor, radius=None):
+    """(score, x, y) of the best full-resolution position within radius of (x, y)."""
+    template = _resize(reference, scale)
+    th, tw = template.shape
+    radius = 2 * factor if radius is None else radius
+    cache = shared_cache()
+    width, height = cache.size(path)
+    left, top = max(0, x - radius), max(0, y - radius)
+    right, bottom = min(width, x + tw + radius), min(height, y + th + radius)
+    region = Spectrum(luminance(cache.crop(path, (left, top, right, bottom))))
+    scores = region.ncc(template)
+    if scores is None:
+        return None
+    best = peaks(scores, 1, -1.0, th, tw)[0]
+    return best[0], left + best[1], top + best[2]
+
+def match_template(reference_path, textures=None, scales=SCALES, top=10, min_score=0.6,
+                   assets_dir=ASSETS_DIR, cache_dir=CACHE_DIR):
+    """Ranked [(texture, x, y, w, h, score)] matches of the reference across the sheets."""
+    reference = Image.open(reference_path).convert("RGBA")
+    if not textures:
+        textures = sorted(f for f in os.listdir(assets_dir) if ATLAS_PATTERN.match(f))
+    smallest = min(reference.width, reference.height) * min(scales)
+    factor = 1
+    while factor < MAX_FACTOR and smallest / (factor * 2) >= MIN_COARSE_SIZE:
+        factor *= 2
+
+    templates = [(scale, _resize(reference, scale, factor)) for scale in scales]
+    # The reduced sweep blurs peaks a little: keep slightly weaker candidates for refinement
+    coarse_min = min_score - 0.15 if factor > 1 else min_score
+    candidates = []
+    for texture in textures:
+        path = os.path.join(assets_dir, texture)
+        if not os.path.exists(path):
+            print(f"  ✗ Texture not found: {texture}")
+            continue
+        spectrum = spectrum_for(path, factor, cache_dir)
+        for scale, template in templates:
+            scores = spectrum.ncc(template)
+            if scores is None:
+                continue
+            th, tw = template.shape
+            for score, x, y in peaks(scores, top, coarse_min, th, tw):
+                candidates.append((score, texture, scale, x * factor, y * factor))
+
+    candidates.sort(key=lambda c: -c[0])
+    matches = []
+    for coarse_score, texture, scale, x, y in candidates[:top * 3]:
+        w, h = max(1, round(reference.width * scale)), max(1, round(reference.height * scale))
+        if factor > 1:
+            refined = refine(os.path.join(assets_dir, texture), reference, scale, x, y, factor)
+            if refined is None:
+                continue
+            coarse_score, x, y = refined
+        if coarse_score >= min_score:
+            matches.append((texture, x, y, w, h, round(coarse_score, 4)))
+    matches.sort(key=lambda m: -m[5])
+    return suppress(matches)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description="Locate a reference image in the texture sheets (FFT NCC)")
+    parser.add_argument("reference", help="reference image, e.g. a screenshot crop of one symbol")
+    parser.add_argument("textures", nargs="*", help="texture files in rebuild/assets (default: every GUID atlas)")
+    parser.add_argument("--scales", type=float, nargs="+", default=list(SCALES),
+                        help=f"reference scales to try (default: {' '.join(map(str, SCALES))})")
+    parser.add_argument("--top", type=int, default=10, help="matches to report (default: 10)")
+    parser.add_argument("--min-score", type=float, default=0.6, help="lowest NCC score to report (default: 0.6)")
+    parser.add_argument("-o", "--output", help="also write the matches to this JSON file")
+    args = parser.parse_args()
+
+    print(f"=== Matching {os.path.basename(args.reference)} ===\n")
+    start = time.perf_counter()
+    matches = match_template(args.reference, args.textures, args.scales, args.top, args.min_score)
+    elapsed = time.perf_counter() - start
+
+    if not matches:
+        print(f"  ✗ No match scored {args.min_score} or more")
+    for texture, x, y, w, h, score in matches:
+        print(f"  ✓ {score:.3f}  {texture}  x={x} y={y} w={w} h={h}")
+    print(f"\n  Searched in {elapsed:.2f}s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump([{"texture": t, "x": x, "y": y, "w": w, "h": h, "score": s}
+                       for t, x, y, w, h, s in matches], f, indent=2)
+        print(f"✓ Matches saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
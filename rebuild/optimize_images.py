@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Optimize rebuild/sprites and rebuild/assets images for the web.
+
+Each image is encoded in parallel as lossless WebP, high-quality lossy WebP
+and palette-quantized PNG. The smallest candidate whose PSNR against the
+source is above --min-psnr wins, and is written to rebuild/optimized/. The
+original file is a candidate too, so nothing ever grows.
+
+Results are cached by source digest, so unchanged images are skipped on
+the next run. A before/after byte report goes to rebuild/optimized/report.json,
+including the image weight referenced by index.html / pixi-game.html.
+"""
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageChops, ImageStat
+
+REBUILD_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(REBUILD_DIR)
+sys.path.insert(0, ROOT_DIR)
+from instrument import count, span
+SOURCE_DIRS = ["sprites", "assets"]
+OUTPUT_DIR = os.path.join(REBUILD_DIR, "optimized")
+CACHE_FILE = os.path.join(OUTPUT_DIR, ".cache.json")
+REPORT_FILE = os.path.join(OUTPUT_DIR, "report.json")
+PAGES = ["index.html", "pixi-game.html", "slot-engine.js"]
+EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+def psnr(a, b):
+    """PSNR in dB between two same-size RGBA images (inf if identical)."""
+    diff = ImageChops.difference(a, b)
+    if diff.getbbox() is None:
+        return math.inf
+    mse = sum(ImageStat.Stat(diff).sum2) / (a.width * a.height * 4)
+    return 10 * math.log10(255 ** 2 / mse)
+
+def encode_candidates(img, webp_quality):
+    """Yield (name, extension, encoded bytes) for every variant."""
+    out = io.BytesIO()
+    with span("image.encode", variant="webp-lossless"):
+        img.save(out, format="WEBP", lossless=True, quality=100, method=6)
+    yield "webp-lossless", ".webp", out.getvalue()
+
+    out = io.BytesIO()
+    with span("image.encode", variant="webp-lossy"):
+        img.save(out, format="WEBP", quality=webp_quality, alpha_quality=100, method=6)
+    yield "webp-lossy", ".webp", out.getvalue()
+
+    out = io.BytesIO()
+    method = Image.Quantize.FASTOCTREE if "A" in img.getbands() else Image.Quantize.MEDIANCUT
+    with span("image.encode", variant="png-quantized"):
+        img.quantize(colors=256, method=method).save(out, format="PNG", optimize=True)
+    yield "png-quantized", ".png", out.getvalue()
+
+def optimize_file(source_path, rel_path, min_psnr, webp_quality):
+    """Pick the smallest acceptable encoding of one image and write it."""
+    with open(source_path, 'rb') as f:
+        original = f.read()
+    with span("image.decode", image=rel_path), Image.open(io.BytesIO(original)) as src:
+        img = src.convert("RGBA")
+
+    sizes = {"original": len(original)}
+    best = ("original", os.path.splitext(rel_path)[1], original)
+    for name, ext, data in encode_candidates(img, webp_quality):
+        with span("image.psnr", image=rel_path, variant=name), Image.open(io.BytesIO(data)) as decoded:
+            quality = psnr(img, decoded.convert("RGBA"))
+        sizes[name] = len(data)
+        if quality >= min_psnr and len(data) < len(best[2]):
+            best = (name, ext, data)
+
+    name, ext, data = best
+    count("image.bytes_in", len(original))
+    count("image.bytes_out", len(data))
+    output_rel = os.path.splitext(rel_path)[0] + ext
+    output_path = os.path.join(OUTPUT_DIR, output_rel)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(data)
+    return {"winner": name, "output": output_rel, "sizes": sizes}
+
+def _optimize_job(args):
+    rel_path = args[1]
+    try:
+        return rel_path, optimize_file(*args), None
+    except Exception as e:
+        return rel_path, None, str(e)
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def page_images():
+    """Image paths (relative to rebuild/) referenced by the game pages."""
+    refs = set()
+    for page in PAGES:
+        path = os.path.join(ROOT_DIR, page)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            text = f.read()
+        refs.update(re.findall(r"rebuild/((?:sprites|assets)/[\w .-]+?\.(?:png|jpe?g))", text))
+        # slot-engine.js names its symbol sprites relative to rebuild/sprites/
+        refs.update(f"sprites/{name}" for name in re.findall(r"file:\s*'([^']+)'", text))
+    return refs
+
+def optimize_images(min_psnr=40.0, webp_quality=92, workers=None):
+    cache = {}
+    if os.path.exists(CACHE_FILE):
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    params = f"psnr={min_psnr},q={webp_quality}"
+
+    results = {}
+    jobs = []
+    for source_dir in SOURCE_DIRS:
+        for filename in sorted(os.listdir(os.path.join(REBUILD_DIR, source_dir))):
+            if not filename.lower().endswith(EXTENSIONS):
+                continue
+            rel_path = f"{source_dir}/{filename}"
+            source_path = os.path.join(REBUILD_DIR, rel_path)
+            digest = file_digest(source_path)
+            cached = cache.get(rel_path)
+            if (cached and cached["digest"] == digest and cached["params"] == params
+                    and os.path.exists(os.path.join(OUTPUT_DIR, cached["output"]))):
+                results[rel_path] = cached
+                continue
+            jobs.append(((source_path, rel_path, min_psnr, webp_quality), digest))
+
+    print(f"Optimizing {len(jobs)} images ({len(results)} cached)...")
+    digests = {args[1]: digest for args, digest in jobs}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rel_path, result, error in pool.map(_optimize_job, [args for args, _ in jobs], chunksize=4):
+            if error:
+                print(f"  ✗ {rel_path}: {error}")
+                continue
+            result.update(digest=digests[rel_path], params=params)
+            results[rel_path] = result
+            # A different format won this time: drop the previous variant
+            old_output = cache.get(rel_path, {}).get("output")
+            if old_output and old_output != result["output"]:
+                old_path = os.path.join(OUTPUT_DIR, old_output)
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+            before, after = result["sizes"]["original"], result["sizes"][result["winner"]]
+            print(f"  ✓ {rel_path}: {before} -> {after} bytes ({result['winner']})")
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+    write_report(results)
+
+def write_report(results):
+    def totals(paths):
+        before = sum(results[p]["sizes"]["original"] for p in paths)
+        after = sum(results[p]["sizes"][results[p]["winner"]] for p in paths)
+        return {"files": len(paths), "before": before, "after": after}
+
+    report = {"total": totals(list(results))}
+    for source_dir in SOURCE_DIRS:
+        report[source_dir] = totals([p for p in results if p.startswith(source_dir + "/")])
+    report["pages"] = totals(sorted(p for p in page_images() if p in results))
+    report["files"] = {p: {"winner": r["winner"], "output": r["output"], "sizes": r["sizes"]}
+                       for p, r in sorted(results.items())}
+    with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+
+    print("\n  Set            files      before       after   saved")
+    for key in ["sprites", "assets", "pages", "total"]:
+        t = report[key]
+        saved = 1 - t["after"] / t["before"] if t["before"] else 0
+        print(f"  {key:<12} {t['files']:>7} {t['before']:>11} {t['after']:>11} {saved:>7.1%}")
+    print(f"\n✓ Report saved to: {REPORT_FILE}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Produce smaller WebP / quantized PNG variants of rebuild images")
+    parser.add_argument("--min-psnr", type=float, default=40.0,
+                        help="reject lossy candidates below this PSNR in dB (default: 40)")
+    parser.add_argument("--webp-quality", type=int, default=92, help="lossy WebP quality (default: 92)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+    optimize_images(args.min_psnr, args.webp_quality, args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Pack loose sprites into power-of-two texture atlases for slot-engine.js.
+
+Transparent borders are trimmed, sprites are bin-packed (MaxRects, best short
+side fit) into as few POT pages as fit under --max-size, and each page gets a
+PIXI spritesheet JSON with frame / trim / sourceSize data. Frames are keyed by
+their original file name, so SYMBOLS[].file maps straight onto them.
+
+By default packs every SYMBOLS[].file from slot-engine.js plus the fire frames.
+Duplicate frames listed in rebuild/frames.json (dedup_frames.py) are not packed
+again: their names become extra frames pointing at the kept frame's rect.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+
+from PIL import Image
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from instrument import span
+SPRITES_DIR = os.path.join(ROOT_DIR, "rebuild", "sprites")
+ATLAS_DIR = os.path.join(ROOT_DIR, "rebuild", "atlas")
+ENGINE_JS = os.path.join(ROOT_DIR, "slot-engine.js")
+FRAMES_FILE = os.path.join(ROOT_DIR, "rebuild", "frames.json")
+
+def engine_sprite_files():
+    """SYMBOLS[].file entries from slot-engine.js, plus the fire animation."""
+    with open(ENGINE_JS, 'r', encoding='utf-8') as f:
+        files = re.findall(r"file:\s*'([^']+)'", f.read())
+    files += sorted(os.path.basename(p) for p in glob.glob(os.path.join(SPRITES_DIR, "fire_*.png")))
+    return list(dict.fromkeys(files))
+
+def frame_aliases(path=FRAMES_FILE):
+    """{duplicate file: kept file} from dedup_frames.py, or {} if it hasn't run."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get("duplicates", {})
+
+def trim(img):
+    """Crop transparent borders. Returns (trimmed image, (x, y) offset)."""
+    img = img.convert("RGBA")
+    bbox = img.getchannel("A").getbbox()
+    if bbox is None:
+        bbox = (0, 0, 1, 1)
+    return img.crop(bbox), bbox[:2]
+
+class MaxRects:
+    """MaxRects bin packer, best short side fit, no rotation."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.free = [(0, 0, width, height)]
+
+    def insert(self, w, h):
+        best = None
+        for fx, fy, fw, fh in self.free:
+            if w <= fw and h <= fh:
+                score = (min(fw - w, fh - h), max(fw - w, fh - h))
+                if best is None or score < best[0]:
+                    best = (score, fx, fy)
+        if best is None:
+            return None
+        _, x, y = best
+        self._split(x, y, w, h)
+        return x, y
+
+    def _split(self, x, y, w, h):
+        new_free = []
+        for fx, fy, fw, fh in self.free:
+            if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+                new_free.append((fx, fy, fw, fh))
+                continue
+            if x > fx:
+                new_free.append((fx, fy, x - fx, fh))
+            if x + w < fx + fw:
+                new_free.append((x + w, fy, fx + fw - x - w, fh))
+            if y > fy:
+                new_free.append((fx, fy, fw, y - fy))
+            if y + h < fy + fh:
+                new_free.append((fx, y + h, fw, fy + fh - y - h))
+        # Drop free rects fully contained in another
+        self.free = [r for i, r in enumerate(new_free)
+                     if not any(i != j and _contains(o, r) for j, o in enumerate(new_free))]
+
+def _contains(outer, inner):
+    ox, oy, ow, oh = outer
+    ix, iy, iw, ih = inner
+    return ox <= ix and oy <= iy and ix + iw <= ox + ow and iy + ih <= oy + oh and outer != inner
+
+def _pot_sizes(max_size):
+    size = 64
+    while size <= max_size:
+        yield size, size
+        if size * 2 <= max_size:
+            yield size * 2, size
+        size *= 2
+
+def pack_page(items, max_size, padding):
+    """Pack as many items as fit in the smallest POT page.
+
+    Returns ((width, height), placements, leftover items).
+    """
+    for width, height in _pot_sizes(max_size):
+        packer = MaxRects(width, height)
+        placements = []
+        for item in items:
+            pos = packer.insert(item["img"].width + padding, item["img"].height + padding)
+            if pos is None:
+                break
+            placements.append((item, pos))
+        else:
+            return (width, height), placements, []
+
+    # Nothing fits everything: fill a max-size page and carry the rest over
+    packer = MaxRects(max_size, max_size)
+    placements, leftover = [], []
+    for item in items:
+        pos = packer.insert(item["img"].width + padding, item["img"].height + padding)
+        if pos is None:
+            leftover.append(item)
+        else:
+            placements.append((item, pos))
+    return (max_size, max_size), placements, leftover
+
+def pack_atlas(files, name="symbols", max_size=2048, padding=2, sprites_dir=SPRITES_DIR, out_dir=ATLAS_DIR,
+               aliases=None, scale=1):
+    # Duplicates of a frame that is packed anyway only need a name, not pixels
+    aliases = {dup: kept for dup, kept in (aliases or {}).items() if dup in files and kept in files}
+    items = []
+    for filename in files:
+        if filename in aliases:
+            continue
+        path = os.path.join(sprites_dir, filename)
+        if not os.path.exists(path):
+            print(f"  ✗ Sprite not found: {filename}")
+            continue
+        with span("atlas.trim", sprite=filename), Image.open(path) as src:
+            img, offset = trim(src)
+            source_size = src.size
+        if img.width + padding > max_size or img.height + padding > max_size:
+            print(f"  ✗ {filename} ({img.width}x{img.height}) exceeds --max-size {max_size}")
+            continue
+        items.append({"name": filename, "img": img, "offset": offset, "source_size": source_size})
+
+    # Tallest first packs noticeably tighter for near-square sprites
+    items.sort(key=lambda item: (item["img"].height, item["img"].width), reverse=True)
+    os.makedirs(out_dir, exist_ok=True)
+
+    pages = []
+    while items:
+        with span("atlas.pack_page", items=len(items)):
+            size, placements, items = pack_page(items, max_size, padding)
+        if not placements:
+            break
+        pages.append((size, placements))
+
+    sheet_names = [f"{name}-{i}.json" for i in range(len(pages))]
+    for i, ((width, height), placements) in enumerate(pages):
+        atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        frames = {}
+        for item, (x, y) in placements:
+            img = item["img"]
+            atlas.paste(img, (x, y))
+            src_w, src_h = item["source_size"]
+            ox, oy = item["offset"]
+            frames[item["name"]] = {
+                "frame": {"x": x, "y": y, "w": img.width, "h": img.height},
+                "rotated": False,
+                "trimmed": (img.width, img.height) != (src_w, src_h),
+                "spriteSourceSize": {"x": ox, "y": oy, "w": img.width, "h": img.height},
+                "sourceSize": {"w": src_w, "h": src_h},
+            }
+        for dup, kept in aliases.items():
+            if kept in frames:
+                frames[dup] = frames[kept]
+        image_name = f"{name}-{i}.png"
+        with span("atlas.encode", page=image_name):
+            atlas.save(os.path.join(out_dir, image_name), optimize=True)
+        meta = {
+            "app": "rebuild/pack_atlas.py",
+            "image": image_name,
+            "format": "RGBA8888",
+            "size": {"w": width, "h": height},
+            "scale": f"{scale:g}",
+        }
+        others = [sheet for j, sheet in enumerate(sheet_names) if j != i]
+        if i == 0 and others:
+            meta["related_multi_packs"] = others
+        with open(os.path.join(out_dir, sheet_names[i]), 'w', encoding='utf-8') as f:
+            json.dump({"frames": frames, "meta": meta}, f, indent=1)
+        used = sum(item["img"].width * item["img"].height for item, _ in placements)
+        print(f"  ✓ {image_name} {width}x{height}: {len(placements)} sprites, {used / (width * height):.0%} filled")
+    return sheet_names
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack sprites into PIXI spritesheet atlases")
+    parser.add_argument("files", nargs="*", help="sprite files in rebuild/sprites (default: slot-engine.js symbols + fire)")
+    parser.add_argument("--name", default="symbols", help="atlas base name (default: symbols)")
+    parser.add_argument("--max-size", type=int, default=2048, help="largest page edge, power of two (default: 2048)")
+    parser.add_argument("--padding", type=int, default=2, help="pixels between sprites (default: 2)")
+    args = parser.parse_args()
+
+    files = args.files or engine_sprite_files()
+    print(f"=== Packing {len(files)} sprites into {args.name} atlas ===\n")
+    pack_atlas(files, args.name, args.max_size, args.padding, aliases=frame_aliases())
+    print(f"\n✓ Done! Atlas saved to: {ATLAS_DIR}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Batch sprite cropping engine shared by the extraction scripts.
+
+Crop jobs are grouped by texture so every sheet is decoded once, all of its
+regions are cropped from that one buffer, and separate sheets are processed
+in parallel across cores. Sheets come from the shared TextureCache, so a
+texture that is needed again (or only near its top) is not re-decoded.
+"""
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from texture_cache import shared_cache
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrument
+from instrument import count, span
+
+# One sprite to cut: texture file (relative to the assets dir), rect, output file name
+CropJob = namedtuple("CropJob", "texture x y w h output")
+
+def table_jobs(table, texture=None, suffix=""):
+    """Crop jobs for one of the scripts' sprite tables.
+
+    table is either rows of (output, texture, x, y, w, h), or a
+    {output: {'x', 'y', 'w', 'h'}} dict of sprites all on texture. suffix is
+    appended to every output name.
+    """
+    if isinstance(table, dict):
+        table = [(name, texture, c['x'], c['y'], c['w'], c['h']) for name, c in table.items()]
+    return [CropJob(tex, x, y, w, h, name + suffix) for name, tex, x, y, w, h in table]
+
+# run_batch's worker count when a caller doesn't pass one (None: a process per core).
+# cli.py's shell sets 1 so sheets stay decoded in its own TextureCache between commands.
+DEFAULT_WORKERS = None
+
+def crop_texture(texture_path, jobs, sprites_dir, clamp=False):
+    """Decode one texture and save every job's region from it.
+
+    Returns (texture, decode_s, crop_s, save_s, results, cache_counts) where
+    results holds (output, (width, height)) on success or (output, error
+    message), and cache_counts is this call's (hits, misses, evictions).
+    """
+    results = []
+    cache = shared_cache()
+    before = (cache.hits, cache.misses, cache.evictions)
+    width, height = cache.size(texture_path)
+    # Only rows down to the lowest sprite need decoding
+    bottom = max(min(job.y + job.h, height) for job in jobs)
+    t0 = time.perf_counter()
+    with span("texture.get", texture=os.path.basename(texture_path), sprites=len(jobs)):
+        img = cache.get(texture_path, bottom=bottom)
+    decode_s = time.perf_counter() - t0
+
+    crop_s = save_s = 0.0
+    for job in jobs:
+        try:
+            t1 = time.perf_counter()
+            x2, y2 = job.x + job.w, job.y + job.h
+            if clamp:
+                # Ensure we don't go out of bounds
+                x2, y2 = min(x2, width), min(y2, height)
+            with span("sprite.crop", sprite=job.output):
+                sprite = img.crop((job.x, job.y, x2, y2))
+            t2 = time.perf_counter()
+            output_path = os.path.join(sprites_dir, job.output)
+            with span("sprite.encode", sprite=job.output):
+                sprite.save(output_path)
+            t3 = time.perf_counter()
+            if instrument.ENABLED:
+                count("sprite.bytes_out", os.path.getsize(output_path))
+            crop_s += t2 - t1
+            save_s += t3 - t2
+            results.append((job.output, sprite.size))
+        except Exception as e:
+            results.append((job.output, str(e)))
+    counts = tuple(now - was for now, was in zip((cache.hits, cache.misses, cache.evictions), before))
+    return os.path.basename(texture_path), decode_s, crop_s, save_s, results, counts
+
+def _crop_group(args):
+    return crop_texture(*args)
+
+def run_batch(jobs, assets_dir, sprites_dir, workers=None, clamp=False, report=True):
+    """Crop all jobs, one decode per texture, textures in parallel.
+
+    Returns {output: (width, height)} for the sprites that were written.
+    """
+    if workers is None:
+        workers = DEFAULT_WORKERS
+    os.makedirs(sprites_dir, exist_ok=True)
+    groups = {}
+    for job in jobs:
+        groups.setdefault(job.texture, []).append(job)
+
+    tasks = []
+    for texture, texture_jobs in groups.items():
+        texture_path = os.path.join(assets_dir, texture)
+        if not os.path.exists(texture_path):
+            print(f"  ✗ Texture not found: {texture}")
+            continue
+        tasks.append((texture_path, texture_jobs, sprites_dir, clamp))
+
+    if workers == 1 or len(tasks) <= 1:
+        outcomes = [_crop_group(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_crop_group, tasks))
+
+    saved = {}
+    timings = []
+    cache_counts = [0, 0, 0]
+    for texture, decode_s, crop_s, save_s, results, counts in outcomes:
+        timings.append((texture, len(results), decode_s, crop_s, save_s))
+        cache_counts = [total + n for total, n in zip(cache_counts, counts)]
+        for output, outcome in results:
+            if isinstance(outcome, tuple):
+                saved[output] = outcome
+                print(f"  ✓ {output} ({outcome[0]}x{outcome[1]})")
+            else:
+                print(f"  ✗ {output}: {outcome}")
+
+    if report and timings:
+        print_timings(timings)
+        hits, misses, evictions = cache_counts
+        print(f"  Texture cache: {hits} hits, {misses} misses, {evictions} evictions")
+    return saved
+
+def print_timings(timings):
+    print("\n  Texture                                  sprites  decode    crop    save")
+    for texture, count, decode_s, crop_s, save_s in timings:
+        print(f"  {texture:<40} {count:>7} {decode_s * 1000:>6.1f}ms {crop_s * 1000:>5.1f}ms {save_s * 1000:>6.1f}ms")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Shared, memory-bounded cache of decoded texture sheets.
+
+Textures are opened lazily (header only) and decoded on first pixel access.
+Non-interlaced PNGs are decoded only as far down as the lowest requested row,
+so a few sprites near the top of a 2k sheet never pay for the rest of it.
+Decoded buffers are kept in LRU order under a memory budget in MB.
+
+    cache = TextureCache(budget_mb=128)
+    sprite = cache.crop("assets/sheet.png", (x, y, x + w, y + h))
+    print(cache.stats())
+"""
+import os
+import sys
+from collections import OrderedDict
+
+from PIL import Image, ImageFile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrument import count, span
+
+DEFAULT_BUDGET_MB = int(os.environ.get("REBUILD_TEXTURE_CACHE_MB", "256"))
+
+def _decoded_bytes(img):
+    return img.width * img.height * len(img.getbands())
+
+def _full_decode(path):
+    img = Image.open(path)
+    with span("texture.decode", texture=os.path.basename(path), rows=img.height):
+        img.load()
+    count("texture.decoded_pixels", img.width * img.height)
+    return img, img.height
+
+def _shorten(img, bottom):
+    """Make a just-opened PNG decode only rows [0, bottom). False if this Pillow doesn't allow it.
+
+    There is no public API for this: it rewrites the single tile's extents and
+    the image size, which Pillow has kept as img.tile / img._size for years but
+    does not promise. Anything unexpected means a full decode instead.
+    """
+    if not hasattr(img, "_size"):
+        return False
+    decoder, _, offset, args = img.tile[0]
+    extents = (0, 0, img.width, bottom)
+    # Pillow 11 made tiles a namedtuple (ImageFile._Tile); older ones use plain tuples
+    tile_type = getattr(ImageFile, "_Tile", None)
+    img.tile = [tile_type(decoder, extents, offset, args) if tile_type else (decoder, extents, offset, args)]
+    img._size = (img.width, bottom)
+    return True
+
+def _open_rows(path, bottom):
+    """Open path and decode only rows [0, bottom) when the format allows."""
+    img = Image.open(path)
+    width, height = img.size
+    if bottom >= height or img.format != "PNG" or img.info.get("interlace") or len(img.tile) != 1:
+        img.close()
+        return _full_decode(path)
+    try:
+        # PNG scanlines are stored top to bottom: shorten the tile and stop there
+        if not _shorten(img, bottom):
+            raise ValueError("partial decode not supported")
+        with span("texture.decode", texture=os.path.basename(path), rows=bottom):
+            img.load()
+        if img.size != (width, bottom):
+            raise ValueError("partial decode ignored")
+    except Exception:
+        img.close()
+        return _full_decode(path)
+    count("texture.decoded_pixels", width * bottom)
+    return img, bottom
+
+class TextureCache:
+    """LRU of decoded textures with hit/miss/eviction counters."""
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget = budget_mb * 1024 * 1024
+        self.entries = OrderedDict()  # path -> (image, rows decoded, full height)
+        self.sizes = {}
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def size(self, path):
+        """(width, height) from the file header, without decoding pixels."""
+        if path not in self.sizes:
+            with Image.open(path) as img:
+                self.sizes[path] = img.size
+        return self.sizes[path]
+
+    def get(self, path, bottom=None):
+        """Decoded image covering at least rows [0, bottom) (all rows if None)."""
+        width, height = self.size(path)
+        bottom = height if bottom is None else min(bottom, height)
+        cached = self.entries.get(path)
+        if cached and cached[1] >= bottom:
+            self.entries.move_to_end(path)
+            self.hits += 1
+            return cached[0]
+
+        self.misses += 1
+        if cached:
+            self._drop(path)
+        img, rows = _open_rows(path, bottom)
+        cost = _decoded_bytes(img)
+        if cost <= self.budget:
+            while self.entries and self.used + cost > self.budget:
+                self._drop(next(iter(self.entries)))
+                self.evictions += 1
+            self.entries[path] = (img, rows, height)
+            self.used += cost
+        return img
+
+    def crop(self, path, box):
+        return self.get(path, bottom=box[3]).crop(box)
+
+    def _drop(self, path):
+        img, _, _ = self.entries.pop(path)
+        self.used -= _decoded_bytes(img)
+
+    def clear(self):
+        self.entries.clear()
+        self.used = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "textures": len(self.entries),
+            "used_mb": round(self.used / (1024 * 1024), 1),
+            "budget_mb": round(self.budget / (1024 * 1024), 1),
+        }
+
+_shared = None
+
+def shared_cache():
+    """Process-wide cache used by the rebuild scripts."""
+    global _shared
+    if _shared is None:
+        _shared = TextureCache()
+    return _shared
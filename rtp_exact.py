@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Exact RTP and win distribution for the slot-engine.js paytable.
+
+Every reel cell is an independent weighted draw (getRandomSymbol()), so each
+payline's payout distribution follows from a small dynamic program over the
+five reels: the state is the line scan from paytable.line_state(), and each
+reel multiplies in the symbol probabilities. RTP is the sum of the line
+means. The spin variance adds the covariance of every pair of lines, from the
+same DP run over both lines at once (reels where they share a row draw one
+cell for both).
+
+No sampling, so it runs in milliseconds and is handy for re-tuning weights:
+
+    python rtp_exact.py --wild pharaoh --weights pharaoh=4,symbol_9=22
+"""
+import argparse
+import json
+import math
+import time
+from itertools import combinations
+
+from paytable import (line_state, load_paytable, parse_weights, pay_for, probabilities,
+                      state_payout, with_weights)
+
+START = (None, 0, 0, True)
+
+def _closed(table, state):
+    """Collapse a finished scan to its payout so equivalent states merge."""
+    if state[3]:
+        return state
+    return ("paid", state_payout(table, state))
+
+def _step(table, state, symbol):
+    if state[0] == "paid":
+        return state
+    return _closed(table, line_state(table, state, symbol))
+
+def _payout(table, state):
+    return state[1] if state[0] == "paid" else state_payout(table, state)
+
+class _Transitions:
+    """Per-reel state transitions, merged and cached.
+
+    Symbols that lead to the same next state (every symbol that breaks the
+    run, say) are merged, which keeps the DPs small.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.probs = probabilities(table)
+        self.single = {}
+        self.joint = {}
+
+    def step(self, state):
+        """[(next state, probability)] for one line over one reel."""
+        if state not in self.single:
+            moves = {}
+            for symbol, q in enumerate(self.probs):
+                key = _step(self.table, state, symbol)
+                moves[key] = moves.get(key, 0.0) + q
+            self.single[state] = list(moves.items())
+        return self.single[state]
+
+    def step_shared(self, state_a, state_b):
+        """Same, for two lines reading the same cell."""
+        pair = (state_a, state_b)
+        if pair not in self.joint:
+            moves = {}
+            for symbol, q in enumerate(self.probs):
+                key = (_step(self.table, state_a, symbol), _step(self.table, state_b, symbol))
+                moves[key] = moves.get(key, 0.0) + q
+            self.joint[pair] = list(moves.items())
+        return self.joint[pair]
+
+def line_distribution(table):
+    """{multiplier: probability} for one payline.
+
+    Cells are independent, so every payline has this same distribution.
+    """
+    transitions = _Transitions(table)
+    states = {START: 1.0}
+    for _ in range(table.reels):
+        next_states = {}
+        for state, p in states.items():
+            for key, q in transitions.step(state):
+                next_states[key] = next_states.get(key, 0.0) + p * q
+        states = next_states
+
+    dist = {}
+    for state, p in states.items():
+        pay = _payout(table, state)
+        dist[pay] = dist.get(pay, 0.0) + p
+    return dict(sorted(dist.items()))
+
+def symbol_breakdown(table):
+    """{symbol id: {count: probability}} of the winning combination each line pays on."""
+    probs = probabilities(table)
+    states = {START: 1.0}
+    for _ in range(table.reels):
+        next_states = {}
+        for state, p in states.items():
+            for symbol, q in enumerate(probs):
+                key = line_state(table, state, symbol)
+                next_states[key] = next_states.get(key, 0.0) + p * q
+        states = next_states
+
+    breakdown = {name: {} for name in table.ids}
+    for (target, count, wild_run, _), p in states.items():
+        target_pay = pay_for(table, target, count) if target is not None else 0.0
+        wild_pay = pay_for(table, table.wild, wild_run) if table.wild is not None else 0.0
+        # Credit whichever combination pays; ties go to the substituted symbol
+        symbol, n = (table.wild, wild_run) if wild_pay > target_pay else (target, count)
+        if max(target_pay, wild_pay) <= 0:
+            continue
+        slot = breakdown[table.ids[symbol]]
+        slot[n] = slot.get(n, 0.0) + p
+    return breakdown
+
+def pair_moment(table, line_a, line_b, transitions=None):
+    """E[pay_a * pay_b] for two paylines that may share cells."""
+    transitions = transitions or _Transitions(table)
+    states = {(START, START): 1.0}
+    for reel in range(table.reels):
+        next_states = {}
+        for (state_a, state_b), p in states.items():
+            if line_a[reel] == line_b[reel]:
+                # One cell feeds both lines
+                for key, q in transitions.step_shared(state_a, state_b):
+                    next_states[key] = next_states.get(key, 0.0) + p * q
+                continue
+            moves_b = transitions.step(state_b)
+            for next_a, q_a in transitions.step(state_a):
+                for next_b, q_b in moves_b:
+                    key = (next_a, next_b)
+                    next_states[key] = next_states.get(key, 0.0) + p * q_a * q_b
+        states = next_states
+    return sum(p * _payout(table, a) * _payout(table, b) for (a, b), p in states.items())
+
+def exact_rtp(table):
+    start = time.perf_counter()
+    dist = line_distribution(table)
+    mean = sum(pay * p for pay, p in dist.items())
+    second = sum(pay * pay * p for pay, p in dist.items())
+    lines = len(table.paylines)
+
+    # Var(sum) = sum Var(line) + 2 * sum Cov(line_i, line_j)
+    variance = lines * (second - mean * mean)
+    # The covariance only depends on which reels two lines share a cell on
+    transitions = _Transitions(table)
+    moments = {}
+    for a, b in combinations(table.paylines, 2):
+        shared = tuple(ra == rb for ra, rb in zip(a, b))
+        if not any(shared):
+            continue  # No cell in common: independent, zero covariance
+        if shared not in moments:
+            moments[shared] = pair_moment(table, a, b, transitions)
+        variance += 2 * (moments[shared] - mean * mean)
+
+    breakdown = symbol_breakdown(table)
+    return {
+        "wild": table.ids[table.wild] if table.wild is not None else None,
+        "weights": dict(zip(table.ids, table.weights)),
+        "rtp": mean * lines,
+        "line_rtp": mean,
+        "line_hit_rate": sum(p for pay, p in dist.items() if pay > 0),
+        "std_dev": math.sqrt(max(variance, 0.0)),
+        "line_distribution": {str(pay): p for pay, p in dist.items()},
+        "symbol_rtp": {name: lines * sum(p * pay_for(table, table.ids.index(name), n) for n, p in counts.items())
+                       for name, counts in breakdown.items()},
+        "win_frequency": {name: {f"{n}oak": lines * p for n, p in sorted(counts.items())}
+                          for name, counts in breakdown.items()},
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+
+def print_report(result):
+    wild = result["wild"] or "none"
+    print(f"  RTP:            {result['rtp']:.6%}  (wild: {wild})")
+    print(f"  Per line:       {result['line_rtp']:.6%}, hits {result['line_hit_rate']:.4%}")
+    print(f"  Std dev / spin: {result['std_dev']:.4f} x bet")
+    print("\n  Symbol          RTP      3oak/spin   4oak/spin   5oak/spin")
+    for name, rtp in result["symbol_rtp"].items():
+        freq = result["win_frequency"][name]
+        cells = "  ".join(f"{freq.get(f'{n}oak', 0.0):>10.3e}" for n in (3, 4, 5))
+        print(f"  {name:<12} {rtp:>8.4%}  {cells}")
+    print("\n  Line payout distribution")
+    for pay, p in result["line_distribution"].items():
+        print(f"  {float(pay):>8g} x  {p:.6e}")
+    print(f"\n  {result['elapsed_ms']:.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact RTP and payout distribution of the slot-engine.js paytable")
+    parser.add_argument("--wild", help="symbol id to score as a wild, e.g. pharaoh (default: none, like checkWins)")
+    parser.add_argument("--weights", default="", help="weight overrides, e.g. pharaoh=4,anubis=7")
+    parser.add_argument("--json", help="also write the result to this file")
+    args = parser.parse_args()
+
+    table = with_weights(load_paytable(wild=args.wild), parse_weights(args.weights))
+    result = exact_rtp(table)
+    print_report(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=1)
+        print(f"\n✓ Result saved to: {args.json}")
+
+if __name__ == "__main__":
+    main()
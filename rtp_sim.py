@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo RTP simulator for the slot-engine.js paytable.
+
+Spins are generated and evaluated in NumPy batches and spread over a process
+pool. Every chunk of --chunk spins draws from its own SeedSequence child of
+--seed and payouts are summed as integers, so a fixed seed gives bit-identical
+results regardless of the worker count.
+
+    python rtp_sim.py --spins 1e9 --seed 1
+"""
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from paytable import load_paytable, parse_weights, payout_scale, probabilities, with_weights
+
+DEFAULT_CHUNK = 1 << 20
+
+def _build_tables(table):
+    """(symbol sampler, integer pay table [symbol, count], payout scale)."""
+    scale = payout_scale(table)
+    pays = np.zeros((len(table.ids), table.reels + 1), dtype=np.int64)
+    for symbol, values in enumerate(table.payouts):
+        for count in range(3, table.reels + 1):
+            pays[symbol, count] = round(values[min(count, len(values) + 2) - 3] * scale)
+
+    if all(float(w).is_integer() for w in table.weights):
+        # Integer weights: one lookup into a ticket table, exact like the JS loop
+        sampler = np.repeat(np.arange(len(table.ids), dtype=np.uint8),
+                            [int(w) for w in table.weights])
+    else:
+        sampler = np.cumsum(probabilities(table))
+    return sampler, pays, scale
+
+def _draw(rng, sampler, shape):
+    if sampler.dtype == np.uint8:
+        # uint16 tickets halve the draw's memory; weight totals past 65536 need wider ones
+        dtype = np.uint16 if len(sampler) <= 1 << 16 else np.intp
+        return sampler[rng.integers(0, len(sampler), size=shape, dtype=dtype)]
+    return np.searchsorted(sampler, rng.random(size=shape), side='right').astype(np.uint8)
+
+def score_lines(table, grid, pays):
+    """Yield (line, pay-table key, pay) arrays for every payline of a spin batch.
+
+    grid is [spin, reel, row] symbol indices; pays the integer table from
+    _build_tables(). The key is symbol * (reels + 1) + count of the paying run.
+    """
+    spins = len(grid)
+    flat_pays = pays.ravel()
+    for line, rows in enumerate(table.paylines):
+        cells = [grid[:, reel, row] for reel, row in enumerate(rows)]
+        first = cells[0].astype(np.intp)
+        if table.wild is None:
+            target = first
+        else:
+            # First non-wild symbol on the line (stays wild if all five are)
+            target = first.copy()
+            for cell in cells[1:]:
+                target = np.where(target == table.wild, cell, target)
+        # Length of the run of the target symbol from the left
+        run = np.ones(spins, dtype=bool)
+        count = np.ones(spins, dtype=np.intp)
+        for cell in cells[1:]:
+            matches = cell == target
+            if table.wild is not None:
+                matches |= cell == table.wild
+            run &= matches
+            count += run
+        key = target * (table.reels + 1) + count
+        pay = flat_pays[key]
+        if table.wild is not None:
+            # A leading run of wilds can pay more than the symbol it completes
+            wild_run = np.zeros(spins, dtype=np.intp)
+            run = np.ones(spins, dtype=bool)
+            for cell in cells:
+                run &= cell == table.wild
+                wild_run += run
+            wild_key = table.wild * (table.reels + 1) + wild_run
+            wild_pay = flat_pays[wild_key]
+            use_wild = wild_pay > pay
+            key = np.where(use_wild, wild_key, key)
+            pay = np.where(use_wild, wild_pay, pay)
+        yield line, key, pay
+
+def generate_outcomes(table, seed_seq, spins):
+    """(grid [spin, reel, row] uint8, total pay per spin in payout-scale units)."""
+    sampler, pays, _ = _build_tables(table)
+    rng = np.random.Generator(np.random.PCG64(seed_seq))
+    grid = _draw(rng, sampler, (spins, table.reels, table.rows))
+    spin_pay = np.zeros(spins, dtype=np.int64)
+    for _, _, pay in score_lines(table, grid, pays):
+        spin_pay += pay
+    return grid, spin_pay
+
+def simulate_chunk(table, seed_seq, spins):
+    """Evaluate `spins` spins. Returns integer totals in payout-scale units."""
+    sampler, pays, _ = _build_tables(table)
+    rng = np.random.Generator(np.random.PCG64(seed_seq))
+
+    # grid[spin, reel, row]
+    grid = _draw(rng, sampler, (spins, table.reels, table.rows))
+    spin_pay = np.zeros(spins, dtype=np.int64)
+    line_pay = np.zeros(len(table.paylines), dtype=np.int64)
+    wins = np.zeros(pays.shape, dtype=np.int64)
+    for line, key, pay in score_lines(table, grid, pays):
+        spin_pay += pay
+        line_pay[line] = pay.sum()
+        wins += np.bincount(key, minlength=wins.size).reshape(wins.shape)
+    symbol_pay = (wins * pays).sum(axis=1)
+
+    return {
+        "spins": spins,
+        "pay": int(spin_pay.sum()),
+        "pay_sq": int(np.dot(spin_pay, spin_pay)),
+        "hits": int(np.count_nonzero(spin_pay)),
+        "max_pay": int(spin_pay.max()) if spins else 0,
+        "line_pay": line_pay,
+        "symbol_pay": symbol_pay,
+        "wins": wins,  # [symbol, count]; counts below 3 are non-winning runs
+    }
+
+def _chunk_job(args):
+    return simulate_chunk(*args)
+
+def _merge(total, part):
+    if total is None:
+        return part
+    for key in ("spins", "pay", "pay_sq", "hits"):
+        total[key] += part[key]
+    total["max_pay"] = max(total["max_pay"], part["max_pay"])
+    for key in ("line_pay", "symbol_pay", "wins"):
+        total[key] = total[key] + part[key]
+    return total
+
+def simulate(spins, seed=1, chunk=DEFAULT_CHUNK, workers=None, table=None):
+    """Run `spins` spins and return a summary dict (multipliers are per unit bet)."""
+    if spins <= 0 or chunk <= 0:
+        raise ValueError("spins and chunk must be positive")
+    table = table or load_paytable()
+    scale = payout_scale(table)
+    sizes = [chunk] * (spins // chunk) + ([spins % chunk] if spins % chunk else [])
+    children = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(table, child, size) for child, size in zip(children, sizes)]
+
+    start = time.perf_counter()
+    total = None
+    if workers == 1 or len(jobs) == 1:
+        for job in jobs:
+            total = _merge(total, _chunk_job(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() keeps chunk order; integer sums make the order irrelevant anyway
+            for part in pool.map(_chunk_job, jobs):
+                total = _merge(total, part)
+    elapsed = time.perf_counter() - start
+    return summarize(table, total, scale, seed, elapsed)
+
+def summarize(table, total, scale, seed, elapsed):
+    n = total["spins"]
+    mean = total["pay"] / (scale * n)
+    variance = total["pay_sq"] / (scale * scale * n) - mean * mean
+    std = math.sqrt(max(variance, 0.0))
+    half_width = 1.96 * std / math.sqrt(n)
+    wins = {}
+    for symbol, name in enumerate(table.ids):
+        wins[name] = {f"{count}oak": int(total["wins"][symbol, count]) / n
+                      for count in range(3, table.reels + 1)}
+    return {
+        "spins": n,
+        "seed": seed,
+        "wild": table.ids[table.wild] if table.wild is not None else None,
+        "rtp": mean,
+        "rtp_ci95": [mean - half_width, mean + half_width],
+        "hit_rate": total["hits"] / n,
+        "std_dev": std,
+        "max_win": total["max_pay"] / scale,
+        "symbol_rtp": {name: int(total["symbol_pay"][i]) / (scale * n) for i, name in enumerate(table.ids)},
+        "line_rtp": [int(p) / (scale * n) for p in total["line_pay"]],
+        "win_frequency": wins,
+        "elapsed_s": elapsed,
+        "spins_per_s": n / elapsed if elapsed else 0.0,
+    }
+
+def print_report(result):
+    print(f"  Spins:      {result['spins']:,} (seed {result['seed']})")
+    low, high = result["rtp_ci95"]
+    print(f"  RTP:        {result['rtp']:.4%}  (95% CI {low:.4%} .. {high:.4%})")
+    print(f"  Hit rate:   {result['hit_rate']:.4%}  (1 in {1 / result['hit_rate']:.2f})" if result["hit_rate"]
+          else "  Hit rate:   0")
+    print(f"  Std dev:    {result['std_dev']:.4f} x bet")
+    print(f"  Max win:    {result['max_win']:g} x bet")
+    print("\n  Symbol          RTP       3oak        4oak        5oak")
+    for name, rtp in result["symbol_rtp"].items():
+        freq = result["win_frequency"][name]
+        print(f"  {name:<12} {rtp:>7.3%} {freq['3oak']:>10.3e}  {freq['4oak']:>10.3e}  {freq['5oak']:>10.3e}")
+    print("\n  Line  RTP")
+    for line, rtp in enumerate(result["line_rtp"]):
+        print(f"  {line:>4}  {rtp:.3%}")
+    print(f"\n  {result['elapsed_s']:.1f}s, {result['spins_per_s']:,.0f} spins/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo RTP simulation of the slot-engine.js paytable")
+    parser.add_argument("--spins", type=float, default=1e7, help="number of spins (default: 1e7)")
+    parser.add_argument("--seed", type=int, default=1, help="root seed (default: 1)")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help=f"spins per batch (default: {DEFAULT_CHUNK})")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--wild", help="symbol id to score as a wild, e.g. pharaoh (default: none, like checkWins)")
+    parser.add_argument("--weights", default="", help="weight overrides, e.g. pharaoh=4,anubis=7")
+    parser.add_argument("--json", help="also write the result to this file")
+    args = parser.parse_args()
+    if int(args.spins) <= 0:
+        parser.error("--spins must be at least 1")
+    if args.chunk <= 0:
+        parser.error("--chunk must be at least 1")
+    table = with_weights(load_paytable(wild=args.wild), parse_weights(args.weights))
+
+    print(f"=== Simulating {int(args.spins):,} spins on {os.cpu_count()} cores ===\n")
+    result = simulate(int(args.spins), args.seed, args.chunk, args.workers, table)
+    print_report(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=1)
+        print(f"\n✓ Result saved to: {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Local static server for the rebuild, replacing `python3 -m http.server`.
+
+One thread per connection with HTTP/1.1 keep-alive. Every response carries an
+ETag and Last-Modified, so reloads revalidate with 304s instead of
+re-downloading rebuild/assets and the engines. Byte ranges work, which the
+audio sprites need for seeking. Content-hashed names (build_manifest.py
+output, name.<hash>.ext) are sent as immutable.
+
+Precompressed siblings (file.js.gz, file.js.br) are served when the client
+accepts them. They are written at build time by --precompress, never on the
+fly; brotli is used when the module is installed. Small files are kept in an
+in-memory LRU, and large ones (texture sheets) go out with sendfile.
+
+    python serve.py --precompress     # write .gz / .br siblings, then exit
+    python serve.py                   # http://localhost:8000
+"""
+import argparse
+import gzip
+import os
+import re
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+COMPRESSIBLE = ('.html', '.js', '.css', '.json', '.svg', '.txt', '.xml', '.map', '.wasm', '.atlas', '.fnt')
+MIN_COMPRESS_BYTES = 1024
+SKIP_DIRS = {'.git', '__pycache__', '.blobs', 'node_modules'}
+# build_manifest.py names: bg.3f9a1c2e.png
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.\w+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# Preferred first
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+class FileCache:
+    """LRU of small file bodies, validated against (mtime, size) on every hit."""
+
+    def __init__(self, budget_mb=64, max_file_kb=256):
+        self.budget = budget_mb * 1024 * 1024
+        self.max_file = max_file_kb * 1024
+        self.entries = OrderedDict()  # path -> (mtime_ns, size, data)
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, st):
+        """File bytes, from memory when unchanged since it was cached; None if too big to cache."""
+        if st.st_size > self.max_file:
+            return None
+        with self.lock:
+            cached = self.entries.get(path)
+            if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return cached[2]
+        with open(path, 'rb') as f:
+            data = f.read()
+        with self.lock:
+            self.misses += 1
+            old = self.entries.pop(path, None)
+            if old:
+                self.used -= len(old[2])
+            while self.entries and self.used + len(data) > self.budget:
+                _, (_, _, dropped) = self.entries.popitem(last=False)
+                self.used -= len(dropped)
+            self.entries[path] = (st.st_mtime_ns, st.st_size, data)
+            self.used += len(data)
+        return data
+
+def _accepts(header, coding):
+    """True if an Accept-Encoding header allows coding (q=0 excluded)."""
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() in (coding, "*"):
+            q = params.strip()
+            return not (q.startswith("q=") and float(q[2:] or 0) == 0)
+    return False
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single 'bytes=' range; None = serve whole; False = unsatisfiable."""
+    if not header.startswith("bytes=") or "," in header:
+        return None  # multipart ranges: answer with the whole body
+    first, _, last = header[6:].strip().partition("-")
+    try:
+        if not first:
+            length = int(last)
+            if length == 0:
+                return False
+            start, end = max(0, size - length), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        return False
+    return start, end
+
+class AssetHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    cache = FileCache()
+    quiet = False
+
+    extensions_map = dict(SimpleHTTPRequestHandler.extensions_map, **{
+        '.js': 'application/javascript', '.json': 'application/json', '.wasm': 'application/wasm',
+        '.webp': 'image/webp', '.woff2': 'font/woff2', '.ogg': 'audio/ogg', '.mp3': 'audio/mpeg',
+        '.m4a': 'audio/mp4', '.wav': 'audio/wav',
+    })
+
+    def do_GET(self):
+        self.serve(head=False)
+
+    def do_HEAD(self):
+        self.serve(head=True)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def serve(self, head):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            url_path = self.path.split("?", 1)[0]
+            if not url_path.endswith("/"):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header("Location", url_path + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            index = os.path.join(path, "index.html")
+            if not os.path.isfile(index):
+                listing = self.list_directory(path)
+                if listing and not head:
+                    self.copyfile(listing, self.wfile)
+                return
+            path = index
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        # A precompressed sibling, unless a byte range was asked for (ranges are over the identity body)
+        encoding, body_path, body_st = None, path, st
+        range_header = self.headers.get("Range")
+        if not range_header and path.endswith(COMPRESSIBLE):
+            accept = self.headers.get("Accept-Encoding", "")
+            for coding, suffix in ENCODINGS:
+                if _accepts(accept, coding):
+                    try:
+                        sibling = os.stat(path + suffix)
+                    except OSError:
+                        continue
+                    if sibling.st_mtime_ns >= st.st_mtime_ns:
+                        encoding, body_path, body_st = coding, path + suffix, sibling
+                        break
+
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}{"-" + encoding if encoding else ""}"'
+        last_modified = formatdate(st.st_mtime, usegmt=True)
+        cache_control = IMMUTABLE if HASHED_NAME.search(path) else REVALIDATE
+
+        def common_headers():
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("Cache-Control", cache_control)
+            if path.endswith(COMPRESSIBLE):
+                self.send_header("Vary", "Accept-Encoding")
+
+        if self.not_modified(etag, st):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            common_headers()
+            self.end_headers()
+            return
+
+        size = body_st.st_size
+        start, end = 0, size - 1
+        status = HTTPStatus.OK
+        if range_header and self.range_applies(etag, st):
+            byte_range = parse_range(range_header, size)
+            if byte_range is False:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if byte_range:
+                start, end = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        self.send_response(status)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        common_headers()
+        self.end_headers()
+        if head or size == 0:
+            return
+
+        try:
+            data = self.cache.get(body_path, body_st)
+            if data is not None:
+                self.wfile.write(data[start:end + 1])
+                return
+            with open(body_path, 'rb') as f:
+                # Zero-copy where the OS supports it; socket.sendfile falls back to send()
+                self.connection.sendfile(f, start, end - start + 1)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def not_modified(self, etag, st):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        return self._not_newer_than(self.headers.get("If-Modified-Since"), st)
+
+    def range_applies(self, etag, st):
+        """If-Range: honour the range only while the client's copy is still current."""
+        if_range = self.headers.get("If-Range")
+        if not if_range:
+            return True
+        if if_range.startswith(('"', 'W/')):
+            return if_range == etag
+        return self._not_newer_than(if_range, st)
+
+    @staticmethod
+    def _not_newer_than(http_date, st):
+        if not http_date:
+            return False
+        try:
+            return int(st.st_mtime) <= parsedate_to_datetime(http_date).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+
+def precompress(root=ROOT_DIR, min_saving=0.1):
+    """Write .gz (and .br with brotli installed) siblings for compressible files that are out of date."""
+    written = skipped = 0
+    saved = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for filename in filenames:
+            if not filename.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(dirpath, filename)
+            st = os.stat(path)
+            if st.st_size < MIN_COMPRESS_BYTES:
+                continue
+            data = None
+            for coding, suffix in ENCODINGS:
+                if coding == "br" and brotli is None:
+                    continue
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= st.st_mtime:
+                    skipped += 1
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                packed = brotli.compress(data, quality=11) if coding == "br" else gzip.compress(data, 9, mtime=0)
+                if len(packed) > len(data) * (1 - min_saving):
+                    # Not worth a Content-Encoding: drop any stale sibling so it isn't served
+                    if os.path.exists(target):
+                        os.remove(target)
+                    continue
+                with open(target, 'wb') as f:
+                    f.write(packed)
+                written += 1
+                saved += len(data) - len(packed)
+                print(f"  ✓ {os.path.relpath(target, root)}: {len(data)} -> {len(packed)} bytes")
+    print(f"\n  {written} written, {skipped} up to date, {saved / 1e6:.1f} MB saved"
+          f"{'' if brotli else ' (gzip only: pip install brotli for .br)'}")
+
+def serve(host="", port=8000, root=ROOT_DIR, cache_mb=64, quiet=False):
+    AssetHandler.cache = FileCache(budget_mb=cache_mb)
+    AssetHandler.quiet = quiet
+    server = ThreadingHTTPServer((host, port), partial(AssetHandler, directory=root))
+    server.daemon_threads = True
+    print(f"Serving {root} on http://{host or 'localhost'}:{port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        cache = AssetHandler.cache
+        print(f"\n  cache: {cache.hits} hits, {cache.misses} misses, {cache.used / 1e6:.1f} MB held")
+
+def main():
+    parser = argparse.ArgumentParser(description="Caching static server for the rebuild")
+    parser.add_argument("--host", default="", help="bind address (default: all interfaces)")
+    parser.add_argument("--port", type=int, default=8000, help="port (default: 8000)")
+    parser.add_argument("--root", default=ROOT_DIR, help="directory to serve (default: the project root)")
+    parser.add_argument("--cache-mb", type=int, default=64, help="in-memory cache for small files (default: 64)")
+    parser.add_argument("--precompress", action="store_true", help="write .gz / .br siblings and exit")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't log every request")
+    args = parser.parse_args()
+
+    if args.precompress:
+        print(f"=== Precompressing {args.root} ===\n")
+        precompress(args.root)
+        return
+    serve(args.host, args.port, args.root, args.cache_mb, args.quiet)
+
+if __name__ == "__main__":
+    main()
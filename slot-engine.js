@@ -22,6 +22,9 @@ const CONFIG = {
     // Game settings
     betAmounts: [0.10, 0.25, 0.50, 1.00, 2.00, 5.00, 10.00],
     startingBalance: 1000,
+    
+    // Texture tiers (rebuild/build_tiers.py): share of device memory textures may use
+    textureBudget: { mobile: 1 / 16, desktop: 1 / 8 },
 };
 
 // Symbol definitions with payouts (multipliers for 3, 4, 5 of a kind)
@@ -51,6 +54,10 @@ const PAYLINES = [
     [0, 1, 1, 1, 0],  // Slight V
 ];
 
+// Content-hashed URLs from build_manifest.py (dist/); in the source tree every path maps to itself
+const ASSET_MANIFEST = window.ASSET_MANIFEST || {};
+const assetUrl = (path) => ASSET_MANIFEST[path] || path;
+
 class SlotGame {
     constructor() {
         this.app = null;
@@ -91,19 +98,67 @@ class SlotGame {
     }
     
     async loadTextures() {
-        const basePath = 'rebuild/sprites/';
+        const tier = await this.pickTextureTier();
+        const base = tier ? tier.base : 'rebuild/';
+        const basePath = base + 'sprites/';
         
         // Load background
-        this.textures.bg = await PIXI.Assets.load(basePath + 'bg.png');
+        this.textures.bg = await PIXI.Assets.load(assetUrl(basePath + 'bg.png'));
         
-        // Load symbols
+        // Load symbols from the packed atlas (rebuild/pack_atlas.py) when present:
+        // one texture upload instead of one per symbol
+        const frames = await this.loadAtlas(assetUrl(base + 'atlas/symbols-0.json'));
         for (const sym of SYMBOLS) {
-            this.textures[sym.id] = await PIXI.Assets.load(basePath + sym.file);
+            this.textures[sym.id] = frames[sym.file] || await PIXI.Assets.load(assetUrl(basePath + sym.file));
         }
         
         console.log('Textures loaded:', Object.keys(this.textures));
     }
     
+    async pickTextureTier() {
+        // Smallest tier that is still sharp at this canvas size, within the memory budget
+        let manifest;
+        try {
+            manifest = await (await fetch(assetUrl('rebuild/tiers/manifest.json'))).json();
+        } catch (e) {
+            return null;
+        }
+        const isMobile = (window.device && !window.device.desktop()) ||
+            (window.WURFL && !window.WURFL.is_full_desktop && (window.WURFL.is_mobile || window.WURFL.is_tablet));
+        const memoryGB = navigator.deviceMemory || (isMobile ? 2 : 4);
+        const budget = memoryGB * 1024 * 1024 * 1024 * CONFIG.textureBudget[isMobile ? 'mobile' : 'desktop'];
+        
+        const tiers = Object.values(manifest.tiers).sort((a, b) => b.scale - a.scale);
+        const cost = (tier) => {
+            // What loadTextures() uploads: the background plus the atlas, or loose symbols without one
+            const atlas = Object.keys(tier.textures).filter(name => name.startsWith('atlas/symbols-'));
+            const used = ['sprites/bg.png', ...(atlas.length ? atlas : SYMBOLS.map(sym => 'sprites/' + sym.file))];
+            return used.reduce((sum, name) => sum + (tier.textures[name] ? tier.textures[name].gpu_bytes : 0), 0);
+        };
+        const full = manifest.tiers['@1x'].textures['sprites/bg.png'];
+        const needed = full ? CONFIG.width * (window.devicePixelRatio || 1) / full.w : 1;
+        
+        const affordable = tiers.filter(tier => cost(tier) <= budget);
+        const sharp = affordable.filter(tier => tier.scale >= needed * 0.9);
+        const tier = sharp.pop() || affordable[0] || tiers[tiers.length - 1];
+        console.log(`Texture tier ${tier.scale}x: ${(cost(tier) / 1048576).toFixed(1)} MB of ${(budget / 1048576).toFixed(0)} MB budget`);
+        return tier;
+    }
+    
+    async loadAtlas(url) {
+        try {
+            const sheet = await PIXI.Assets.load(url);
+            const frames = { ...sheet.textures };
+            for (const linked of sheet.linkedSheets || []) {
+                Object.assign(frames, linked.textures);
+            }
+            return frames;
+        } catch (e) {
+            console.log('No sprite atlas, loading loose sprites:', url);
+            return {};
+        }
+    }
+    
     createBackground() {
         const bg = new PIXI.Sprite(this.textures.bg);
         bg.width = CONFIG.width;